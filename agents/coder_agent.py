@@ -42,3 +42,36 @@ IMPORTANT:
     ]
     response = generate_text(messages, model_name)
     return response
+
+def repair_code(design: str, broken_files: dict, model_name: str) -> str:
+    """
+    Asks the Coder Agent model to regenerate only the files that failed validation.
+    `broken_files` maps each filename to {'content': current content or None if the
+    file is missing, 'errors': list of validation messages}.
+    Returns the regenerated files as ```filename code blocks.
+    """
+    system_msg = (
+        """You are a coding agent repairing a generated application. Some files failed validation or are missing.
+Return corrected, complete versions of ONLY the listed files, each in a code block starting with ```filename, e.g.
+
+```scripts/app.js
+console.log("App loaded");
+```
+
+Do not return any other files and do not include explanations between code blocks."""
+    )
+    sections = []
+    for filename, info in broken_files.items():
+        errors = "\n".join(f"- {error}" for error in info['errors'])
+        if info['content'] is None:
+            sections.append(f"File: {filename} (missing)\nProblems:\n{errors}")
+        else:
+            sections.append(
+                f"File: {filename}\nProblems:\n{errors}\nCurrent content:\n```{filename}\n{info['content']}\n```"
+            )
+    messages = [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": f"Design specification:\n{design}\n\nFiles to fix:\n\n" + "\n\n".join(sections)}
+    ]
+    response = generate_text(messages, model_name)
+    return response
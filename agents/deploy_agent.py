@@ -84,6 +84,47 @@ def run_server(project_dir):
     print("No recognized application entrypoint found.")
     return None, None
 
+def parse_code_files(coded_string):
+    """
+    Extracts (filename, content) pairs from ```filename fenced code blocks.
+    Blocks without a filename are skipped.
+    """
+    # Match code blocks with filenames
+    pattern = r"```(.*?)\n(.*?)```"
+    files = []
+    for filename, content in re.findall(pattern, coded_string, re.DOTALL):
+        # Clean up filename and content
+        filename = filename.strip()
+        if filename:
+            files.append((filename, content.strip()))
+    return files
+
+def save_code_files(files, base_dir="deployed_app"):
+    """
+    Writes (filename, content) pairs below base_dir, replacing existing files.
+    Returns the list of saved filenames.
+    """
+    base_dir = os.path.abspath(base_dir)
+    saved_files = []
+    for filename, content in files:
+        file_path = os.path.normpath(os.path.join(base_dir, filename))
+        dir_path = os.path.dirname(file_path)
+
+        # Names like "." or "../x" or an existing directory cannot be written as files
+        if not file_path.startswith(base_dir + os.sep) or os.path.isdir(file_path):
+            print(f"Skipping invalid file name: {filename}")
+            continue
+        
+        # Create subdirectories if needed
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        # Save the file
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        saved_files.append(filename)
+    return saved_files
+
 def parse_and_save_coder_output(coded_string, base_dir="deployed_app", auto_launch=True):
     """
     Parses code blocks and saves them to files.
@@ -97,37 +138,16 @@ def parse_and_save_coder_output(coded_string, base_dir="deployed_app", auto_laun
     base_dir = os.path.abspath(base_dir)
     os.makedirs(base_dir, exist_ok=True)
 
-    # Match code blocks with filenames
-    pattern = r"```(.*?)\n(.*?)```"
-    matches = re.findall(pattern, coded_string, re.DOTALL)
+    files = parse_code_files(coded_string)
 
-    if not matches:
+    if not files:
         print("⚠️ No files found in code output. Check the format:")
         print("✉️ CODE SAMPLE START:")
         print(coded_string[:500])  # show first 500 characters for debug
         print("✉️ CODE SAMPLE END")
         return None, None
 
-    saved_files = []
-    for filename, content in matches:
-        # Clean up filename and content
-        filename = filename.strip()
-        content = content.strip()
-        
-        if not filename:  # Skip if no filename
-            continue
-
-        file_path = os.path.join(base_dir, filename)
-        dir_path = os.path.dirname(file_path)
-        
-        # Create subdirectories if needed
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
-
-        # Save the file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        saved_files.append(filename)
+    saved_files = save_code_files(files, base_dir)
 
     if saved_files:
         print(f"✅ Saved {len(saved_files)} file(s) to '{base_dir}':")
@@ -15,5 +15,5 @@ def create_design(requirements: str, model_name: str) -> str:
         {"role": "system", "content": system_msg},
         {"role": "user", "content": requirements}
     ]
-    response = generate_text(messages, model_name)
+    response = generate_text(messages, model_name, hedge=True)
     return response.strip()
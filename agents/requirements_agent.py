@@ -92,7 +92,8 @@
 
 
 from langchain_community.tools.tavily_search import TavilySearchResults
-from model_api import generate_text
+from model_api import generate_text, flights
+from single_flight import request_key
 
 # Initialize Tavily Search Tool
 search_tool = TavilySearchResults(k=5)
@@ -103,7 +104,8 @@ def analyze_requirements(prompt: str, model_name: str) -> str:
     """
 
     # Step 1: Perform web search to get reference URLs
-    search_results = search_tool.invoke(prompt)
+    # Users submitting the same prompt at the same time share one search
+    search_results = flights.do(request_key("search", prompt), search_tool.invoke, prompt)
     urls = [item["url"] for item in search_results]
 
     # Step 2: Prepare prompt with system and user messages
@@ -120,7 +122,7 @@ def analyze_requirements(prompt: str, model_name: str) -> str:
     ]
 
     # Step 3: Generate response using LLM
-    raw_response = generate_text(messages, model_name).strip()
+    raw_response = generate_text(messages, model_name, hedge=True).strip()
 
     # Step 4: Append sources at the end, nicely formatted
     source_block = "\n\n### 🔗 Sources Referenced\n" + "\n".join(f"- {url}" for url in set(urls))
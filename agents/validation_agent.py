@@ -0,0 +1,218 @@
+# agents/validation_agent.py
+import ast
+import json
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from agents.deploy_agent import parse_code_files, save_code_files
+
+# Elements that never have a closing tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr"
+}
+# Elements whose closing tag HTML allows to be left out
+OPTIONAL_END_TAGS = {
+    "html", "head", "body", "p", "li", "dt", "dd", "tr", "td", "th", "thead", "tbody",
+    "tfoot", "option", "optgroup", "colgroup", "caption", "rb", "rt", "rp"
+}
+# Attributes that point at other files of the app
+REFERENCE_ATTRS = {"src", "href"}
+EXTERNAL_PREFIXES = ("#", "//", "http:", "https:", "mailto:", "tel:", "data:", "javascript:")
+# Template placeholders (Jinja, Django, Handlebars) are resolved by the server, not on disk
+TEMPLATE_MARKERS = ("{{", "{%")
+# Links may point at routes; only these link targets are expected to be files
+PAGE_EXTENSIONS = (".html", ".htm")
+# Assets the coder model cannot write; they are reported but not sent for repair
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".bmp", ".woff", ".woff2", ".ttf",
+    ".otf", ".eot", ".mp3", ".wav", ".ogg", ".mp4", ".webm", ".pdf", ".zip"
+}
+
+
+class _HTMLChecker(HTMLParser):
+    """Collects unbalanced tags and local file references of one HTML document."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.errors = []
+        self.references = []
+
+    def handle_starttag(self, tag, attrs):
+        self._collect_references(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_startendtag(self, tag, attrs):
+        self._collect_references(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        open_tags = [name for name, _ in self.stack]
+        if tag not in open_tags:
+            self.errors.append(f"Unexpected closing tag </{tag}> on line {self.getpos()[0]}")
+            return
+        # Close everything opened after the matching tag
+        while self.stack:
+            name, line = self.stack.pop()
+            if name == tag:
+                break
+            if name not in OPTIONAL_END_TAGS:
+                self.errors.append(f"<{name}> opened on line {line} is not closed before </{tag}>")
+
+    def close(self):
+        super().close()
+        for name, line in self.stack:
+            if name not in OPTIONAL_END_TAGS:
+                self.errors.append(f"<{name}> opened on line {line} is never closed")
+
+    def _collect_references(self, tag, attrs):
+        for name, value in attrs:
+            if name not in REFERENCE_ATTRS or not value:
+                continue
+            value = value.strip()
+            if value.lower().startswith(EXTERNAL_PREFIXES) or any(m in value for m in TEMPLATE_MARKERS):
+                continue
+            path = urlsplit(value).path
+            # Directories and extensionless paths are routes served by the app, not files
+            if not path or path.endswith("/") or not posixpath.splitext(posixpath.basename(path))[1]:
+                continue
+            if tag == "a" and not path.lower().endswith(PAGE_EXTENSIONS):
+                continue
+            self.references.append(path)
+
+
+def _check_html(filename, content):
+    """Returns (errors, referenced paths relative to the workspace)"""
+    checker = _HTMLChecker()
+    try:
+        checker.feed(content)
+        checker.close()
+    except Exception as e:
+        return [f"HTML could not be parsed: {e}"], []
+    base = posixpath.dirname(filename.replace(os.sep, "/"))
+    references = []
+    for path in checker.references:
+        resolved = posixpath.normpath(path.lstrip("/") if path.startswith("/") else posixpath.join(base, path))
+        if resolved != "." and not resolved.startswith(".."):
+            references.append(resolved)
+    return checker.errors, references
+
+
+def validate_file(base_dir, filename):
+    """
+    Checks one generated file.
+    Python files must parse with `ast`, JSON files must load and HTML files must have
+    balanced tags; local files referenced from HTML (src/href) are returned so the
+    caller can check that they exist. Routes, directories and template placeholders
+    are not file references, and links (<a href>) only count when they name a page.
+
+    Returns:
+        tuple: (list of error messages, list of referenced file paths)
+    """
+    path = os.path.join(base_dir, filename)
+    if not os.path.isfile(path):
+        return ["File is missing"], []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return [f"File could not be read: {e}"], []
+
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".py":
+        try:
+            ast.parse(content, filename=filename)
+        except SyntaxError as e:
+            return [f"Python syntax error on line {e.lineno}: {e.msg}"], []
+    elif extension == ".json":
+        try:
+            json.loads(content)
+        except json.JSONDecodeError as e:
+            return [f"Invalid JSON on line {e.lineno}: {e.msg}"], []
+    elif extension in (".html", ".htm"):
+        return _check_html(filename, content)
+    return [], []
+
+
+def validate_workspace(base_dir, filenames, max_workers=8):
+    """
+    Validates generated files in parallel and checks that every file referenced
+    from an HTML page exists.
+
+    Parameters:
+        base_dir (str): Workspace directory, e.g. "deployed_app"
+        filenames (list): Files produced by the coder model, relative to base_dir
+        max_workers (int): Files checked at the same time
+
+    Returns:
+        dict: filename -> list of error messages, for failing or missing files only
+    """
+    filenames = list(dict.fromkeys(filenames))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda name: validate_file(base_dir, name), filenames))
+
+    failures = {}
+    for filename, (errors, references) in zip(filenames, results):
+        if errors:
+            failures.setdefault(filename, []).extend(errors)
+        for reference in references:
+            if not os.path.isfile(os.path.join(base_dir, reference)):
+                failures.setdefault(reference, []).append(f"Referenced from {filename} but missing")
+    return failures
+
+
+def repair_workspace(design, model_name, filenames, base_dir="deployed_app", max_rounds=2):
+    """
+    Validates the generated files and sends only the failing or missing ones back to
+    the coder model, merging its corrected files into the workspace, until everything
+    passes or `max_rounds` repairs were made.
+
+    Parameters:
+        design (str): Design specification the code was generated from
+        model_name (str): Coder model used for the repairs
+        filenames (list): Files produced by the coder model, relative to base_dir
+        base_dir (str): Workspace directory
+        max_rounds (int): Repair requests at most
+
+    Returns:
+        dict: 'repaired' (files rewritten by the model), 'remaining' (filename -> errors
+            still failing) and 'rounds' (repair requests made)
+    """
+    # Imported here so validation works without an LLM provider configured
+    from agents.coder_agent import repair_code
+
+    filenames = list(filenames)
+    repaired = []
+    failures = validate_workspace(base_dir, filenames)
+    rounds = 0
+    while failures and rounds < max_rounds:
+        broken_files = {}
+        for filename, errors in failures.items():
+            if os.path.splitext(filename)[1].lower() in BINARY_EXTENSIONS:
+                continue
+            path = os.path.join(base_dir, filename)
+            content = None
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    content = f.read()
+            broken_files[filename] = {"content": content, "errors": errors}
+        if not broken_files:
+            break
+
+        rounds += 1
+        output = repair_code(design, broken_files, model_name)
+        # Only accept the files that were asked for; the rest of the workspace stays as is
+        fixes = [(name, content) for name, content in parse_code_files(output) if name in broken_files]
+        if not fixes:
+            break
+        saved = save_code_files(fixes, base_dir)
+        repaired.extend(name for name in saved if name not in repaired)
+        filenames.extend(name for name in saved if name not in filenames)
+        failures = validate_workspace(base_dir, filenames)
+
+    return {"repaired": repaired, "remaining": failures, "rounds": rounds}
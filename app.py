@@ -3,7 +3,7 @@ import os
 from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
-from agents.deploy_agent import parse_and_save_coder_output
+from agents.deploy_agent import parse_and_save_coder_output, parse_code_files, run_server
 import json
 import re
 import time
@@ -14,6 +14,9 @@ load_dotenv()
 from agents.requirements_agent import analyze_requirements
 from agents.design_agent import create_design
 from agents.coder_agent import generate_code
+from agents.validation_agent import repair_workspace
+from model_api import router, flights
+from prompt_index import PromptIndex
 
 # Initialize session states
 if 'server_process' not in st.session_state:
@@ -23,6 +26,13 @@ if 'current_report' not in st.session_state:
 if 'report_generated' not in st.session_state:
     st.session_state.report_generated = False
 
+@st.cache_resource
+def get_prompt_index():
+    """Past prompts with their requirements and design, shared by all sessions"""
+    return PromptIndex("prompt_index.json")
+
+prompt_index = get_prompt_index()
+
 def generate_word_report(agent_name, content):
     """
     Append agent output to a shared Word document report.
@@ -96,6 +106,18 @@ with col2:
 with col3:
     coder_model = st.selectbox("Coder Agent Model:", model_options, index=0)
 
+# Offer the requirements and design of a near-duplicate earlier prompt
+reused = None
+if prompt:
+    # Only runs made with the selected models are offered
+    match, similarity = prompt_index.lookup(
+        prompt, models={"requirements": req_model, "design": design_model}
+    )
+    if match is not None:
+        st.info(f"A similar prompt was run before: \"{match['prompt']}\" (similarity {similarity:.2f})")
+        if st.checkbox("Reuse its requirements and design (skips those model calls)", value=False):
+            reused = match
+
 # Button to trigger the pipeline
 if st.button("Generate"):
     if not prompt:
@@ -106,24 +128,40 @@ if st.button("Generate"):
         
         # 1. Requirements Analysis
         st.subheader("1. Requirements Analysis")
-        try:
-            requirements = analyze_requirements(prompt, req_model)
+        if reused:
+            requirements = reused['requirements']
+            st.caption(f"Reused from \"{reused['prompt']}\"")
             st.text(requirements)
             generate_word_report("Requirements Agent", requirements)
-        except Exception as e:
-            st.error(f"Error in Requirements Agent: {e}")
-            requirements = ""
+        else:
+            try:
+                requirements = analyze_requirements(prompt, req_model)
+                st.text(requirements)
+                generate_word_report("Requirements Agent", requirements)
+            except Exception as e:
+                st.error(f"Error in Requirements Agent: {e}")
+                requirements = ""
 
         # 2. Design Specification
         if requirements:
             st.subheader("2. Design Specification")
-            try:
-                design = create_design(requirements, design_model)
+            if reused:
+                design = reused['design']
+                st.caption(f"Reused from \"{reused['prompt']}\"")
                 st.text(design)
                 generate_word_report("Design Agent", design)
-            except Exception as e:
-                st.error(f"Error in Design Agent: {e}")
-                design = ""
+            else:
+                try:
+                    design = create_design(requirements, design_model)
+                    st.text(design)
+                    generate_word_report("Design Agent", design)
+                    prompt_index.add(
+                        prompt, requirements, design,
+                        models={"requirements": req_model, "design": design_model}
+                    )
+                except Exception as e:
+                    st.error(f"Error in Design Agent: {e}")
+                    design = ""
         else:
             design = ""
 
@@ -140,12 +178,27 @@ if st.button("Generate"):
                 st.markdown(code_output)
                 generate_word_report("Code Generation Agent", code_output)
                 
-                # 4. Save and deploy the generated code
+                # 4. Save the generated code, repair files that fail validation, then deploy
                 st.subheader("4. Deployment")
-                url, proc = parse_and_save_coder_output(code_output)
+                parse_and_save_coder_output(code_output, auto_launch=False)
+                generated_files = [filename for filename, _ in parse_code_files(code_output)]
+                validation = repair_workspace(design, coder_model, generated_files)
+                if validation['repaired']:
+                    st.info(
+                        f"Regenerated {len(validation['repaired'])} file(s) that failed validation: "
+                        + ", ".join(validation['repaired'])
+                    )
+                if validation['remaining']:
+                    st.warning("Some files still fail validation:")
+                    st.json(validation['remaining'])
+                url, proc = run_server(os.path.abspath("deployed_app")) if generated_files else (None, None)
                 
                 # Show success message and file location
                 deployment_status = f"Code files have been saved to the 'deployed_app' directory\n"
+                if validation['repaired']:
+                    deployment_status += f"Repaired after validation: {', '.join(validation['repaired'])}\n"
+                for filename, errors in validation['remaining'].items():
+                    deployment_status += f"Still failing: {filename}: {'; '.join(errors)}\n"
                 if url and proc:
                     st.session_state.server_process = proc
                     deployment_status += f"Application launched at: {url}"
@@ -193,6 +246,12 @@ if st.session_state.report_generated:
             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
 
+# Rolling latency and error rate per LLM provider, as seen by the model router
+with st.expander("Model Provider Latency"):
+    st.json(router.stats())
+    st.caption("Identical concurrent LLM and search requests served by one upstream call")
+    st.json(flights.stats())
+
 # Cleanup server process when the app is closed
 def cleanup():
     if st.session_state.server_process:
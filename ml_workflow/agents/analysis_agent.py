@@ -1,116 +1,240 @@
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.inspection import permutation_importance
 import matplotlib.pyplot as plt
 import seaborn as sns
+from agents.stats_engine import column_stats, StreamingStats
+from agents.correlation import correlation_analysis, StreamingCorrelation
+from agents.model_registry import importance_scores
+from agents.results import (
+    AnalysisResults, CorrelationResult, FeatureImportance, FeatureStats, TargetDistribution
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
 class AnalysisAgent:
     def __init__(self):
-        pass
+        self._streaming = None
         
-    def analyze_data(self, data_dict):
+    def analyze_data(self, data_dict, sample_size=None, random_state=42):
         """
         Perform exploratory data analysis on the preprocessed data
         
         Args:
             data_dict (dict): Dictionary containing preprocessed data
+            sample_size (int): Compute feature statistics on at most this many rows
+            random_state (int): Seed for row sampling
             
         Returns:
-            dict: Analysis results
+            AnalysisResults: Feature statistics, correlations and target distribution
         """
         try:
             X_train = data_dict['X_train']
             y_train = data_dict['y_train']
-            feature_names = data_dict['feature_names']
             
-            analysis_results = {
-                'basic_stats': self._get_basic_stats(X_train),
-                'correlation_matrix': self._get_correlation_matrix(X_train),
-                'feature_distributions': self._analyze_feature_distributions(X_train),
-                'target_distribution': self._analyze_target_distribution(y_train)
-            }
+            # All per-feature statistics come from one vectorized pass over the numeric block
+            stats = self._compute_feature_stats(X_train, sample_size, random_state)
             
-            return analysis_results
+            return AnalysisResults(
+                features=FeatureStats.from_column_stats(stats, stats['feature_names']),
+                correlation=self._get_correlation_matrix(X_train),
+                target=self._analyze_target_distribution(y_train)
+            )
             
         except Exception as e:
             logger.error(f"Error in data analysis: {str(e)}")
             raise
             
-    def get_feature_importance(self, data_dict, target_column):
+    def start_streaming_analysis(self, feature_names, sample_size=10_000,
+                                 max_target_values=1000, random_state=42):
+        """
+        Prepare chunk-by-chunk analysis of data that does not fit in memory
+        
+        Args:
+            feature_names (list): Names of the (preprocessed) feature columns
+            sample_size (int): Rows kept in a uniform sample for quantiles and the median
+            max_target_values (int): Distinct target values counted exactly; beyond this
+                the target value counts come from the row sample
+            random_state (int): Seed for the row samples
+        """
+        self._streaming = {
+            'feature_names': list(feature_names),
+            'features': StreamingStats(len(feature_names), sample_size, random_state=random_state),
+            'correlation': StreamingCorrelation(len(feature_names)),
+            'target': StreamingStats(1, sample_size, quantiles=(0.5,), random_state=random_state),
+            'target_counts': pd.Series(dtype=np.float64),
+            'max_target_values': max_target_values
+        }
+        
+    def update_streaming_analysis(self, X, y):
+        """Add a chunk of preprocessed training rows to the streaming analysis"""
+        state = self._streaming
+        values = X.to_numpy(dtype=np.float64, na_value=np.nan)
+        state['features'].update(values)
+        state['correlation'].update(values)
+        
+        if pd.api.types.is_numeric_dtype(y):
+            state['target'].update(y.to_numpy(dtype=np.float64, na_value=np.nan)[:, None])
+        if state['target_counts'] is not None:
+            counts = state['target_counts'].add(y.value_counts(), fill_value=0)
+            if len(counts) > state['max_target_values']:
+                # Too many distinct values to count exactly (e.g. a continuous target)
+                counts = None
+            state['target_counts'] = counts
+        
+    def finish_streaming_analysis(self):
+        """
+        Summarize the streamed chunks
+        
+        Returns:
+            AnalysisResults: Same layout as analyze_data
+        """
+        try:
+            state = self._streaming
+            stats = state['features'].result()
+            
+            target = state['target'].result()
+            counts = state['target_counts']
+            if counts is None:
+                sample = pd.Series(state['target']._sample[:, 0])
+                counts = sample.value_counts()
+            observed = bool(target['count'][0])
+            
+            analysis_results = AnalysisResults(
+                features=FeatureStats.from_column_stats(stats, state['feature_names']),
+                correlation=CorrelationResult.from_summary(
+                    state['correlation'].result(state['feature_names'])
+                ),
+                target=TargetDistribution.from_value_counts(
+                    counts,
+                    mean=float(target['mean'][0]) if observed else None,
+                    median=float(target['quantiles'][0, 0]) if observed else None,
+                    std=float(target['std'][0]) if observed else None,
+                    unique_values=len(counts) if state['target_counts'] is not None else None
+                )
+            )
+            self._streaming = None
+            return analysis_results
+            
+        except Exception as e:
+            logger.error(f"Error in streaming data analysis: {str(e)}")
+            raise
+            
+    def get_feature_importance(self, data_dict, target_column, sample_size=None,
+                               n_estimators=100, random_state=42):
         """
         Calculate feature importance using Random Forest
         
         Args:
             data_dict (dict): Dictionary containing preprocessed data
             target_column (str): Name of the target column
+            sample_size (int): Fit the forest on at most this many training rows
+            n_estimators (int): Number of trees in the forest
+            random_state (int): Seed for the forest and the row sample
             
         Returns:
-            dict: Feature importance scores
+            FeatureImportance: Feature importance scores
         """
         try:
             X_train = data_dict['X_train']
             y_train = data_dict['y_train']
             feature_names = data_dict['feature_names']
             
+            if sample_size is not None and len(X_train) > sample_size:
+                rows = np.random.default_rng(random_state).choice(len(X_train), sample_size, replace=False)
+                X_train, y_train = X_train.iloc[rows], y_train.iloc[rows]
+            
             # Determine if it's a classification or regression problem
             unique_values = len(np.unique(y_train))
             if unique_values < 10:  # Classification if less than 10 unique values
-                model = RandomForestClassifier(n_estimators=100, random_state=42)
+                model = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state)
             else:
-                model = RandomForestRegressor(n_estimators=100, random_state=42)
+                model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
                 
             model.fit(X_train, y_train)
             
-            # Get feature importance
-            importance_scores = model.feature_importances_
-            feature_importance = dict(zip(feature_names, importance_scores))
+            return self._format_importance(feature_names, model.feature_importances_)
             
-            # Sort features by importance
-            sorted_features = sorted(
-                feature_importance.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
+        except Exception as e:
+            logger.error(f"Error calculating feature importance: {str(e)}")
+            raise
+            
+    def importance_from_model(self, estimator, feature_names):
+        """
+        Read feature importance from an already trained estimator
+        
+        Args:
+            estimator: Fitted estimator exposing feature_importances_ or coef_
+            feature_names (list): Names of the training features
+            
+        Returns:
+            FeatureImportance: Feature importance scores, or None if the estimator exposes none
+        """
+        scores = importance_scores(estimator)
+        if scores is None:
+            return None
+        return self._format_importance(feature_names, scores)
+        
+    def get_permutation_importance(self, estimator, data_dict, sample_size=2000,
+                                   n_repeats=5, random_state=42):
+        """
+        Estimate feature importance of a trained estimator by permuting test features
+        
+        Args:
+            estimator: Fitted estimator
+            data_dict (dict): Dictionary containing preprocessed data
+            sample_size (int): Score on at most this many test rows
+            n_repeats (int): Number of permutations per feature
+            random_state (int): Seed for the row sample and permutations
+            
+        Returns:
+            FeatureImportance: Feature importance scores
+        """
+        try:
+            X_test = data_dict['X_test']
+            y_test = data_dict['y_test']
+            if sample_size is not None and len(X_test) > sample_size:
+                rows = np.random.default_rng(random_state).choice(len(X_test), sample_size, replace=False)
+                X_test, y_test = X_test.iloc[rows], y_test.iloc[rows]
             
-            return {
-                'feature_importance': dict(sorted_features),
-                'top_features': dict(sorted_features[:5])
-            }
+            result = permutation_importance(
+                estimator, X_test, y_test, n_repeats=n_repeats, random_state=random_state
+            )
+            return self._format_importance(data_dict['feature_names'], result.importances_mean)
             
         except Exception as e:
-            logger.error(f"Error calculating feature importance: {str(e)}")
+            logger.error(f"Error calculating permutation importance: {str(e)}")
             raise
             
-    def _get_basic_stats(self, X):
-        """Calculate basic statistics for numerical features"""
-        return X.describe().to_dict()
+    def _format_importance(self, feature_names, importance_scores):
+        """Sort importance scores, keeping them aligned with the feature names"""
+        return FeatureImportance.from_scores(feature_names, importance_scores)
+            
+    def _compute_feature_stats(self, X, sample_size=None, random_state=42):
+        """Compute moments, quantiles and counts for all numerical features at once"""
+        numeric = X.select_dtypes(include='number')
+        values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+        if sample_size is not None and len(values) > sample_size:
+            rng = np.random.default_rng(random_state)
+            values = values[rng.choice(len(values), sample_size, replace=False)]
+        stats = column_stats(values)
+        stats['feature_names'] = numeric.columns.tolist()
+        return stats
         
     def _get_correlation_matrix(self, X):
-        """Calculate correlation matrix for features"""
-        return X.corr().to_dict()
-        
-    def _analyze_feature_distributions(self, X):
-        """Analyze the distribution of each feature"""
-        distributions = {}
-        for column in X.columns:
-            distributions[column] = {
-                'mean': X[column].mean(),
-                'median': X[column].median(),
-                'std': X[column].std(),
-                'skew': X[column].skew(),
-                'kurtosis': X[column].kurtosis()
-            }
-        return distributions
+        """Calculate float32 correlation matrix, strongest pairs and a clustered feature order"""
+        return CorrelationResult.from_summary(correlation_analysis(X.select_dtypes(include='number')))
         
     def _analyze_target_distribution(self, y):
         """Analyze the distribution of the target variable"""
-        return {
-            'mean': y.mean(),
-            'median': y.median(),
-            'std': y.std(),
-            'unique_values': len(np.unique(y)),
-            'value_counts': dict(y.value_counts().to_dict())
-        } 
\ No newline at end of file
+        counts = y.value_counts()
+        numeric = pd.api.types.is_numeric_dtype(y)
+        return TargetDistribution.from_value_counts(
+            counts,
+            mean=float(y.mean()) if numeric else None,
+            median=float(y.median()) if numeric else None,
+            std=float(y.std()) if numeric else None,
+            unique_values=len(counts)
+        ) 
\ No newline at end of file
@@ -0,0 +1,257 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def standardize(values, dtype=np.float32):
+    """
+    Center and scale columns so that Z.T @ Z is the Pearson correlation matrix
+
+    Missing values are replaced by the column mean, i.e. they contribute nothing
+    to the covariance. Constant columns become all zeros.
+
+    Args:
+        values (np.ndarray): 2-D array, rows x features
+        dtype: Floating point type of the result
+
+    Returns:
+        tuple: (Z as a `dtype` array, boolean mask of constant columns)
+    """
+    values = np.asarray(values)
+    Z = np.empty(values.shape, dtype=dtype)
+    constant = np.zeros(values.shape[1], dtype=bool)
+    for j in range(values.shape[1]):
+        col = values[:, j].astype(np.float64)
+        missing = np.isnan(col)
+        observed = col[~missing]
+        mean = observed.mean() if observed.size else 0.0
+        col -= mean
+        col[missing] = 0.0
+        norm = np.sqrt(np.dot(col, col))
+        if norm == 0:
+            constant[j] = True
+            Z[:, j] = 0
+        else:
+            Z[:, j] = col / norm
+    return Z, constant
+
+
+def correlation_matrix(Z, constant=None, block_size=1024):
+    """
+    Correlation matrix of standardized columns, computed in row blocks of the result
+
+    Args:
+        Z (np.ndarray): Output of `standardize`
+        constant (np.ndarray): Mask of constant columns, whose correlations are NaN
+        block_size (int): Features per block of the matrix product
+
+    Returns:
+        np.ndarray: p x p correlation matrix with Z's dtype
+    """
+    p = Z.shape[1]
+    C = np.empty((p, p), dtype=Z.dtype)
+    for start in range(0, p, block_size):
+        stop = min(start + block_size, p)
+        np.matmul(Z[:, start:stop].T, Z, out=C[start:stop])
+    np.clip(C, -1, 1, out=C)
+    np.fill_diagonal(C, 1)
+    if constant is not None and constant.any():
+        C[constant, :] = np.nan
+        C[:, constant] = np.nan
+    return C
+
+
+def top_k_pairs(Z, k=20, block_size=1024):
+    """
+    Strongest absolute correlations without materializing the full matrix
+
+    Args:
+        Z (np.ndarray): Output of `standardize`
+        k (int): Number of pairs to return
+        block_size (int): Features per block; peak extra memory is block_size x p
+
+    Returns:
+        list: (i, j, r) tuples with i < j, sorted by |r| descending
+    """
+    p = Z.shape[1]
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    best_r = np.empty(0, dtype=Z.dtype)
+    for start in range(0, p, block_size):
+        stop = min(start + block_size, p)
+        # Only the upper triangle: block rows against columns from `start` onwards
+        block = Z[:, start:stop].T @ Z[:, start:]
+        n_rows = stop - start
+        block[:, :n_rows] = np.triu(block[:, :n_rows], k=1)
+        flat = np.abs(block).ravel()
+        keep = np.argpartition(flat, -k)[-k:] if flat.size > k else np.arange(flat.size)
+        rows, cols = np.unravel_index(keep, block.shape)
+        # Entries blanked out below the diagonal are not pairs
+        valid = cols > rows
+        rows, cols = rows[valid], cols[valid]
+        r = block[rows, cols]
+        best_i = np.concatenate([best_i, rows + start])
+        best_j = np.concatenate([best_j, cols + start])
+        best_r = np.concatenate([best_r, r])
+        if len(best_r) > k:
+            keep = np.argpartition(np.abs(best_r), -k)[-k:]
+            best_i, best_j, best_r = best_i[keep], best_j[keep], best_r[keep]
+
+    order = np.argsort(-np.abs(best_r))
+    return [(int(best_i[o]), int(best_j[o]), float(best_r[o])) for o in order]
+
+
+def cluster_order(C):
+    """
+    Leaf order of a hierarchical clustering on 1 - |r|, grouping correlated features
+
+    Falls back to the original order when scipy is unavailable.
+    """
+    p = C.shape[0]
+    if p < 3:
+        return np.arange(p)
+    try:
+        from scipy.cluster.hierarchy import linkage, leaves_list
+        from scipy.spatial.distance import squareform
+    except ImportError:
+        return np.arange(p)
+    distance = 1 - np.abs(np.nan_to_num(C.astype(np.float64), nan=0.0))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0)
+    return leaves_list(linkage(squareform(distance, checks=False), method='average'))
+
+
+def correlation_analysis(X, top_k=20, max_matrix_features=500, block_size=1024, cluster=True):
+    """
+    Correlation summary of a numeric dataframe as float32 arrays
+
+    Wide data (more than `max_matrix_features` features) only gets a matrix over
+    the features that take part in the strongest pairs.
+
+    Args:
+        X (pd.DataFrame): Numeric features
+        top_k (int): Number of strongest pairs to report
+        max_matrix_features (int): Largest feature count for which the full matrix is kept
+        block_size (int): Features per block of the matrix products
+        cluster (bool): Reorder matrix features so correlated ones sit together
+
+    Returns:
+        dict: 'features' (names of the matrix rows/columns), 'matrix' (float32
+            array), 'order' (display order into 'features') and 'top_pairs'
+    """
+    names = list(X.columns)
+    Z, constant = standardize(X.to_numpy(dtype=np.float64, na_value=np.nan))
+    pairs = top_k_pairs(Z, top_k, block_size)
+    return _summarize(
+        names, pairs, lambda idx: correlation_matrix(Z[:, idx], constant[idx], block_size),
+        max_matrix_features, cluster
+    )
+
+
+def _summarize(names, pairs, matrix_for, max_matrix_features, cluster):
+    """Pick the matrix features, order them and format the strongest pairs"""
+    if len(names) <= max_matrix_features:
+        idx = np.arange(len(names))
+    else:
+        idx = np.unique([i for pair in pairs for i in pair[:2]])[:max_matrix_features]
+
+    matrix = matrix_for(idx)
+    order = cluster_order(matrix) if cluster else np.arange(len(idx))
+    return {
+        'features': [names[i] for i in idx],
+        'matrix': matrix,
+        'order': order,
+        'top_pairs': [
+            {'feature_a': names[i], 'feature_b': names[j], 'correlation': r}
+            for i, j, r in pairs
+        ]
+    }
+
+
+class StreamingCorrelation:
+    """
+    Pearson correlations of data that arrives in row blocks.
+
+    Accumulates the column sums and the cross-product matrix X^T X of the rows,
+    shifted by the first block's column means for numerical stability, so memory
+    is p x p regardless of the number of rows. Accumulators over the same features
+    can be merged. Rows should be complete; missing values count as the shift.
+    """
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.count = 0
+        self.shift = None
+        self.sums = np.zeros(n_features)
+        self.cross = np.zeros((n_features, n_features))
+
+    def update(self, values):
+        """Add a block of rows (2-D float array) to the accumulators"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0))
+        centered = np.nan_to_num(values - self.shift)
+        self.count += len(values)
+        self.sums += centered.sum(axis=0)
+        self.cross += centered.T @ centered
+        return self
+
+    def merge(self, other):
+        """Combine another StreamingCorrelation over the same features into this one"""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.count, self.shift = other.count, other.shift.copy()
+            self.sums, self.cross = other.sums.copy(), other.cross.copy()
+            return self
+        # Move the other accumulators onto this shift: x - a = (x - b) + (b - a)
+        d = other.shift - self.shift
+        self.cross += other.cross + np.outer(other.sums, d) + np.outer(d, other.sums) + other.count * np.outer(d, d)
+        self.sums += other.sums + other.count * d
+        self.count += other.count
+        return self
+
+    def matrix(self, dtype=np.float32):
+        """The p x p correlation matrix; rows and columns of constant features are NaN"""
+        p = self.n_features
+        if not self.count:
+            return np.full((p, p), np.nan, dtype=dtype)
+        mean = self.sums / self.count
+        cov = self.cross / self.count - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        constant = std <= 1e-12 * np.maximum(np.abs(self.shift), 1)
+        scale = np.where(constant, 1.0, std)
+        C = cov / np.outer(scale, scale)
+        np.clip(C, -1, 1, out=C)
+        np.fill_diagonal(C, 1)
+        C[constant, :] = np.nan
+        C[:, constant] = np.nan
+        return C.astype(dtype)
+
+    def result(self, names, top_k=20, max_matrix_features=500, cluster=True):
+        """Correlation summary in the same layout as correlation_analysis"""
+        C = self.matrix()
+        return _summarize(
+            list(names), _top_pairs_from_matrix(C, top_k),
+            lambda idx: C[np.ix_(idx, idx)], max_matrix_features, cluster
+        )
+
+
+def _top_pairs_from_matrix(C, k):
+    """Strongest absolute off-diagonal correlations of a full matrix as (i, j, r) tuples"""
+    p = C.shape[0]
+    strength = np.abs(np.nan_to_num(C, nan=0.0))
+    strength[np.tril_indices(p)] = -1
+    flat = strength.ravel()
+    n_pairs = p * (p - 1) // 2
+    k = min(k, n_pairs)
+    if k == 0:
+        return []
+    keep = np.argpartition(flat, -k)[-k:]
+    keep = keep[np.argsort(-flat[keep])]
+    rows, cols = np.unravel_index(keep, C.shape)
+    return [(int(i), int(j), float(C[i, j])) for i, j in zip(rows, cols)]
@@ -1,76 +1,251 @@
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+import joblib
+import threading
+from collections import OrderedDict
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DashboardAgent:
-    def __init__(self):
-        pass
+    FIGURES = (
+        'feature_importance', 'correlation_heatmap', 'feature_distributions',
+        'metrics', 'target_distribution'
+    )
+    # Built by figure() when the results include a stage profile
+    OPTIONAL_FIGURES = ('profile',)
+    
+    def __init__(self, max_features=30, max_heatmap_features=50, max_box_points=2000,
+                 max_categories=20, max_figure_bytes=1_000_000, max_cached_figures=50):
+        """
+        Args:
+            max_features (int): Bars shown in the feature importance plot; the rest
+                are summed into an "Other" bar
+            max_heatmap_features (int): Rows/columns of the correlation heatmap; larger
+                matrices are averaged over groups of neighbouring (clustered) features
+            max_box_points (int): Above this many features the distribution boxes are
+                sent as precomputed quartiles instead of raw points
+            max_categories (int): Slices of the target distribution before the
+                remaining classes are grouped (or a numeric target is binned)
+            max_figure_bytes (int): Size budget for a figure's JSON; figures over it
+                are rebuilt with halved limits
+            max_cached_figures (int): Figures kept by figure() before the least
+                recently used are dropped
+        """
+        self.max_features = max_features
+        self.max_heatmap_features = max_heatmap_features
+        self.max_box_points = max_box_points
+        self.max_categories = max_categories
+        self.max_figure_bytes = max_figure_bytes
+        self.figure_sizes = {}
+        self.max_cached_figures = max_cached_figures
+        self._figure_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
     def create_visualizations(self, analysis_results, feature_importance, model_results):
         """
         Create interactive visualizations for the ML workflow results
         
         Args:
-            analysis_results (dict): Results from analysis agent
-            feature_importance (dict): Feature importance scores
+            analysis_results (AnalysisResults): Results from analysis agent
+            feature_importance (FeatureImportance): Feature importance scores
             model_results (dict): Model evaluation results
             
         Returns:
             dict: Dictionary containing plotly figures
         """
         try:
-            figures = {
-                'feature_importance': self._plot_feature_importance(feature_importance),
-                'correlation_heatmap': self._plot_correlation_heatmap(analysis_results),
-                'feature_distributions': self._plot_feature_distributions(analysis_results),
-                'metrics': self._plot_metrics(model_results),
-                'target_distribution': self._plot_target_distribution(analysis_results)
+            return {
+                name: self._build_figure(name, analysis_results, feature_importance, model_results)[0]
+                for name in self.FIGURES
             }
             
-            return figures
-            
         except Exception as e:
             logger.error(f"Error creating visualizations: {str(e)}")
             raise
             
-    def _plot_feature_importance(self, feature_importance):
-        """Create feature importance plot"""
-        df = pd.DataFrame(list(feature_importance['feature_importance'].items()),
-                         columns=['Feature', 'Importance'])
+    @staticmethod
+    def results_key(results):
+        """Content hash of workflow results, used to key the figure cache"""
+        return joblib.hash({
+            part: results[part]
+            for part in ('analysis_results', 'feature_importance', 'model_results', 'profile')
+            if part in results
+        })
+        
+    def figure(self, name, results, results_key=None, as_json=False):
+        """
+        Build one figure on first request and reuse it for the same results
+        
+        Args:
+            name (str): One of FIGURES or OPTIONAL_FIGURES
+            results (dict): Output of MLWorkflowOrchestrator.run_workflow
+            results_key (str): Precomputed results_key(results), to skip rehashing
+            as_json (bool): Return the figure's serialized Plotly JSON instead
+            
+        Returns:
+            plotly.graph_objects.Figure or str: The figure, or its JSON
+        """
+        if name not in self.FIGURES + self.OPTIONAL_FIGURES:
+            raise ValueError(f"Unknown figure '{name}'. Expected one of {self.FIGURES + self.OPTIONAL_FIGURES}")
+        key = (results_key or self.results_key(results), name)
+        with self._cache_lock:
+            cached = self._figure_cache.get(key)
+            if cached is not None:
+                self._figure_cache.move_to_end(key)
+        
+        if cached is None:
+            try:
+                if name == 'profile':
+                    cached = self._within_budget(
+                        'profile', None, lambda limit: self._plot_profile(results['profile'])
+                    )
+                else:
+                    cached = self._build_figure(
+                        name, results['analysis_results'], results['feature_importance'], results['model_results']
+                    )
+            except Exception as e:
+                logger.error(f"Error creating visualization '{name}': {str(e)}")
+                raise
+            with self._cache_lock:
+                self._figure_cache[key] = cached
+                while len(self._figure_cache) > self.max_cached_figures:
+                    self._figure_cache.popitem(last=False)
+        
+        fig, fig_json = cached
+        return fig_json if as_json else fig
+        
+    def _build_figure(self, name, analysis_results, feature_importance, model_results):
+        """Build a figure within the size budget; returns (figure, JSON)"""
+        builders = {
+            'feature_importance': (
+                self.max_features,
+                lambda limit: self._plot_feature_importance(feature_importance, limit)
+            ),
+            'correlation_heatmap': (
+                self.max_heatmap_features,
+                lambda limit: self._plot_correlation_heatmap(analysis_results, limit)
+            ),
+            'feature_distributions': (
+                self.max_box_points,
+                lambda limit: self._plot_feature_distributions(analysis_results, limit)
+            ),
+            'metrics': (
+                None,
+                lambda limit: self._plot_metrics(model_results)
+            ),
+            'target_distribution': (
+                self.max_categories,
+                lambda limit: self._plot_target_distribution(analysis_results, limit)
+            )
+        }
+        limit, build = builders[name]
+        return self._within_budget(name, limit, build)
+        
+    def _within_budget(self, name, limit, build, min_limit=5):
+        """Build a figure, halving its limit until its JSON fits in max_figure_bytes"""
+        while True:
+            fig = build(limit)
+            fig_json = fig.to_json()
+            size = len(fig_json)
+            if size <= self.max_figure_bytes or limit is None or limit <= min_limit:
+                break
+            logger.info(f"Figure '{name}' is {size / 1e6:.1f} MB, rebuilding with limit {limit // 2}")
+            limit = max(limit // 2, min_limit)
+        if size > self.max_figure_bytes:
+            logger.warning(f"Figure '{name}' is {size / 1e6:.1f} MB, over the {self.max_figure_bytes / 1e6:.1f} MB budget")
+        self.figure_sizes[name] = size
+        return fig, fig_json
+        
+    @staticmethod
+    def _top_n(names, values, limit, label):
+        """Keep the first limit - 1 of the (sorted) names and values and sum the rest into one item"""
+        if len(names) <= limit:
+            return names, values
+        rest = len(names) - (limit - 1)
+        return (
+            np.append(names[:limit - 1].astype(str), f"Other ({rest} {label})"),
+            np.append(values[:limit - 1], values[limit - 1:].sum())
+        )
+        
+    def _plot_feature_importance(self, feature_importance, limit):
+        """Create feature importance plot of the top features"""
+        names, scores = self._top_n(feature_importance.names, feature_importance.scores, limit, "features")
+        df = pd.DataFrame({'Feature': names, 'Importance': scores})
         fig = px.bar(df, x='Importance', y='Feature', orientation='h',
                     title='Feature Importance',
                     labels={'Importance': 'Importance Score', 'Feature': 'Feature Name'})
         fig.update_layout(yaxis={'categoryorder': 'total ascending'})
         return fig
         
-    def _plot_correlation_heatmap(self, analysis_results):
-        """Create correlation heatmap"""
-        corr_matrix = pd.DataFrame(analysis_results['correlation_matrix'])
-        fig = px.imshow(corr_matrix,
-                       title='Feature Correlation Matrix',
+    def _plot_correlation_heatmap(self, analysis_results, limit):
+        """Create correlation heatmap, averaged over clustered feature groups when it is large"""
+        correlation = analysis_results.correlation
+        order = correlation.order
+        features = correlation.features[order].tolist()
+        matrix = correlation.matrix[np.ix_(order, order)]
+        title = 'Feature Correlation Matrix'
+        if len(features) > limit:
+            matrix, features = self._aggregate_matrix(matrix, features, limit)
+            title += ' (mean correlation of feature groups)'
+        fig = px.imshow(matrix,
+                       x=features, y=features,
+                       title=title,
                        labels=dict(color="Correlation"),
-                       color_continuous_scale='RdBu')
+                       color_continuous_scale='RdBu',
+                       zmin=-1, zmax=1)
         return fig
         
-    def _plot_feature_distributions(self, analysis_results):
+    @staticmethod
+    def _aggregate_matrix(matrix, features, n_groups):
+        """Average a square matrix over n_groups contiguous blocks, ignoring NaNs"""
+        n = len(features)
+        starts = np.linspace(0, n, n_groups + 1).astype(int)[:-1]
+        sizes = np.diff(np.append(starts, n))
+        valid = ~np.isnan(matrix)
+        sums = np.add.reduceat(np.add.reduceat(np.where(valid, matrix, 0.0), starts, axis=0), starts, axis=1)
+        counts = np.add.reduceat(np.add.reduceat(valid.astype(np.int64), starts, axis=0), starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (sums / counts).astype(np.float32)
+        labels = [
+            features[start] if size == 1 else f"{features[start]} (+{size - 1})"
+            for start, size in zip(starts, sizes)
+        ]
+        return means, labels
+        
+    def _plot_feature_distributions(self, analysis_results, limit):
         """Create feature distribution plots"""
-        distributions = analysis_results['feature_distributions']
-        df = pd.DataFrame(distributions).T
+        stats = analysis_results.features
         
         fig = go.Figure()
-        for col in df.columns:
-            if col not in ['skew', 'kurtosis']:
-                fig.add_trace(go.Box(y=df[col], name=col))
+        for col in ('mean', 'median', 'std'):
+            values = getattr(stats, col)
+            if len(stats) <= limit:
+                fig.add_trace(go.Box(y=values, name=col))
+            else:
+                fig.add_trace(self._precomputed_box(values, col))
                 
         fig.update_layout(title='Feature Distributions',
                          yaxis_title='Value',
                          showlegend=False)
         return fig
         
+    @staticmethod
+    def _precomputed_box(values, name):
+        """Box trace from quartiles and Tukey fences, without sending the raw values"""
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return go.Box(x=[name], name=name, q1=[np.nan], median=[np.nan], q3=[np.nan])
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        return go.Box(x=[name], name=name, q1=[q1], median=[median], q3=[q3],
+                      lowerfence=[inside.min()], upperfence=[inside.max()],
+                      mean=[values.mean()])
+        
     def _plot_metrics(self, model_results):
         """Create model metrics visualization"""
         metrics = model_results['metrics']
@@ -81,12 +256,37 @@ class DashboardAgent:
                     labels={'Value': 'Score', 'Metric': 'Metric Name'})
         return fig
         
-    def _plot_target_distribution(self, analysis_results):
-        """Create target distribution plot"""
-        target_dist = analysis_results['target_distribution']['value_counts']
-        df = pd.DataFrame(list(target_dist.items()), columns=['Class', 'Count'])
+    def _plot_profile(self, profile):
+        """Create per-stage time and memory bars from a StageProfiler report"""
+        df = pd.DataFrame(profile).T
+        stages = list(df.index)
+        fig = make_subplots(rows=1, cols=2, subplot_titles=('Time (s)', 'Memory (MB)'))
+        for column, label in (('wall_time', 'Wall time'), ('process_cpu_time', 'CPU time')):
+            fig.add_trace(go.Bar(x=stages, y=df[column], name=label), row=1, col=1)
+        for column, label in (('tracemalloc_peak', 'Allocation peak'), ('max_rss_increase', 'Max RSS increase')):
+            if column in df:
+                fig.add_trace(go.Bar(x=stages, y=df[column] / 1e6, name=label), row=1, col=2)
+        fig.update_layout(title='Stage Profile', barmode='group')
+        return fig
+        
+    def _plot_target_distribution(self, analysis_results, limit):
+        """Create target distribution plot; many-valued targets are grouped or binned"""
+        target = analysis_results.target
+        
+        if len(target.values) > limit and np.issubdtype(target.values.dtype, np.number):
+            # A numeric target with many distinct values (regression) reads better as a histogram
+            hist, edges = np.histogram(target.values.astype(np.float64), bins=limit,
+                                       weights=target.counts)
+            fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=hist,
+                                   width=np.diff(edges)))
+            fig.update_layout(title='Target Distribution',
+                             xaxis_title='Target', yaxis_title='Count')
+            return fig
+        
+        classes, counts = self._top_n(target.values, target.counts, limit, "classes")
+        df = pd.DataFrame({'Class': classes, 'Count': counts})
         
         fig = px.pie(df, values='Count', names='Class',
                     title='Target Distribution',
                     hole=0.3)
-        return fig 
\ No newline at end of file
+        return fig
@@ -1,109 +1,335 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.model_selection import train_test_split
+from pandas.api.types import union_categoricals
+from agents.preprocessing import PreprocessingPipeline
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DataAgent:
     def __init__(self):
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
+        self.pipeline = None
+        self.load_report = {}
         
-    def load_data(self, file_path):
+    def load_data(self, file_path, optimize_memory=False, engine=None, usecols=None,
+                  sample_frac=None, chunksize=100_000, category_threshold=0.5, random_state=42,
+                  downcast_floats=True):
         """
-        Load data from CSV or Excel file
+        Load data from CSV, Excel or Parquet file
         
         Args:
             file_path (str): Path to the data file
+            optimize_memory (bool): Read in chunks and downcast dtypes (int8/16/32,
+                float32, category for low-cardinality strings)
+            engine (str): CSV parser engine; 'pyarrow' streams record batches through pyarrow
+            usecols (list): Only load these columns
+            sample_frac (float): Keep a random fraction of the rows, e.g. for analysis
+            chunksize (int): Rows per chunk when reading in memory-optimized mode
+            category_threshold (float): Max ratio of unique values to rows for a
+                string column to be stored as category
+            random_state (int): Seed for row sampling
+            downcast_floats (bool): With optimize_memory, store non-integral floats as
+                float32; this rounds values, so pass False to keep the optimization lossless
             
         Returns:
             pd.DataFrame: Loaded data
         """
         try:
+            self.load_report = {}
             if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
+                if optimize_memory or engine == 'pyarrow':
+                    chunks = self._iter_csv_chunks(file_path, engine, usecols, chunksize)
+                    df = self._concat_optimized_chunks(
+                        chunks, optimize_memory, sample_frac, category_threshold, random_state,
+                        downcast_floats
+                    )
+                else:
+                    df = pd.read_csv(file_path, usecols=usecols)
             elif file_path.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, usecols=usecols)
+            elif file_path.endswith('.parquet'):
+                df = pd.read_parquet(file_path, columns=usecols)
             else:
-                raise ValueError("Unsupported file format. Please use CSV or Excel files.")
-            
-            logger.info(f"Successfully loaded data from {file_path}")
+                raise ValueError("Unsupported file format. Please use CSV, Excel or Parquet files.")
+
+            if not self.load_report:
+                self.load_report['memory_before'] = int(df.memory_usage(deep=True).sum())
+                if sample_frac is not None:
+                    df = df.sample(frac=sample_frac, random_state=random_state)
+                if optimize_memory:
+                    df = self._optimize_dtypes(df, category_threshold, downcast_floats)
+            self.load_report['memory_after'] = int(df.memory_usage(deep=True).sum())
+            self.load_report['rows'] = len(df)
+
+            logger.info(
+                f"Successfully loaded data from {file_path} "
+                f"({self.load_report['memory_before'] / 1e6:.1f} MB parsed, "
+                f"{self.load_report['memory_after'] / 1e6:.1f} MB in memory)"
+            )
             return df
             
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
             raise
-            
-    def preprocess_data(self, df, target_column):
+
+    def _iter_csv_chunks(self, file_path, engine, usecols, chunksize):
+        """Yield the CSV file as DataFrame chunks of roughly `chunksize` rows"""
+        if engine == 'pyarrow':
+            try:
+                from pyarrow import csv as pa_csv
+            except ImportError:
+                raise ImportError("The 'pyarrow' engine requires the pyarrow package.")
+            reader = pa_csv.open_csv(
+                file_path,
+                read_options=pa_csv.ReadOptions(block_size=1 << 24),
+                convert_options=pa_csv.ConvertOptions(include_columns=usecols, strings_can_be_null=True)
+            )
+            for batch in reader:
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path, usecols=usecols, chunksize=chunksize, engine=engine)
+
+    def iter_chunks(self, file_path, chunksize=100_000, usecols=None, engine=None):
+        """
+        Yield a CSV or Parquet file as DataFrame chunks without loading all of it
+        
+        Args:
+            file_path (str): Path to a CSV or Parquet file
+            chunksize (int): Rows per chunk (CSV with the pyarrow engine uses its own block size)
+            usecols (list): Only read these columns
+            engine (str): CSV parser engine, e.g. 'pyarrow'
+        """
+        if file_path.endswith('.csv'):
+            yield from self._iter_csv_chunks(file_path, engine, usecols, chunksize)
+        elif file_path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize, columns=usecols):
+                yield batch.to_pandas()
+        else:
+            raise ValueError("Streaming requires a CSV or Parquet file.")
+
+    def _concat_optimized_chunks(self, chunks, optimize_memory, sample_frac,
+                                 category_threshold, random_state, downcast_floats=True):
+        """Sample and downcast each chunk before concatenating so peak memory stays bounded"""
+        parts = []
+        memory_before = 0
+        rng = np.random.default_rng(random_state)
+        for chunk in chunks:
+            memory_before += int(chunk.memory_usage(deep=True).sum())
+            if sample_frac is not None:
+                chunk = chunk.sample(frac=sample_frac, random_state=rng)
+            if optimize_memory:
+                chunk = self._optimize_dtypes(chunk, category_threshold, downcast_floats)
+            parts.append(chunk)
+        self.load_report['memory_before'] = memory_before
+
+        if not parts:
+            return pd.DataFrame()
+        columns = {}
+        for col in parts[0].columns:
+            pieces = [part[col] for part in parts]
+            if all(isinstance(p.dtype, pd.CategoricalDtype) for p in pieces):
+                # Concatenating categoricals with different categories would fall back to object
+                columns[col] = pd.Series(union_categoricals(pieces, ignore_order=True), name=col)
+            else:
+                columns[col] = pd.concat(pieces, ignore_index=True)
+        df = pd.DataFrame(columns)
+        # Dtypes chosen per chunk may disagree; settle them over the whole column
+        return self._optimize_dtypes(df, category_threshold, downcast_floats) if optimize_memory else df
+
+    def _optimize_dtypes(self, df, category_threshold=0.5, downcast_floats=True):
+        """Downcast numeric columns and store low-cardinality strings as category"""
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if pd.api.types.is_integer_dtype(series) or (
+                    pd.api.types.is_float_dtype(series) and self._is_whole(series)):
+                df[col] = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(series):
+                if downcast_floats:
+                    df[col] = series.astype(np.float32)
+            elif series.dtype == object or pd.api.types.is_string_dtype(series):
+                if len(series) and series.nunique(dropna=True) / len(series) <= category_threshold:
+                    df[col] = series.astype('category')
+        return df
+
+    @staticmethod
+    def _is_whole(series):
+        """True when a float column holds only integral values and no missing values"""
+        values = series.to_numpy()
+        return not series.isna().any() and bool(np.all(np.mod(values, 1) == 0))
+
+    def preprocess_data(self, df, target_column, test_size=0.2, random_state=42,
+                        pipeline_options=None):
         """
         Preprocess the data for machine learning
         
+        The data is split first and the preprocessing pipeline is fitted on the
+        training rows only, then applied to both splits.
+        
         Args:
             df (pd.DataFrame): Input dataframe
             target_column (str): Name of the target column
+            test_size (float): Fraction of rows held out for testing
+            random_state (int): Seed for the train/test split
+            pipeline_options (dict): Keyword arguments for PreprocessingPipeline, e.g.
+                {'max_categories': 500, 'high_cardinality': 'hash'}
             
         Returns:
-            dict: Preprocessed data including train and test sets
+            dict: Preprocessed data including train and test sets and the fitted pipeline
         """
         try:
-            # Handle missing values
-            df = self._handle_missing_values(df)
+            # Rows without a target cannot be used for training or evaluation
+            if df[target_column].isna().any():
+                logger.info(f"Dropping {int(df[target_column].isna().sum())} rows with missing target")
+                df = df[df[target_column].notna()]
             
-            # Encode categorical variables
-            df = self._encode_categorical_variables(df, target_column)
-            
-            # Split features and target
-            X = df.drop(columns=[target_column])
+            feature_names = [col for col in df.columns if col != target_column]
             y = df[target_column]
             
-            # Scale numerical features
-            X = self._scale_features(X)
+            # Factorize string columns once; fitting and both transforms then only touch codes
+            text_columns = [
+                col for col in feature_names
+                if not pd.api.types.is_numeric_dtype(df[col])
+                and not isinstance(df[col].dtype, pd.CategoricalDtype)
+            ]
+            if text_columns:
+                df = df.copy(deep=False)
+                for col in text_columns:
+                    df[col] = df[col].astype('category')
             
-            # Split into train and test sets
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+            # Split row positions so the features are only copied once, column by column
+            train_rows, test_rows = train_test_split(
+                np.arange(len(df)), test_size=test_size, random_state=random_state
             )
             
+            self.pipeline = PreprocessingPipeline(**(pipeline_options or {}))
+            self.pipeline.fit(df, feature_names, rows=train_rows)
+            
             return {
-                'X_train': X_train,
-                'X_test': X_test,
-                'y_train': y_train,
-                'y_test': y_test,
-                'feature_names': X.columns.tolist()
+                'X_train': self.pipeline.transform(df, rows=train_rows),
+                'X_test': self.pipeline.transform(df, rows=test_rows),
+                'y_train': y.iloc[train_rows],
+                'y_test': y.iloc[test_rows],
+                'feature_names': feature_names,
+                'pipeline': self.pipeline
             }
             
         except Exception as e:
             logger.error(f"Error preprocessing data: {str(e)}")
             raise
-            
-    def _handle_missing_values(self, df):
-        """Handle missing values in the dataset"""
-        # For numerical columns, fill with median
-        numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        df[numerical_cols] = df[numerical_cols].fillna(df[numerical_cols].median())
-        
-        # For categorical columns, fill with mode
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        df[categorical_cols] = df[categorical_cols].fillna(df[categorical_cols].mode().iloc[0])
-        
-        return df
+
+    def fit_streaming(self, file_path, target_column, chunksize=100_000, test_size=0.2,
+                      holdout_size=20_000, collect_classes=False, engine=None, random_state=42,
+                      pipeline_options=None):
+        """
+        First pass of the streaming workflow: fit the preprocessing pipeline chunk by chunk
         
-    def _encode_categorical_variables(self, df, target_column):
-        """Encode categorical variables using Label Encoding"""
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        Every labelled row is assigned to training or held-out with probability
+        `test_size`, reproducibly, so `iter_training_batches` sees the same split.
+        Memory is bounded by one chunk plus at most `holdout_size` held-out rows.
         
-        for col in categorical_cols:
-            if col != target_column:
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col])
-                self.label_encoders[col] = le
+        Args:
+            file_path (str): Path to a CSV or Parquet file
+            target_column (str): Name of the target column
+            chunksize (int): Rows read at a time
+            test_size (float): Fraction of rows held out from training
+            holdout_size (int): Held-out rows kept (a uniform sample) for evaluation
+            collect_classes (bool): Collect the distinct target values of the training rows
+            engine (str): CSV parser engine, e.g. 'pyarrow'
+            random_state (int): Seed for the split
+            pipeline_options (dict): Keyword arguments for PreprocessingPipeline
+            
+        Returns:
+            dict: Held-out rows preprocessed as 'X_test'/'y_test', 'feature_names',
+                the fitted 'pipeline' and 'classes' (or None)
+        """
+        try:
+            self.pipeline = PreprocessingPipeline(**{'random_state': random_state, **(pipeline_options or {})})
+            self.load_report = {'rows': 0, 'train_rows': 0, 'chunks': 0, 'memory_before': 0}
+            feature_names = None
+            classes = set()
+            holdout, holdout_keys = None, np.empty(0)
+            
+            for chunk, train_rows, test_rows, keys in self._iter_split(
+                    file_path, target_column, chunksize, test_size, engine, random_state):
+                if feature_names is None:
+                    feature_names = [col for col in chunk.columns if col != target_column]
+                self.load_report['rows'] += len(chunk)
+                self.load_report['train_rows'] += len(train_rows)
+                self.load_report['chunks'] += 1
+                self.load_report['memory_before'] = max(
+                    self.load_report['memory_before'], int(chunk.memory_usage(deep=True).sum())
+                )
                 
-        return df
+                if len(train_rows):
+                    self.pipeline.partial_fit(chunk, feature_names, rows=train_rows)
+                    if collect_classes:
+                        classes.update(chunk[target_column].iloc[train_rows].unique().tolist())
+                
+                # Keep a bottom-k uniform sample of the held-out rows
+                rows = chunk.iloc[test_rows]
+                holdout = rows if holdout is None else pd.concat([holdout, rows], ignore_index=True)
+                holdout_keys = np.concatenate([holdout_keys, keys[test_rows]])
+                if len(holdout_keys) > holdout_size:
+                    keep = np.sort(np.argpartition(holdout_keys, holdout_size)[:holdout_size])
+                    holdout, holdout_keys = holdout.iloc[keep].reset_index(drop=True), holdout_keys[keep]
+            
+            if feature_names is None or not self.load_report['train_rows']:
+                raise ValueError("No labelled training rows found in the data")
+            if holdout is None or not len(holdout):
+                raise ValueError("No rows were held out for evaluation; increase test_size")
+            
+            self.load_report['memory_after'] = int(holdout.memory_usage(deep=True).sum())
+            logger.info(
+                f"Streamed {self.load_report['rows']} rows in {self.load_report['chunks']} chunks "
+                f"from {file_path}, holding out {len(holdout)} rows"
+            )
+            return {
+                'X_test': self.pipeline.transform(holdout),
+                'y_test': holdout[target_column],
+                'feature_names': feature_names,
+                'pipeline': self.pipeline,
+                'classes': np.array(sorted(classes)) if collect_classes else None
+            }
+            
+        except Exception as e:
+            logger.error(f"Error fitting streaming preprocessing: {str(e)}")
+            raise
+
+    def iter_training_batches(self, file_path, target_column, chunksize=100_000, test_size=0.2,
+                              engine=None, random_state=42):
+        """
+        Yield (X, y) batches of preprocessed training rows, using the split of fit_streaming
         
-    def _scale_features(self, X):
-        """Scale numerical features using StandardScaler"""
-        numerical_cols = X.select_dtypes(include=['int64', 'float64']).columns
-        X[numerical_cols] = self.scaler.fit_transform(X[numerical_cols])
-        return X 
\ No newline at end of file
+        Args:
+            file_path (str): Path to a CSV or Parquet file
+            target_column (str): Name of the target column
+            chunksize (int): Rows read at a time
+            test_size (float): Same value as passed to fit_streaming
+            engine (str): CSV parser engine, e.g. 'pyarrow'
+            random_state (int): Same seed as passed to fit_streaming
+        """
+        if self.pipeline is None or not self.pipeline.fitted:
+            raise ValueError("fit_streaming must run before iter_training_batches.")
+        for chunk, train_rows, _, _ in self._iter_split(
+                file_path, target_column, chunksize, test_size, engine, random_state):
+            if len(train_rows):
+                yield self.pipeline.transform(chunk, rows=train_rows), chunk[target_column].iloc[train_rows]
+
+    def _iter_split(self, file_path, target_column, chunksize, test_size, engine, random_state):
+        """Chunks with positions of their labelled training and held-out rows"""
+        if not 0 < test_size < 1:
+            raise ValueError("test_size must be between 0 and 1 for streaming")
+        rng = np.random.default_rng(random_state)
+        for chunk in self.iter_chunks(file_path, chunksize, engine=engine):
+            if target_column not in chunk.columns:
+                raise ValueError(f"Target column '{target_column}' not found in {file_path}")
+            draws = rng.random(len(chunk))
+            held_out = draws < test_size
+            labelled = chunk[target_column].notna().to_numpy()
+            # Held-out draws are uniform on [0, test_size), so they double as sampling keys
+            yield (chunk, np.flatnonzero(labelled & ~held_out),
+                   np.flatnonzero(labelled & held_out), draws / test_size)
@@ -1,20 +1,34 @@
+import time
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.base import clone
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     mean_squared_error, r2_score, mean_absolute_error
 )
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import ParameterGrid, train_test_split
+from agents.search import (
+    TimeBudgetedSearch, WarmStartForestSearch, IncrementalSearch, SearchCancelled,
+    CancellableGridSearchCV, CancellableHalvingGridSearchCV
+)
+from agents.model_registry import get_estimator_spec, importance_scores
+from agents.resources import CpuBudget
 import logging
 
 logger = logging.getLogger(__name__)
 
+SEARCH_STRATEGIES = ('grid', 'halving', 'random', 'warm_start')
+
 class ModelAgent:
     def __init__(self):
         self.model = None
         self.model_type = None
+        self.estimator_name = None
         
-    def train_and_evaluate(self, data_dict, target_column, model_type='classification'):
+    def train_and_evaluate(self, data_dict, target_column, model_type='classification',
+                           search_strategy='grid', time_budget=None, halving_resource='n_estimators',
+                           estimator='random_forest', baseline_first=False,
+                           baseline_estimator='linear', on_baseline=None, n_cpus=None,
+                           cancel_event=None):
         """
         Train and evaluate the machine learning model
         
@@ -22,6 +36,21 @@ class ModelAgent:
             data_dict (dict): Dictionary containing preprocessed data
             target_column (str): Name of the target column
             model_type (str): Type of ML problem ('classification' or 'regression')
+            search_strategy (str): Hyperparameter search: 'grid' (exhaustive), 'halving'
+                (successive halving), 'random' (randomized, stops at time_budget) or
+                'warm_start' (grow one forest until the out-of-bag score plateaus)
+            time_budget (float): Seconds allowed for tuning, refit included: for 'random'
+                (default 60), 'warm_start' and, when given, 'grid'; 'halving' has none
+            halving_resource (str): Resource for 'halving': 'n_estimators' or 'n_samples'
+            estimator (str): Registered estimator backend, e.g. 'random_forest',
+                'hist_gradient_boosting', 'linear' or 'sgd'
+            baseline_first (bool): Fit and evaluate an untuned cheap model before the search
+            baseline_estimator (str): Registered backend used for the baseline
+            on_baseline (callable): Called with the baseline results as soon as they exist
+            n_cpus (int): CPUs for the search and the estimator together; None uses all
+            cancel_event (threading.Event): When set, the search stops at the next
+                candidate batch (grid), rung (halving), fold (random) or step (warm_start)
+                and SearchCancelled is raised
             
         Returns:
             dict: Model evaluation results
@@ -34,8 +63,18 @@ class ModelAgent:
             
             self.model_type = model_type
             
+            # Quick untuned model so a first result is available within seconds
+            baseline = None
+            if baseline_first:
+                baseline = self._train_baseline(X_train, y_train, X_test, y_test, baseline_estimator)
+                if on_baseline is not None:
+                    on_baseline(baseline)
+            
             # Train model with hyperparameter tuning
-            self.model = self._train_model_with_tuning(X_train, y_train)
+            self.model = self._train_model_with_tuning(
+                X_train, y_train, search_strategy, time_budget, halving_resource, estimator,
+                CpuBudget(n_cpus), cancel_event
+            )
             
             # Make predictions
             y_pred = self.model.predict(X_test)
@@ -43,45 +82,186 @@ class ModelAgent:
             # Calculate metrics
             metrics = self._calculate_metrics(y_test, y_pred)
             
-            return {
+            results = {
                 'metrics': metrics,
                 'best_params': self.model.best_params_,
+                'estimator': estimator,
                 'feature_importance': self._get_feature_importance(data_dict['feature_names'])
             }
+            if baseline is not None:
+                results['baseline'] = baseline
+            return results
             
+        except SearchCancelled:
+            logger.info("Model training cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error in model training and evaluation: {str(e)}")
             raise
             
-    def _train_model_with_tuning(self, X_train, y_train):
-        """Train model with hyperparameter tuning using GridSearchCV"""
-        if self.model_type == 'classification':
-            base_model = RandomForestClassifier(random_state=42)
-            param_grid = {
-                'n_estimators': [100, 200],
-                'max_depth': [10, 20, None],
-                'min_samples_split': [2, 5],
-                'min_samples_leaf': [1, 2]
-            }
-        else:
-            base_model = RandomForestRegressor(random_state=42)
-            param_grid = {
-                'n_estimators': [100, 200],
-                'max_depth': [10, 20, None],
-                'min_samples_split': [2, 5],
-                'min_samples_leaf': [1, 2]
+    def start_incremental(self, model_type='classification', estimator='sgd', classes=None):
+        """
+        Prepare out-of-core training of all parameter grid candidates with partial_fit
+        
+        Args:
+            model_type (str): Type of ML problem ('classification' or 'regression')
+            estimator (str): Registered backend that supports partial_fit, e.g. 'sgd'
+            classes (array-like): All target classes; required for classification
+        """
+        spec = get_estimator_spec(estimator, model_type)
+        if not spec['partial_fit']:
+            raise ValueError(f"Estimator '{estimator}' does not support partial_fit; use e.g. 'sgd' for streaming")
+        if model_type == 'classification' and classes is None:
+            raise ValueError("Streaming classification needs the full list of target classes")
+        
+        self.model_type = model_type
+        self.estimator_name = estimator
+        self.model = IncrementalSearch(
+            spec['estimator'],
+            spec['param_grid'],
+            scoring='accuracy' if model_type == 'classification' else 'r2',
+            classes=classes if model_type == 'classification' else None
+        )
+        
+    def partial_fit(self, X, y):
+        """Train the incremental candidates on one batch of training rows"""
+        self.model.partial_fit(X, y)
+        
+    def finish_incremental(self, data_dict, validation_size=0.5, random_state=42,
+                           min_split_rows=20):
+        """
+        Pick the best incremental candidate and evaluate it
+        
+        The held-out rows are split in two: one part selects the candidate, the
+        other is used for the reported metrics. Holdouts too small to split
+        (fewer than `min_split_rows`) are used whole for both, so the metrics are
+        then optimistic.
+        
+        Args:
+            data_dict (dict): Held-out rows as 'X_test'/'y_test' and 'feature_names'
+            validation_size (float): Fraction of the held-out rows used for selection
+            random_state (int): Seed for the validation split
+            min_split_rows (int): Smallest holdout that is split
+            
+        Returns:
+            dict: Model evaluation results in the same layout as train_and_evaluate
+        """
+        try:
+            X_holdout = data_dict['X_test']
+            y_holdout = data_dict['y_test']
+            if len(X_holdout) == 0:
+                raise ValueError("No held-out rows to evaluate the incremental candidates on")
+            if len(X_holdout) < min_split_rows:
+                logger.warning(
+                    f"Only {len(X_holdout)} held-out rows; using all of them for selection and metrics"
+                )
+                val_rows = test_rows = np.arange(len(X_holdout))
+            else:
+                val_rows, test_rows = train_test_split(
+                    np.arange(len(X_holdout)), train_size=validation_size, random_state=random_state
+                )
+            self.model.select(X_holdout.iloc[val_rows], y_holdout.iloc[val_rows])
+            
+            y_pred = self.model.predict(X_holdout.iloc[test_rows])
+            return {
+                'metrics': self._calculate_metrics(y_holdout.iloc[test_rows], y_pred),
+                'best_params': self.model.best_params_,
+                'estimator': self.estimator_name,
+                'feature_importance': self._get_feature_importance(data_dict['feature_names'])
             }
             
-        grid_search = GridSearchCV(
-            base_model,
-            param_grid,
-            cv=5,
-            scoring='accuracy' if self.model_type == 'classification' else 'r2',
-            n_jobs=-1
+        except Exception as e:
+            logger.error(f"Error in incremental model evaluation: {str(e)}")
+            raise
+            
+    def _train_baseline(self, X_train, y_train, X_test, y_test, estimator='linear'):
+        """Fit a registered backend with default parameters and evaluate it"""
+        start = time.perf_counter()
+        model = clone(get_estimator_spec(estimator, self.model_type)['estimator'])
+        model.fit(X_train, y_train)
+        metrics = self._calculate_metrics(y_test, model.predict(X_test))
+        elapsed = time.perf_counter() - start
+        logger.info(f"Baseline {estimator} trained in {elapsed:.1f}s: {metrics}")
+        return {'estimator': estimator, 'metrics': metrics, 'train_time': elapsed}
+        
+    def _train_model_with_tuning(self, X_train, y_train, search_strategy='grid',
+                                 time_budget=None, halving_resource='n_estimators',
+                                 estimator='random_forest', cpu_budget=None, cancel_event=None):
+        """Train model with hyperparameter tuning using the selected search strategy"""
+        if search_strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search_strategy: {search_strategy}")
+        if search_strategy == 'halving' and time_budget is not None:
+            raise ValueError("The 'halving' search cannot honour a time_budget; use 'random' or 'grid'")
+            
+        spec = get_estimator_spec(estimator, self.model_type)
+        base_model = spec['estimator']
+        param_grid = spec['param_grid']
+        scoring = 'accuracy' if self.model_type == 'classification' else 'r2'
+        
+        # Split the CPU budget: concurrent fits first, the rest to threads inside each fit
+        cpu_budget = cpu_budget or CpuBudget()
+        if search_strategy == 'warm_start':
+            n_tasks = 1
+        elif search_strategy == 'random' or time_budget is not None:
+            n_tasks = 5  # candidates run one after another, their folds in parallel
+        else:
+            n_tasks = len(ParameterGrid(param_grid)) * 5
+        n_jobs, estimator_threads = cpu_budget.split(n_tasks)
+        if spec['n_jobs']:
+            base_model.set_params(n_jobs=estimator_threads)
+        logger.info(
+            f"CPU budget {cpu_budget.n_cpus}: {n_jobs} concurrent fits x {estimator_threads} threads"
         )
         
-        grid_search.fit(X_train, y_train)
-        return grid_search
+        if search_strategy == 'halving':
+            if halving_resource == 'n_estimators' and 'n_estimators' in base_model.get_params():
+                # Candidates start with few trees; survivors are refit with more
+                param_grid = {k: v for k, v in param_grid.items() if k != 'n_estimators'}
+                search = CancellableHalvingGridSearchCV(
+                    base_model, param_grid, resource='n_estimators',
+                    min_resources=25, max_resources=200, factor=2,
+                    cv=5, scoring=scoring, n_jobs=n_jobs, random_state=42
+                )
+            else:
+                search = CancellableHalvingGridSearchCV(
+                    base_model, param_grid, resource='n_samples', factor=3,
+                    cv=5, scoring=scoring, n_jobs=n_jobs, random_state=42
+                )
+        elif search_strategy == 'random':
+            search = TimeBudgetedSearch(
+                base_model, spec['param_distributions'], scoring=scoring, cv=5,
+                time_budget=time_budget if time_budget is not None else 60.0, n_jobs=n_jobs,
+                cancel_event=cancel_event
+            )
+        elif search_strategy == 'grid' and time_budget is not None:
+            # Grid candidates in order until the budget is spent
+            search = TimeBudgetedSearch(
+                base_model, param_grid, scoring=scoring, cv=5,
+                time_budget=time_budget, n_jobs=n_jobs, exhaustive=True, cancel_event=cancel_event
+            )
+        elif search_strategy == 'warm_start':
+            if not spec['warm_start']:
+                raise ValueError(f"Estimator '{estimator}' does not support the warm_start strategy")
+            search = WarmStartForestSearch(base_model, time_budget=time_budget, cancel_event=cancel_event)
+        else:
+            search = CancellableGridSearchCV(
+                base_model,
+                param_grid,
+                cv=5,
+                scoring=scoring,
+                n_jobs=n_jobs
+            )
+        
+        if search_strategy in ('grid', 'halving') and time_budget is None:
+            search.cancel_event = cancel_event
+        
+        try:
+            with cpu_budget.limits(inner_threads=estimator_threads):
+                search.fit(X_train, y_train)
+        finally:
+            # The event holds a lock, which would keep the fitted search from pickling
+            search.cancel_event = None
+        return search
         
     def _calculate_metrics(self, y_true, y_pred):
         """Calculate evaluation metrics based on model type"""
@@ -101,9 +281,11 @@ class ModelAgent:
             }
             
     def _get_feature_importance(self, feature_names):
-        """Get feature importance from the trained model"""
-        importance_scores = self.model.best_estimator_.feature_importances_
-        feature_importance = dict(zip(feature_names, importance_scores))
+        """Get feature importance from the trained model, or None if it exposes none"""
+        scores = importance_scores(self.model.best_estimator_)
+        if scores is None:
+            return None
+        feature_importance = dict(zip(feature_names, scores))
         
         # Sort features by importance
         sorted_features = sorted(
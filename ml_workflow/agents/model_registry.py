@@ -0,0 +1,143 @@
+from sklearn.ensemble import (
+    RandomForestClassifier, RandomForestRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.linear_model import LogisticRegression, Ridge, SGDClassifier, SGDRegressor
+from scipy.stats import randint, loguniform
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# name -> {'factory': callable(model_type) -> spec dict, 'warm_start': bool, 'partial_fit': bool, 'n_jobs': bool}
+ESTIMATORS = {}
+
+def register_estimator(name, warm_start=False, partial_fit=False, n_jobs=False):
+    """
+    Register an estimator backend for ModelAgent
+
+    The decorated factory receives the model type ('classification' or
+    'regression') and returns a dict with 'estimator', 'param_grid' (for grid and
+    halving search) and 'param_distributions' (for randomized search).
+
+    Args:
+        name (str): Backend name used to select it per run
+        warm_start (bool): The estimator can grow incrementally with warm_start
+        partial_fit (bool): The estimator supports out-of-core training via partial_fit
+        n_jobs (bool): The estimator parallelizes its own fit through an n_jobs parameter
+    """
+    def decorator(factory):
+        ESTIMATORS[name] = {
+            'factory': factory, 'warm_start': warm_start, 'partial_fit': partial_fit, 'n_jobs': n_jobs
+        }
+        return factory
+    return decorator
+
+def get_estimator_spec(name, model_type):
+    """
+    Build the estimator and search spaces of a registered backend
+
+    Args:
+        name (str): Registered backend name
+        model_type (str): 'classification' or 'regression'
+
+    Returns:
+        dict: 'estimator', 'param_grid', 'param_distributions', 'warm_start', 'partial_fit', 'n_jobs'
+    """
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{name}'. Available: {', '.join(sorted(ESTIMATORS))}")
+    entry = ESTIMATORS[name]
+    spec = entry['factory'](model_type)
+    spec['warm_start'] = entry['warm_start']
+    spec['partial_fit'] = entry['partial_fit']
+    spec['n_jobs'] = entry['n_jobs']
+    return spec
+
+def importance_scores(estimator):
+    """
+    Feature importance of a fitted estimator, in training column order
+
+    Tree models report feature_importances_; linear models the absolute
+    coefficients, averaged over classes for multi-class problems.
+
+    Returns:
+        np.ndarray: One score per feature, or None if the estimator exposes neither
+    """
+    if hasattr(estimator, 'feature_importances_'):
+        return np.asarray(estimator.feature_importances_)
+    if hasattr(estimator, 'coef_'):
+        return np.abs(np.atleast_2d(estimator.coef_)).mean(axis=0)
+    return None
+
+@register_estimator('random_forest', warm_start=True, n_jobs=True)
+def _random_forest(model_type):
+    if model_type == 'classification':
+        estimator = RandomForestClassifier(random_state=42)
+    else:
+        estimator = RandomForestRegressor(random_state=42)
+    return {
+        'estimator': estimator,
+        'param_grid': {
+            'n_estimators': [100, 200],
+            'max_depth': [10, 20, None],
+            'min_samples_split': [2, 5],
+            'min_samples_leaf': [1, 2]
+        },
+        'param_distributions': {
+            'n_estimators': randint(50, 201),
+            'max_depth': [10, 20, None],
+            'min_samples_split': randint(2, 11),
+            'min_samples_leaf': randint(1, 5)
+        }
+    }
+
+@register_estimator('hist_gradient_boosting')
+def _hist_gradient_boosting(model_type):
+    if model_type == 'classification':
+        estimator = HistGradientBoostingClassifier(random_state=42)
+    else:
+        estimator = HistGradientBoostingRegressor(random_state=42)
+    return {
+        'estimator': estimator,
+        'param_grid': {
+            'learning_rate': [0.05, 0.1],
+            'max_leaf_nodes': [15, 31, 63],
+            'l2_regularization': [0.0, 1.0]
+        },
+        'param_distributions': {
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_leaf_nodes': randint(8, 128),
+            'min_samples_leaf': randint(5, 100),
+            'l2_regularization': loguniform(1e-3, 10)
+        }
+    }
+
+@register_estimator('linear')
+def _linear(model_type):
+    if model_type == 'classification':
+        estimator, param = LogisticRegression(max_iter=1000), 'C'
+    else:
+        estimator, param = Ridge(), 'alpha'
+    return {
+        'estimator': estimator,
+        'param_grid': {param: [0.1, 1.0, 10.0]},
+        'param_distributions': {param: loguniform(1e-3, 1e3)}
+    }
+
+@register_estimator('sgd', partial_fit=True)
+def _sgd(model_type):
+    if model_type == 'classification':
+        estimator = SGDClassifier(loss='log_loss', random_state=42)
+    else:
+        estimator = SGDRegressor(random_state=42)
+    return {
+        'estimator': estimator,
+        'param_grid': {
+            'alpha': [1e-5, 1e-4, 1e-3],
+            'penalty': ['l2', 'elasticnet']
+        },
+        'param_distributions': {
+            'alpha': loguniform(1e-6, 1e-2),
+            'penalty': ['l2', 'l1', 'elasticnet']
+        }
+    }
@@ -0,0 +1,372 @@
+import pandas as pd
+import numpy as np
+import joblib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PreprocessingPipeline:
+    """
+    Imputation, categorical encoding and scaling fitted on training rows only.
+
+    Each feature column is processed on its own, so neither fitting nor
+    transforming makes a copy of the whole frame. The fitted pipeline can be
+    saved with joblib and applied to test data, new files or streaming batches.
+
+    Categorical columns are encoded from pandas codes: each column is factorized
+    once (or its existing categorical codes are used) and only the distinct values
+    are looked up in the fitted categories. Categories rarer than `min_frequency`,
+    or beyond the `max_categories` most frequent, share one "other" code; with
+    `high_cardinality='hash'` such wide columns are hashed into `max_categories`
+    buckets instead and keep no mapping at all. Unseen categories get the "other"
+    code of a bucketed column and -1 otherwise. With `scale`, the codes are then
+    standardized like numeric columns, using the mean and spread of the training
+    rows' codes, so linear and SGD models do not see raw code magnitudes.
+
+    For data that does not fit in memory, `partial_fit` accumulates the same
+    statistics chunk by chunk; numeric fill values are then medians of a bounded
+    uniform sample of each column.
+    """
+
+    def __init__(self, scale=True, max_categories=1000, min_frequency=None,
+                 high_cardinality='frequency', median_sample_size=10_000, random_state=42):
+        if high_cardinality not in ('frequency', 'hash'):
+            raise ValueError(f"Unknown high_cardinality strategy: {high_cardinality}")
+        self.scale = scale
+        self.max_categories = max_categories
+        self.min_frequency = min_frequency
+        self.high_cardinality = high_cardinality
+        self.median_sample_size = median_sample_size
+        self.random_state = random_state
+        self.feature_names = []
+        self._reset()
+        self.fitted = False
+
+    def fit(self, df, feature_names=None, rows=None):
+        """
+        Learn fill values, category mappings and scaling parameters
+
+        Args:
+            df (pd.DataFrame): Data containing the feature columns
+            feature_names (list): Feature columns to fit; defaults to all columns
+            rows (np.ndarray): Positional indices of the training rows; defaults to all rows
+
+        Returns:
+            PreprocessingPipeline: The fitted pipeline
+        """
+        try:
+            self.feature_names = list(feature_names if feature_names is not None else df.columns)
+            self._reset()
+
+            for col in self.feature_names:
+                series = self._take(df[col], rows)
+                if pd.api.types.is_numeric_dtype(series):
+                    self._fit_numeric(col, series)
+                else:
+                    self._fit_categorical(col, series)
+
+            self.fitted = True
+            return self
+
+        except Exception as e:
+            logger.error(f"Error fitting preprocessing pipeline: {str(e)}")
+            raise
+
+    def partial_fit(self, df, feature_names=None, rows=None):
+        """
+        Update the statistics with another chunk of training rows
+
+        Whether a column is numeric or categorical is decided by its dtype in the
+        first chunk. The pipeline can transform data after every call.
+
+        Args:
+            df (pd.DataFrame): Chunk containing the feature columns
+            feature_names (list): Feature columns to fit; only read on the first chunk
+            rows (np.ndarray): Positional indices of the training rows in this chunk
+
+        Returns:
+            PreprocessingPipeline: The updated pipeline
+        """
+        try:
+            if self._partial is None:
+                self._reset()
+                self.feature_names = list(feature_names if feature_names is not None else df.columns)
+                self.numeric_columns = [
+                    col for col in self.feature_names if pd.api.types.is_numeric_dtype(df[col])
+                ]
+                self.categorical_columns = [
+                    col for col in self.feature_names if col not in self.numeric_columns
+                ]
+                self._partial = {'rng': np.random.default_rng(self.random_state), 'columns': {}}
+
+            for col in self.numeric_columns:
+                self._partial_fit_numeric(col, self._take(df[col], rows))
+            for col in self.categorical_columns:
+                self._partial_fit_categorical(col, self._take(df[col], rows))
+
+            self.fitted = True
+            return self
+
+        except Exception as e:
+            logger.error(f"Error fitting preprocessing pipeline: {str(e)}")
+            raise
+
+    def transform(self, df, rows=None):
+        """
+        Apply the fitted preprocessing to a dataframe or a batch of new rows
+
+        Args:
+            df (pd.DataFrame): Data containing at least the fitted feature columns
+            rows (np.ndarray): Positional indices of the rows to transform; defaults to all rows
+
+        Returns:
+            pd.DataFrame: Transformed features in the fitted column order
+        """
+        if not self.fitted:
+            raise ValueError("PreprocessingPipeline must be fitted before transform.")
+        missing = [col for col in self.feature_names if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+
+        columns = {}
+        for col in self.feature_names:
+            series = self._take(df[col], rows)
+            if col in self.categories or col in self.hash_buckets:
+                columns[col] = self._transform_categorical(col, series)
+            else:
+                columns[col] = self._transform_numeric(col, series)
+
+        index = df.index if rows is None else df.index[rows]
+        return pd.DataFrame(columns, index=index)
+
+    def fit_transform(self, df, feature_names=None, rows=None):
+        return self.fit(df, feature_names, rows).transform(df, rows)
+
+    def _reset(self):
+        self.numeric_columns = []
+        self.categorical_columns = []
+        self.fill_values = {}
+        self.means = {}
+        self.scales = {}
+        self.categories = {}
+        self.other_codes = {}
+        self.hash_buckets = {}
+        self._partial = None
+
+    def __getstate__(self):
+        # Partial-fit accumulators are only needed while fitting
+        state = self.__dict__.copy()
+        state['_partial'] = None
+        return state
+
+    def save(self, path):
+        """Persist the fitted pipeline with joblib"""
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+    @staticmethod
+    def _take(series, rows):
+        return series if rows is None else series.iloc[rows]
+
+    def _fit_numeric(self, col, series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        observed = values[~np.isnan(values)]
+        fill = float(np.median(observed)) if observed.size else 0.0
+        mean = observed.mean() if observed.size else 0.0
+        self._set_numeric(col, fill, values.size, observed.size, mean, ((observed - mean) ** 2).sum())
+
+    def _partial_fit_numeric(self, col, series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        observed = values[~np.isnan(values)]
+        acc = self._partial['columns'].setdefault(col, {
+            'rows': 0, 'n': 0, 'mean': 0.0, 'm2': 0.0,
+            'keys': np.empty(0), 'sample': np.empty(0)
+        })
+        acc['rows'] += values.size
+        if observed.size:
+            self._update_moments(acc, observed)
+
+            # Bottom-k sample of observed values for the median
+            keys = np.concatenate([acc['keys'], self._partial['rng'].random(observed.size)])
+            sample = np.concatenate([acc['sample'], observed])
+            if keys.size > self.median_sample_size:
+                keep = np.argpartition(keys, self.median_sample_size)[:self.median_sample_size]
+                keys, sample = keys[keep], sample[keep]
+            acc['keys'], acc['sample'] = keys, sample
+
+        fill = float(np.median(acc['sample'])) if acc['sample'].size else 0.0
+        self._set_numeric(col, fill, acc['rows'], acc['n'], acc['mean'], acc['m2'])
+
+    def _set_numeric(self, col, fill, n_rows, n_observed, observed_mean, observed_m2):
+        self.fill_values[col] = fill
+        if col not in self.numeric_columns:
+            self.numeric_columns.append(col)
+
+        if self.scale:
+            # Statistics of the imputed column, as StandardScaler would see it
+            n_missing = n_rows - n_observed
+            mean = (observed_mean * n_observed + fill * n_missing) / n_rows if n_rows else 0.0
+            sq = (observed_m2 + n_observed * (observed_mean - mean) ** 2
+                  + n_missing * (fill - mean) ** 2)
+            std = np.sqrt(sq / n_rows) if n_rows else 0.0
+            self.means[col] = float(mean)
+            self.scales[col] = float(std) if std > 0 else 1.0
+
+    def _fit_categorical(self, col, series):
+        counts = self._value_counts(series)
+        self._set_categories(col, counts, int(counts.sum()), len(series))
+
+    def _partial_fit_categorical(self, col, series):
+        acc = self._partial['columns'].setdefault(col, {'counts': None, 'total': 0, 'rows': 0})
+        if col in self.hash_buckets and self.high_cardinality == 'hash':
+            # Hashed columns need no counts, so ID-like columns stop costing memory;
+            # the bucket mapping is fixed, so the code statistics are updated directly
+            if self.scale:
+                codes = self._encode_categorical(col, series).astype(np.float64)
+                self._update_moments(acc, codes)
+                self._set_code_scale(col, acc['mean'], acc['m2'], acc['n'])
+            return
+        counts = self._value_counts(series)
+        if acc['counts'] is not None:
+            counts = acc['counts'].add(counts, fill_value=0)
+        acc['total'] += int(series.notna().sum())
+        acc['rows'] += len(series)
+        counts = counts.sort_values(ascending=False, kind='stable')
+        if self.max_categories is not None and len(counts) > 10 * self.max_categories:
+            # Approximate heavy hitters: only the most frequent candidates are tracked
+            counts = counts.iloc[:10 * self.max_categories]
+        acc['counts'] = counts
+        self._set_categories(col, counts, acc['total'], acc['rows'])
+        if col in self.hash_buckets and self.high_cardinality == 'hash':
+            acc['counts'] = None
+            if self.scale:
+                # Continue from the statistics of the rows seen so far
+                codes = self._hash(counts.index, self.hash_buckets[col])
+                acc['mean'], acc['m2'], acc['n'] = self._scale_codes(
+                    col, codes, counts.to_numpy(), acc['total'], acc['rows']
+                )
+
+    @staticmethod
+    def _value_counts(series):
+        counts = series.value_counts(dropna=True)
+        # Categorical columns also report unused categories, e.g. those of other rows
+        return counts[counts > 0]
+
+    def _set_categories(self, col, counts, total, n_rows):
+        """Choose the encoding of a column from its value counts (sorted by frequency)"""
+        self.fill_values[col] = counts.index[0] if len(counts) else None
+        if col not in self.categorical_columns:
+            self.categorical_columns.append(col)
+
+        keep = counts
+        if self.min_frequency is not None:
+            threshold = self.min_frequency if self.min_frequency >= 1 else self.min_frequency * total
+            keep = keep[keep >= threshold]
+        if self.max_categories is not None and len(keep) > self.max_categories:
+            if self.high_cardinality == 'hash':
+                self.hash_buckets[col] = self.max_categories
+                self.categories.pop(col, None)
+                self.other_codes.pop(col, None)
+                if self.scale:
+                    codes = self._hash(counts.index, self.max_categories)
+                    self._scale_codes(col, codes, counts.to_numpy(), total, n_rows)
+                return
+            keep = keep.iloc[:self.max_categories]
+
+        try:
+            categories = pd.Index(keep.index).sort_values()
+        except TypeError:
+            # Mixed-type labels cannot be ordered; keep them by frequency
+            categories = pd.Index(keep.index)
+        self.categories[col] = categories
+        self.other_codes[col] = len(categories) if len(keep) < len(counts) else -1
+        self.hash_buckets.pop(col, None)
+        if self.scale:
+            codes = categories.get_indexer(keep.index)
+            self._scale_codes(col, codes, keep.to_numpy(), total, n_rows)
+
+    def _scale_codes(self, col, codes, weights, total, n_rows):
+        """Mean and spread of the training codes, from the counts of the encoded values"""
+        codes = np.asarray(codes, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        # Values outside the kept categories share the "other" code, missing rows the fill code
+        other = total - weights.sum()
+        if other > 0 and self.other_codes.get(col, -1) != -1:
+            codes = np.append(codes, self.other_codes[col])
+            weights = np.append(weights, other)
+        if n_rows > total:
+            codes = np.append(codes, self._missing_code(col))
+            weights = np.append(weights, n_rows - total)
+        n = weights.sum()
+        mean = float((codes * weights).sum() / n) if n else 0.0
+        m2 = float((weights * (codes - mean) ** 2).sum())
+        self._set_code_scale(col, mean, m2, n)
+        return mean, m2, n
+
+    def _set_code_scale(self, col, mean, m2, n):
+        std = np.sqrt(m2 / n) if n else 0.0
+        self.means[col] = float(mean)
+        self.scales[col] = float(std) if std > 0 else 1.0
+
+    @staticmethod
+    def _update_moments(acc, values):
+        # Chan et al. pairwise update of the running mean and squared deviations
+        if not values.size:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        n = acc['n'] + values.size
+        delta = mean - acc['mean']
+        acc['m2'] += m2 + delta ** 2 * acc['n'] * values.size / n
+        acc['mean'] += delta * values.size / n
+        acc['n'] = n
+
+    def _missing_code(self, col):
+        fill = self.fill_values[col]
+        if col in self.hash_buckets:
+            return self._hash([fill], self.hash_buckets[col])[0] if fill is not None else -1
+        missing_code = self.categories[col].get_indexer([fill])[0] if fill is not None else -1
+        return self.other_codes[col] if missing_code == -1 else missing_code
+
+    def _transform_numeric(self, col, series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        values[np.isnan(values)] = self.fill_values[col]
+        if self.scale:
+            values -= self.means[col]
+            values /= self.scales[col]
+        return values
+
+    def _transform_categorical(self, col, series):
+        codes = self._encode_categorical(col, series)
+        if not self.scale:
+            return codes
+        values = codes.astype(np.float64)
+        values -= self.means[col]
+        values /= self.scales[col]
+        return values
+
+    def _encode_categorical(self, col, series):
+        """Integer code of every row of a categorical column"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        # Encode each distinct value once, then gather by code
+        if col in self.hash_buckets:
+            mapping = self._hash(uniques, self.hash_buckets[col])
+        else:
+            mapping = self.categories[col].get_indexer(uniques).astype(np.int32)
+            mapping[mapping == -1] = self.other_codes[col]
+        # Missing values have code -1, which picks the appended last entry
+        mapping = np.append(mapping, np.int32(self._missing_code(col)))
+        return mapping[codes]
+
+    @staticmethod
+    def _hash(values, buckets):
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        return (hashes % np.uint64(buckets)).astype(np.int32)
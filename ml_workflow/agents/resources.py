@@ -0,0 +1,110 @@
+import os
+import threading
+from contextlib import contextmanager
+import joblib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus():
+    """CPUs this process may use: affinity, cgroup quota and LOKY_MAX_CPU_COUNT are respected"""
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        affinity = os.cpu_count() or 1
+    return max(1, min(affinity, joblib.cpu_count()))
+
+
+class CpuBudget:
+    """
+    The CPUs one workflow may use, split between search-level and estimator-level parallelism.
+
+    A hyperparameter search runs `search_jobs` fits at a time in joblib worker
+    processes, and every fit may use `estimator_threads` threads (forest n_jobs,
+    OpenMP in histogram gradient boosting, BLAS in linear models), so that
+    search_jobs x estimator_threads stays within the budget. Native thread pools
+    of the calling process are capped at the budget while `limits()` is active;
+    the cap is process-wide, so concurrent workflows share the largest of their budgets.
+    """
+
+    _native_lock = threading.Lock()
+    _native_budgets = []
+    _native_limiter = None
+    _native_limit = None
+
+    def __init__(self, n_cpus=None):
+        """
+        Args:
+            n_cpus (int): CPUs for this workflow; None (or more than are available)
+                means all available CPUs
+        """
+        total = available_cpus()
+        self.n_cpus = total if n_cpus is None else max(1, min(int(n_cpus), total))
+
+    def split(self, n_tasks):
+        """
+        Divide the budget between concurrent fits and threads per fit
+
+        Independent fits scale better than threads inside one fit, so the search
+        gets as many CPUs as it has tasks and the estimator gets what is left.
+
+        Args:
+            n_tasks (int): Fits the search can run at once (e.g. candidates x folds)
+
+        Returns:
+            tuple: (search_jobs, estimator_threads)
+        """
+        search_jobs = max(1, min(self.n_cpus, n_tasks))
+        estimator_threads = max(1, self.n_cpus // search_jobs)
+        return search_jobs, estimator_threads
+
+    @contextmanager
+    def limits(self, inner_threads=None):
+        """
+        Cap BLAS/OpenMP threads for the code run inside the block
+
+        Args:
+            inner_threads (int): Threads per joblib (loky) worker process; the calling
+                process itself is capped at n_cpus
+        """
+        self._acquire_native_limit(self.n_cpus)
+        try:
+            if inner_threads is None:
+                yield
+            else:
+                with joblib.parallel_config(backend='loky', inner_max_num_threads=inner_threads):
+                    yield
+        finally:
+            self._release_native_limit(self.n_cpus)
+
+    @classmethod
+    def _acquire_native_limit(cls, n_cpus):
+        # threadpoolctl limits are process-wide; concurrent workflows (e.g. dashboard
+        # jobs on threads) share one cap, the largest of their budgets, so no job is
+        # held below its own budget. It is removed when the last one finishes.
+        with cls._native_lock:
+            cls._native_budgets.append(n_cpus)
+            cls._apply_native_limit()
+
+    @classmethod
+    def _release_native_limit(cls, n_cpus):
+        with cls._native_lock:
+            cls._native_budgets.remove(n_cpus)
+            cls._apply_native_limit()
+
+    @classmethod
+    def _apply_native_limit(cls):
+        target = max(cls._native_budgets) if cls._native_budgets else None
+        if target == cls._native_limit:
+            return
+        if cls._native_limiter is not None:
+            cls._native_limiter.restore_original_limits()
+            cls._native_limiter = None
+        cls._native_limit = target
+        if target is not None:
+            try:
+                from threadpoolctl import threadpool_limits
+                cls._native_limiter = threadpool_limits(limits=target)
+            except ImportError:
+                cls._native_limiter = None
@@ -0,0 +1,228 @@
+from dataclasses import dataclass, fields
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _names(values):
+    """Feature or class labels as a NumPy array that NPZ can store without pickling"""
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype == object else values
+
+
+@dataclass
+class FeatureStats:
+    """
+    Per-feature summary statistics as parallel arrays indexed by `names`
+
+    Every statistic is a float64 array of length n_features; position i belongs
+    to names[i].
+    """
+
+    STATS = ('count', 'mean', 'std', 'min', 'q25', 'median', 'q75', 'max', 'skew', 'kurtosis')
+
+    names: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    q25: np.ndarray
+    median: np.ndarray
+    q75: np.ndarray
+    max: np.ndarray
+    skew: np.ndarray
+    kurtosis: np.ndarray
+
+    @classmethod
+    def from_column_stats(cls, stats, names):
+        """Build from the output of stats_engine.column_stats or StreamingStats.result"""
+        q25, median, q75 = stats['quantiles']
+        return cls(
+            names=_names(names), count=stats['count'], mean=stats['mean'], std=stats['std'],
+            min=stats['min'], q25=q25, median=median, q75=q75, max=stats['max'],
+            skew=stats['skew'], kurtosis=stats['kurtosis']
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_frame(self):
+        """Statistics as a DataFrame with one row per feature"""
+        return pd.DataFrame({stat: getattr(self, stat) for stat in self.STATS},
+                            index=pd.Index(self.names, name='feature'))
+
+    def to_arrow(self):
+        """Statistics as a pyarrow Table with a 'feature' column, for Arrow IPC/Parquet transfer"""
+        import pyarrow as pa
+        return pa.table({'feature': self.names, **{stat: getattr(self, stat) for stat in self.STATS}})
+
+
+@dataclass
+class CorrelationResult:
+    """
+    Correlation matrix over `features` plus the strongest pairs of all features
+
+    `order` is the display order into `features` that groups correlated features.
+    Pairs are parallel arrays sorted by absolute correlation.
+    """
+
+    features: np.ndarray
+    matrix: np.ndarray
+    order: np.ndarray
+    pair_a: np.ndarray
+    pair_b: np.ndarray
+    pair_r: np.ndarray
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Build from the dict returned by correlation_analysis or StreamingCorrelation.result"""
+        pairs = summary['top_pairs']
+        return cls(
+            features=_names(summary['features']),
+            matrix=summary['matrix'],
+            order=np.asarray(summary['order'], dtype=np.int64),
+            pair_a=_names([pair['feature_a'] for pair in pairs]),
+            pair_b=_names([pair['feature_b'] for pair in pairs]),
+            pair_r=np.array([pair['correlation'] for pair in pairs], dtype=np.float64)
+        )
+
+    def top_pairs(self):
+        """Strongest pairs as a DataFrame"""
+        return pd.DataFrame({'feature_a': self.pair_a, 'feature_b': self.pair_b, 'correlation': self.pair_r})
+
+
+@dataclass
+class TargetDistribution:
+    """Moments of the target and its value counts, sorted by count descending"""
+
+    mean: float
+    median: float
+    std: float
+    unique_values: int
+    values: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_value_counts(cls, counts, mean=None, median=None, std=None, unique_values=None):
+        """Build from a pandas value_counts Series"""
+        counts = counts.sort_values(ascending=False)
+        return cls(
+            mean=mean, median=median, std=std, unique_values=unique_values,
+            values=_names(counts.index.to_numpy()), counts=counts.to_numpy(dtype=np.int64)
+        )
+
+
+@dataclass
+class FeatureImportance:
+    """Importance scores, sorted descending, with the feature names as index"""
+
+    names: np.ndarray
+    scores: np.ndarray
+
+    @classmethod
+    def from_scores(cls, names, scores):
+        """Build from unsorted scores aligned with names"""
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(-scores, kind='stable')
+        return cls(names=_names(names)[order], scores=scores[order])
+
+    def top(self, n=5):
+        """The n most important features as a Series"""
+        return pd.Series(self.scores[:n], index=self.names[:n])
+
+    def to_dict(self):
+        """Nested-dict layout for JSON export"""
+        return {
+            'feature_importance': dict(zip(self.names.tolist(), self.scores.tolist())),
+            'top_features': self.top().to_dict()
+        }
+
+    def save_npz(self, path):
+        """Write names and scores to an NPZ file"""
+        np.savez(path, names=self.names, scores=self.scores)
+
+    @classmethod
+    def load_npz(cls, path):
+        """Read importance written by save_npz"""
+        with np.load(path) as data:
+            return cls(names=data['names'], scores=data['scores'])
+
+
+@dataclass
+class AnalysisResults:
+    """
+    Output of AnalysisAgent.analyze_data: statistics, correlations and target distribution
+
+    Everything is held in NumPy arrays, so caching (joblib), hashing and NPZ
+    serialization avoid per-feature Python objects.
+    """
+
+    features: FeatureStats
+    correlation: CorrelationResult
+    target: TargetDistribution
+
+    _PARTS = {'features': FeatureStats, 'correlation': CorrelationResult, 'target': TargetDistribution}
+
+    def to_dict(self):
+        """Nested-dict layout for JSON export"""
+        stats = self.features.to_frame()
+        target = self.target
+        return {
+            'basic_stats': stats.drop(columns=['skew', 'kurtosis'])
+                                .rename(columns={'q25': '25%', 'median': '50%', 'q75': '75%'})
+                                .to_dict(orient='index'),
+            'correlation_matrix': {
+                'features': self.correlation.features.tolist(),
+                'matrix': self.correlation.matrix.tolist(),
+                'order': self.correlation.order.tolist(),
+                'top_pairs': self.correlation.top_pairs().to_dict(orient='records')
+            },
+            'feature_distributions': stats[['mean', 'median', 'std', 'skew', 'kurtosis']].to_dict(orient='index'),
+            'target_distribution': {
+                'mean': target.mean, 'median': target.median, 'std': target.std,
+                'unique_values': target.unique_values,
+                'value_counts': dict(zip(target.values.tolist(), target.counts.tolist()))
+            }
+        }
+
+    def save_npz(self, path):
+        """
+        Write all arrays to one NPZ file (no pickling)
+
+        Fields that are None (e.g. the moments of a categorical target) are listed
+        in a '_none' array and restored as None by load_npz.
+
+        Args:
+            path (str): Destination, e.g. 'analysis.npz'
+        """
+        arrays, none = {}, []
+        for part in self._PARTS:
+            obj = getattr(self, part)
+            for f in fields(obj):
+                key = f"{part}.{f.name}"
+                value = getattr(obj, f.name)
+                if value is None:
+                    none.append(key)
+                    value = np.nan
+                arrays[key] = np.asarray(value)
+        np.savez(path, _none=np.array(none, dtype=str), **arrays)
+
+    @classmethod
+    def load_npz(cls, path):
+        """Read results written by save_npz"""
+        with np.load(path) as data:
+            none = set(data['_none'].tolist()) if '_none' in data else set()
+            parts = {}
+            for part, part_type in cls._PARTS.items():
+                values = {}
+                for f in fields(part_type):
+                    key = f"{part}.{f.name}"
+                    if key in none:
+                        values[f.name] = None
+                        continue
+                    value = data[key]
+                    values[f.name] = value.item() if value.ndim == 0 else value
+                parts[part] = part_type(**values)
+        return cls(**parts)
@@ -0,0 +1,298 @@
+import time
+import warnings
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring, get_scorer
+from sklearn.model_selection import GridSearchCV, ParameterGrid, ParameterSampler, check_cv
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.utils.parallel import Parallel, delayed
+from joblib import effective_n_jobs
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SearchCancelled(Exception):
+    """Raised from a hyperparameter search whose cancel event was set"""
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise SearchCancelled("Hyperparameter search cancelled")
+
+
+class _CancellableSearchMixin:
+    """
+    Lets sklearn's GridSearchCV and HalvingGridSearchCV stop once `cancel_event` is set.
+
+    sklearn estimators only take declared parameters, so the event is assigned as
+    an attribute after construction. With an event, candidates are evaluated in
+    batches of `n_jobs` (their folds run in parallel) and the event is checked
+    before each batch; without one the search runs exactly as sklearn's.
+    """
+
+    cancel_event = None
+
+    def _run_search(self, evaluate_candidates, *, callback_ctx=None):
+        if self.cancel_event is not None:
+            evaluate_candidates = self._batched(evaluate_candidates)
+        # sklearn versions with fit callbacks pass callback_ctx; older ones do not
+        super()._run_search(evaluate_candidates, **_callback_kwargs(callback_ctx))
+
+    def _batched(self, evaluate_candidates):
+        batch = max(1, effective_n_jobs(self.n_jobs))
+
+        def evaluate_in_batches(candidate_params, cv=None, more_results=None, callback_ctx=None):
+            # sklearn's fit-callback contexts allow one evaluation per rung, so batched
+            # evaluations run without them
+            candidate_params = list(candidate_params)
+            results = None
+            for start in range(0, len(candidate_params), batch):
+                _check_cancelled(self.cancel_event)
+                stop = start + batch
+                # Per-candidate extras (halving's iteration and resources) are sliced alike
+                batch_results = None if more_results is None else {
+                    key: values[start:stop] for key, values in more_results.items()
+                }
+                results = evaluate_candidates(candidate_params[start:stop], cv, batch_results)
+            return results
+
+        return evaluate_in_batches
+
+
+class CancellableGridSearchCV(_CancellableSearchMixin, GridSearchCV):
+    """GridSearchCV that stops between candidate batches once `cancel_event` is set"""
+
+
+class CancellableHalvingGridSearchCV(_CancellableSearchMixin, HalvingGridSearchCV):
+    """HalvingGridSearchCV that stops between candidate batches once `cancel_event` is set"""
+
+
+def _callback_kwargs(callback_ctx):
+    return {} if callback_ctx is None else {'callback_ctx': callback_ctx}
+
+
+class TimeBudgetedSearch:
+    """
+    Hyperparameter search that finishes within a wall-clock budget, refit included.
+
+    Candidates are drawn at random (or, with `exhaustive`, taken from the grid in
+    order) and cross-validated fold by fold. The search stops before a candidate
+    that would likely overrun the budget and abandons a candidate whose folds run
+    past it, so the budget is exceeded by at most one fold fit. The best candidate
+    is refit on all data when the measured fold fit times say the refit fits in
+    the remaining time; otherwise its best fold model is used as is.
+
+    Exposes the same attributes the rest of the workflow reads from GridSearchCV
+    (best_estimator_, best_params_, best_score_, cv_results_, predict) plus
+    `refit_`, whether best_estimator_ was trained on all rows. Setting
+    `cancel_event` raises SearchCancelled after the fold that is running.
+    """
+
+    def __init__(self, estimator, param_distributions, scoring=None, cv=5, n_iter=100,
+                 time_budget=60.0, n_jobs=-1, random_state=42, exhaustive=False, cancel_event=None):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.scoring = scoring
+        self.cv = cv
+        self.n_iter = n_iter
+        self.time_budget = time_budget
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.exhaustive = exhaustive
+        self.cancel_event = cancel_event
+
+    def fit(self, X, y):
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        if self.exhaustive:
+            candidates = ParameterGrid(self.param_distributions)
+        else:
+            candidates = ParameterSampler(self.param_distributions, self.n_iter, random_state=self.random_state)
+        splits = list(check_cv(self.cv, y, classifier=is_classifier(self.estimator)).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        # A refit sees all rows, the fold fits (k-1)/k of them
+        refit_scale = len(splits) / max(len(splits) - 1, 1)
+        results = {'params': [], 'mean_test_score': [], 'fit_time': []}
+        best_folds, refit_estimate = None, 0.0
+
+        for params in candidates:
+            _check_cancelled(self.cancel_event)
+            now = time.perf_counter()
+            expected = np.mean(results['fit_time']) if results['fit_time'] else 0.0
+            if results['params'] and now + expected + refit_estimate > deadline:
+                break
+            candidate_start = now
+            folds = self._cross_validate(clone(self.estimator).set_params(**params), X, y, splits,
+                                         scorer, deadline, keep_partial=not results['params'])
+            if folds is None:
+                break
+            score = float(np.mean([fold[0] for fold in folds]))
+            results['params'].append(params)
+            results['mean_test_score'].append(score)
+            results['fit_time'].append(time.perf_counter() - candidate_start)
+            if best_folds is None or score > max(results['mean_test_score'][:-1]):
+                best_folds = folds
+                refit_estimate = max(fold[1] for fold in folds) * refit_scale
+            if len(folds) < len(splits):
+                break
+
+        best = int(np.argmax(results['mean_test_score']))
+        self.cv_results_ = results
+        self.best_params_ = results['params'][best]
+        self.best_score_ = results['mean_test_score'][best]
+        self.refit_ = deadline - time.perf_counter() >= refit_estimate
+        if self.refit_:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        else:
+            # No time left to refit: keep the best-scoring fold model of the best candidate
+            self.best_estimator_ = max(best_folds, key=lambda fold: fold[0])[2]
+            logger.warning(
+                f"Time budget of {self.time_budget}s spent; using the best fold model instead of a refit"
+            )
+        logger.info(f"Evaluated {len(results['params'])} candidates in {time.perf_counter() - start:.1f}s")
+        return self
+
+    def _cross_validate(self, estimator, X, y, splits, scorer, deadline, keep_partial):
+        """
+        Fit and score one candidate on every fold, stopping at the deadline
+
+        Returns:
+            list: (score, fit seconds, fitted estimator) per completed fold, or None when
+                the deadline passed; with `keep_partial` the completed folds are kept
+                instead, so the search always has a candidate
+        """
+        parallel = Parallel(n_jobs=self.n_jobs, return_as='generator_unordered')
+        folds = []
+        for fold in parallel(delayed(_fit_and_score_fold)(clone(estimator), X, y, train, test, scorer)
+                             for train, test in splits):
+            # Leaving the generator cancels the folds that have not finished
+            _check_cancelled(self.cancel_event)
+            folds.append(fold)
+            if len(folds) < len(splits) and time.perf_counter() > deadline:
+                return folds if keep_partial else None
+        return folds
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+
+def _rows(data, indices):
+    return data.iloc[indices] if hasattr(data, 'iloc') else data[indices]
+
+
+def _fit_and_score_fold(estimator, X, y, train, test, scorer):
+    fit_start = time.perf_counter()
+    estimator.fit(_rows(X, train), _rows(y, train))
+    fit_time = time.perf_counter() - fit_start
+    return scorer(estimator, _rows(X, test), _rows(y, test)), fit_time, estimator
+
+
+class WarmStartForestSearch:
+    """
+    Grows a forest with warm_start in fixed steps, scoring each size on its
+    out-of-bag samples, and stops when the score plateaus, `max_estimators` is
+    reached or the wall-clock budget is spent. No cross-validation refits are needed.
+    Setting `cancel_event` raises SearchCancelled after the step that is running.
+    """
+
+    def __init__(self, estimator, step=25, max_estimators=500, tol=1e-3, patience=2,
+                 time_budget=None, cancel_event=None):
+        self.estimator = estimator
+        self.step = step
+        self.max_estimators = max_estimators
+        self.tol = tol
+        self.patience = patience
+        self.time_budget = time_budget
+        self.cancel_event = cancel_event
+
+    def fit(self, X, y):
+        start = time.perf_counter()
+        forest = clone(self.estimator).set_params(
+            warm_start=True, oob_score=True, bootstrap=True, n_estimators=0
+        )
+        results = {'params': [], 'mean_test_score': []}
+        best_score, stale = -np.inf, 0
+
+        while forest.n_estimators < self.max_estimators:
+            _check_cancelled(self.cancel_event)
+            forest.set_params(n_estimators=min(forest.n_estimators + self.step, self.max_estimators))
+            with warnings.catch_warnings():
+                # Small forests leave some rows without out-of-bag predictions
+                warnings.simplefilter('ignore', UserWarning)
+                forest.fit(X, y)
+            score = forest.oob_score_
+            results['params'].append({'n_estimators': forest.n_estimators})
+            results['mean_test_score'].append(float(score))
+
+            if score > best_score + self.tol:
+                best_score, stale = score, 0
+            else:
+                stale += 1
+            if stale >= self.patience:
+                break
+            if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                break
+
+        self.cv_results_ = results
+        self.best_params_ = {'n_estimators': forest.n_estimators}
+        self.best_score_ = best_score
+        self.best_estimator_ = forest
+        logger.info(f"Grew forest to {forest.n_estimators} trees in {time.perf_counter() - start:.1f}s")
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+
+class IncrementalSearch:
+    """
+    Trains every candidate of a parameter grid side by side with partial_fit, so
+    one pass over a stream of batches tunes all of them, then keeps the candidate
+    that scores best on a held-out validation set.
+    """
+
+    def __init__(self, estimator, param_grid, scoring=None, classes=None):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.classes = classes
+        self.candidates_ = [
+            (params, clone(estimator).set_params(**params)) for params in ParameterGrid(param_grid)
+        ]
+        self.n_samples_seen_ = 0
+
+    def partial_fit(self, X, y):
+        """Update every candidate with one batch of rows"""
+        for _, model in self.candidates_:
+            if self.classes is not None:
+                model.partial_fit(X, y, classes=self.classes)
+            else:
+                model.partial_fit(X, y)
+        self.n_samples_seen_ += len(X)
+        return self
+
+    def select(self, X_val, y_val):
+        """Score the candidates on validation rows and keep the best one"""
+        if not self.n_samples_seen_:
+            raise ValueError("IncrementalSearch has not seen any training rows.")
+        scorer = get_scorer(self.scoring) if self.scoring else None
+        results = {'params': [], 'mean_test_score': []}
+        for params, model in self.candidates_:
+            score = scorer(model, X_val, y_val) if scorer else model.score(X_val, y_val)
+            results['params'].append(params)
+            results['mean_test_score'].append(float(score))
+
+        best = int(np.argmax(results['mean_test_score']))
+        self.cv_results_ = results
+        self.best_params_ = results['params'][best]
+        self.best_score_ = results['mean_test_score'][best]
+        self.best_estimator_ = self.candidates_[best][1]
+        logger.info(
+            f"Selected {self.best_params_} from {len(self.candidates_)} incremental candidates "
+            f"trained on {self.n_samples_seen_} rows"
+        )
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
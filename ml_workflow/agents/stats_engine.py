@@ -0,0 +1,186 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def column_stats(values, quantiles=QUANTILES, block_size=256):
+    """
+    Compute count, moments, extremes and quantiles for every column in one pass
+
+    Skewness and kurtosis use the same bias-corrected estimators as pandas, and
+    missing values (NaN) are ignored per column.
+
+    Args:
+        values (np.ndarray): 2-D float array, rows x features
+        quantiles (tuple): Quantiles to compute, in [0, 1]
+        block_size (int): Columns processed at a time, bounding temporary memory
+
+    Returns:
+        dict: Arrays of length n_features keyed by 'count', 'mean', 'std', 'min',
+            'max', 'skew', 'kurtosis' and 'quantiles' (n_quantiles x n_features)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_features = values.shape[1]
+    count = np.empty(n_features)
+    mean = np.empty(n_features)
+    m2 = np.empty(n_features)
+    m3 = np.empty(n_features)
+    m4 = np.empty(n_features)
+    col_min = np.full(n_features, np.nan)
+    col_max = np.full(n_features, np.nan)
+    qs = np.full((len(quantiles), n_features), np.nan)
+
+    for start in range(0, n_features, block_size):
+        block = values[:, start:start + block_size]
+        cols = slice(start, start + block.shape[1])
+        mask = ~np.isnan(block)
+        has_missing = not mask.all()
+
+        n = mask.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mu = np.where(mask, block, 0.0).sum(axis=0) / n
+        dev = np.where(mask, block - mu, 0.0) if has_missing else block - mu
+        dev2 = dev * dev
+
+        count[cols] = n
+        mean[cols] = mu
+        m2[cols] = dev2.sum(axis=0)
+        m3[cols] = (dev2 * dev).sum(axis=0)
+        m4[cols] = (dev2 * dev2).sum(axis=0)
+
+        observed = n > 0
+        if observed.any():
+            sub = block[:, observed]
+            idx = np.flatnonzero(observed) + start
+            if has_missing:
+                col_min[idx] = np.nanmin(sub, axis=0)
+                col_max[idx] = np.nanmax(sub, axis=0)
+                qs[:, idx] = np.nanquantile(sub, quantiles, axis=0)
+            else:
+                col_min[idx] = sub.min(axis=0)
+                col_max[idx] = sub.max(axis=0)
+                qs[:, idx] = np.quantile(sub, quantiles, axis=0)
+
+    return _finalize(count, mean, m2, m3, m4, col_min, col_max, qs, quantiles)
+
+
+def _finalize(count, mean, m2, m3, m4, col_min, col_max, qs, quantiles):
+    """Turn central moment sums into pandas-compatible summary statistics"""
+    n = count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+
+        skew = (n * np.sqrt(n - 1) / (n - 2)) * (m3 / m2 ** 1.5)
+        skew = np.where(m2 == 0, 0.0, skew)
+        skew = np.where(n < 3, np.nan, skew)
+
+        adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        kurt = (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2 ** 2) - adj
+        kurt = np.where(m2 == 0, 0.0, kurt)
+        kurt = np.where(n < 4, np.nan, kurt)
+
+    return {
+        'count': n,
+        'mean': np.where(n > 0, mean, np.nan),
+        'std': std,
+        'min': col_min,
+        'max': col_max,
+        'skew': skew,
+        'kurtosis': kurt,
+        'quantiles': qs,
+        'quantile_levels': np.asarray(quantiles)
+    }
+
+
+class StreamingStats:
+    """
+    Mergeable summary statistics for data that arrives in row blocks.
+
+    Moments are combined exactly with the pairwise update formulas of Chan and
+    Pebay, so stats built on separate chunks (or workers) can be merged. Quantiles
+    are estimated from a bottom-k uniform row sample, which is mergeable as well.
+    """
+
+    def __init__(self, n_features, sample_size=10_000, quantiles=QUANTILES, random_state=42):
+        self.n_features = n_features
+        self.sample_size = sample_size
+        self.quantiles = quantiles
+        self._rng = np.random.default_rng(random_state)
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.m3 = np.zeros(n_features)
+        self.m4 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self._keys = np.empty(0)
+        self._sample = np.empty((0, n_features))
+
+    def update(self, values):
+        """Add a block of rows (2-D float array) to the statistics"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        block = StreamingStats(self.n_features, self.sample_size, self.quantiles)
+        block._rng = self._rng
+
+        mask = ~np.isnan(values)
+        n = mask.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mu = np.where(n > 0, np.where(mask, values, 0.0).sum(axis=0) / n, 0.0)
+        dev = np.where(mask, values - mu, 0.0)
+        dev2 = dev * dev
+        block.count = n
+        block.mean = mu
+        block.m2 = dev2.sum(axis=0)
+        block.m3 = (dev2 * dev).sum(axis=0)
+        block.m4 = (dev2 * dev2).sum(axis=0)
+        block.min = np.where(mask, values, np.inf).min(axis=0)
+        block.max = np.where(mask, values, -np.inf).max(axis=0)
+        block._keys = self._rng.random(len(values))
+        block._sample = values
+        return self.merge(block)
+
+    def merge(self, other):
+        """Combine another StreamingStats over the same features into this one"""
+        na, nb = self.count, other.count
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            ratio = np.where(n > 0, nb / n, 0.0)
+            mean = self.mean + delta * ratio
+            m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * na * nb / n, 0.0)
+            m3 = (self.m3 + other.m3
+                  + np.where(n > 0, delta ** 3 * na * nb * (na - nb) / n ** 2
+                             + 3 * delta * (na * other.m2 - nb * self.m2) / n, 0.0))
+            m4 = (self.m4 + other.m4
+                  + np.where(n > 0, delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+                             + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+                             + 4 * delta * (na * other.m3 - nb * self.m3) / n, 0.0))
+        self.count, self.mean, self.m2, self.m3, self.m4 = n, mean, m2, m3, m4
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+        # Bottom-k sampling: the rows with the smallest random keys form a uniform sample
+        keys = np.concatenate([self._keys, other._keys])
+        sample = np.concatenate([self._sample, other._sample])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+        self._keys, self._sample = keys, sample
+        return self
+
+    def result(self):
+        """Summary statistics in the same layout as column_stats"""
+        qs = np.full((len(self.quantiles), self.n_features), np.nan)
+        observed = self.count > 0
+        if observed.any() and len(self._sample):
+            with np.errstate(invalid='ignore'):
+                qs[:, observed] = np.nanquantile(self._sample[:, observed], self.quantiles, axis=0)
+        col_min = np.where(observed, self.min, np.nan)
+        col_max = np.where(observed, self.max, np.nan)
+        return _finalize(self.count, self.mean, self.m2, self.m3, self.m4,
+                         col_min, col_max, qs, self.quantiles)
@@ -1,19 +1,34 @@
 from agents.data_agent import DataAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.model_agent import ModelAgent
+from agents.resources import CpuBudget
+from workflow_graph import StageGraph, WorkflowCancelled
+from data_cache import DatasetCache
+from model_store import ModelStore
+from profiling import StageProfiler
 import logging
 import os
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+IMPORTANCE_METHODS = ('model', 'permutation', 'sampled', 'forest')
+
 class MLWorkflowOrchestrator:
     def __init__(self):
         self.data_agent = DataAgent()
         self.analysis_agent = AnalysisAgent()
         self.model_agent = ModelAgent()
         
-    def run_workflow(self, data_path, target_column, model_type='classification'):
+    def run_workflow(self, data_path, target_column, model_type='classification', load_options=None,
+                     importance_method='model', importance_sample_size=10_000,
+                     search_strategy='grid', time_budget=None, estimator='random_forest',
+                     baseline_first=False, on_baseline=None, parallel=True,
+                     cache=None, dataset_hash=None, save_model_as=None, model_store=None,
+                     progress_callback=None, cancel_event=None, streaming=False,
+                     chunksize=100_000, holdout_size=20_000, preprocess_options=None,
+                     profile=False, n_cpus=None):
         """
         Orchestrate the complete ML workflow
         
@@ -21,41 +36,325 @@ class MLWorkflowOrchestrator:
             data_path (str): Path to the data file (CSV/Excel)
             target_column (str): Name of the target column
             model_type (str): Type of ML problem ('classification' or 'regression')
+            load_options (dict): Keyword arguments for DataAgent.load_data, e.g.
+                {'optimize_memory': True, 'engine': 'pyarrow', 'sample_frac': 0.1}
+            importance_method (str): How feature importance is obtained:
+                'model' reads it from the tuned model (no extra training),
+                'permutation' permutes test features against the tuned model,
+                'sampled' fits a small forest on a row sample in parallel with training,
+                'forest' fits a separate full random forest
+            importance_sample_size (int): Row cap for 'permutation' and 'sampled'
+            search_strategy (str): Hyperparameter search used by ModelAgent:
+                'grid', 'halving', 'random' or 'warm_start'
+            time_budget (float): Wall-clock seconds for tuning, refit included; applies to
+                'random', 'warm_start' and 'grid' (exhaustive when None), not to 'halving'
+            estimator (str): Registered estimator backend ('random_forest',
+                'hist_gradient_boosting', 'linear', 'sgd')
+            baseline_first (bool): Report an untuned linear baseline before the search
+            on_baseline (callable): Receives the baseline results as soon as they exist
+            parallel (bool): Run analysis, feature importance and training concurrently
+                when they do not depend on each other
+            cache (ArtifactCache): Reuse and checkpoint stage outputs on disk
+            dataset_hash (str): Content hash of the dataset, if already known; otherwise
+                it is computed from data_path when a cache is used
+            save_model_as (str): Save the tuned model and its preprocessing pipeline
+                under this name as a new version
+            model_store (ModelStore): Store used by save_model_as; defaults to ./models
+            progress_callback (callable): Receives (stage, status, seconds) as stages
+                start and finish
+            cancel_event (threading.Event): Set to stop the run at the next stage boundary;
+                hyperparameter tuning also stops between candidates
+            streaming (bool): Process a CSV/Parquet file chunk by chunk instead of loading
+                it, for data larger than memory. Needs a partial_fit estimator such as
+                'sgd', whose grid candidates are trained side by side in one pass;
+                search_strategy, time_budget, baseline_first and cache do not apply
+            chunksize (int): Rows per chunk in streaming mode; bounds memory use
+            holdout_size (int): Held-out rows kept in memory for evaluation in streaming mode
+            preprocess_options (dict): Keyword arguments for PreprocessingPipeline, e.g.
+                {'max_categories': 500, 'high_cardinality': 'hash'} for ID-like columns
+            profile (bool): Record wall/CPU time, memory peaks and explicit DataFrame.copy()
+                calls per stage under 'profile'; stages then run one at a time
+            n_cpus (int): CPU budget of this run, split between concurrent search fits and
+                threads per fit (forest n_jobs, OpenMP); BLAS/OpenMP pools are capped at
+                it. None uses all available CPUs
+            
+        Returns:
+            dict: Analysis (AnalysisResults), feature importance (FeatureImportance) and
+                model results, the load report,
+                per-stage wall times in seconds under 'timings' and the stages served
+                from the cache under 'cache_hits' (and 'profile' if requested)
         """
         try:
-            # Step 1: Data Loading and Preprocessing
-            logger.info("Starting data loading and preprocessing...")
-            df = self.data_agent.load_data(data_path)
-            processed_data = self.data_agent.preprocess_data(df, target_column)
+            if importance_method not in IMPORTANCE_METHODS:
+                raise ValueError(f"Unknown importance_method: {importance_method}")
+            
+            if streaming:
+                return self._run_streaming_workflow(
+                    data_path, target_column, model_type, load_options, importance_method,
+                    importance_sample_size, estimator, save_model_as, model_store,
+                    progress_callback, cancel_event, chunksize, holdout_size, preprocess_options,
+                    profile, n_cpus
+                )
+            
+            keys = self._stage_keys(
+                cache, data_path, dataset_hash, target_column, model_type, load_options,
+                preprocess_options, importance_method, importance_sample_size, search_strategy,
+                time_budget, estimator, baseline_first
+            )
+            cache_hits = []
             
-            # Step 2: Data Analysis
-            logger.info("Starting data analysis...")
-            analysis_results = self.analysis_agent.analyze_data(processed_data)
-            feature_importance = self.analysis_agent.get_feature_importance(processed_data, target_column)
+            def cached(stage, func, restore=None):
+                """Serve a stage from the artifact cache, or run it and checkpoint its output"""
+                def run(out):
+                    if cache is not None:
+                        hit, value = cache.get(keys[stage])
+                        if hit:
+                            logger.info(f"Stage '{stage}' loaded from cache")
+                            cache_hits.append(stage)
+                            return restore(value) if restore else value
+                    value = func(out)
+                    if cache is not None:
+                        cache.put(keys[stage], self._checkpoint(stage, value))
+                    return value
+                return run
+            
+            graph = StageGraph(max_workers=3)
+            
+            # Step 1: Data Loading and Preprocessing (loading is skipped when preprocessing is cached)
+            graph.add_stage('preprocess', cached(
+                'preprocess',
+                lambda out: self.data_agent.preprocess_data(
+                    self.data_agent.load_data(data_path, **(load_options or {})), target_column,
+                    pipeline_options=preprocess_options
+                ),
+                restore=self._restore_preprocess
+            ))
+            
+            # Step 2: Data Analysis; only reads the processed data, so it runs alongside training
+            graph.add_stage(
+                'analysis',
+                cached('analysis', lambda out: self.analysis_agent.analyze_data(out['preprocess'])),
+                depends_on=('preprocess',)
+            )
             
             # Step 3: Model Training and Evaluation
-            logger.info("Starting model training and evaluation...")
-            model_results = self.model_agent.train_and_evaluate(
-                processed_data,
-                target_column,
-                model_type=model_type
+            graph.add_stage(
+                'train',
+                cached('train', lambda out: self.model_agent.train_and_evaluate(
+                    out['preprocess'],
+                    target_column,
+                    model_type=model_type,
+                    search_strategy=search_strategy,
+                    time_budget=time_budget,
+                    estimator=estimator,
+                    baseline_first=baseline_first,
+                    on_baseline=on_baseline,
+                    n_cpus=n_cpus,
+                    cancel_event=cancel_event
+                ), restore=self._restore_train),
+                depends_on=('preprocess',)
             )
             
-            return {
-                'analysis_results': analysis_results,
-                'feature_importance': feature_importance,
-                'model_results': model_results
+            # Feature importance either comes from its own forest or from the trained model
+            if importance_method in ('sampled', 'forest'):
+                sample_size = importance_sample_size if importance_method == 'sampled' else None
+                graph.add_stage(
+                    'importance',
+                    cached('importance', lambda out: self.analysis_agent.get_feature_importance(
+                        out['preprocess'], target_column, sample_size=sample_size
+                    )),
+                    depends_on=('preprocess',)
+                )
+            else:
+                graph.add_stage(
+                    'importance',
+                    cached('importance', lambda out: self._importance_from_trained_model(
+                        out['preprocess'], importance_method, importance_sample_size
+                    )),
+                    depends_on=('preprocess', 'train')
+                )
+            
+            logger.info("Running workflow stages...")
+            profiler = StageProfiler() if profile else None
+            start = time.perf_counter()
+            with CpuBudget(n_cpus).limits():
+                outputs, timings = graph.run(
+                    parallel=parallel, progress_callback=progress_callback, cancel_event=cancel_event,
+                    profiler=profiler
+                )
+            timings['total'] = time.perf_counter() - start
+            
+            results = {
+                'analysis_results': outputs['analysis'],
+                'feature_importance': outputs['importance'],
+                'model_results': outputs['train'],
+                'load_report': self.data_agent.load_report,
+                'timings': timings,
+                'cache_hits': cache_hits
             }
+            if profiler is not None:
+                results['profile'] = profiler.report()
+            
+            if save_model_as:
+                results['model_version'] = self.save_model(
+                    save_model_as, model_store or ModelStore(), target_column, outputs['train']
+                )
+            
+            return results
             
         except Exception as e:
             logger.error(f"Error in ML workflow: {str(e)}")
             raise
+            
+    def _run_streaming_workflow(self, data_path, target_column, model_type, load_options,
+                                importance_method, importance_sample_size, estimator,
+                                save_model_as, model_store, progress_callback, cancel_event,
+                                chunksize, holdout_size, preprocess_options, profile, n_cpus):
+        """Out-of-core workflow: one pass fits preprocessing, a second trains and analyzes"""
+        if importance_method not in ('model', 'permutation'):
+            raise ValueError("Streaming mode supports the 'model' and 'permutation' importance methods")
+        engine = (load_options or {}).get('engine')
+        
+        def analyze_and_train(out):
+            processed = out['preprocess']
+            self.analysis_agent.start_streaming_analysis(processed['feature_names'])
+            self.model_agent.start_incremental(model_type, estimator, processed['classes'])
+            for X, y in self.data_agent.iter_training_batches(
+                    data_path, target_column, chunksize=chunksize, engine=engine):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise WorkflowCancelled("Workflow cancelled")
+                self.analysis_agent.update_streaming_analysis(X, y)
+                self.model_agent.partial_fit(X, y)
+            return {
+                'analysis': self.analysis_agent.finish_streaming_analysis(),
+                'train': self.model_agent.finish_incremental(processed)
+            }
+        
+        graph = StageGraph(max_workers=1)
+        graph.add_stage('preprocess', lambda out: self.data_agent.fit_streaming(
+            data_path, target_column, chunksize=chunksize, holdout_size=holdout_size,
+            collect_classes=model_type == 'classification', engine=engine,
+            pipeline_options=preprocess_options
+        ))
+        graph.add_stage('analysis_and_train', analyze_and_train, depends_on=('preprocess',))
+        graph.add_stage('importance', lambda out: self._importance_from_trained_model(
+            out['preprocess'], importance_method, importance_sample_size
+        ), depends_on=('analysis_and_train',))
+        
+        logger.info("Running streaming workflow stages...")
+        profiler = StageProfiler() if profile else None
+        start = time.perf_counter()
+        with CpuBudget(n_cpus).limits():
+            outputs, timings = graph.run(
+                parallel=False, progress_callback=progress_callback, cancel_event=cancel_event,
+                profiler=profiler
+            )
+        timings['total'] = time.perf_counter() - start
+        
+        results = {
+            'analysis_results': outputs['analysis_and_train']['analysis'],
+            'feature_importance': outputs['importance'],
+            'model_results': outputs['analysis_and_train']['train'],
+            'load_report': self.data_agent.load_report,
+            'timings': timings,
+            'cache_hits': []
+        }
+        if profiler is not None:
+            results['profile'] = profiler.report()
+        if save_model_as:
+            results['model_version'] = self.save_model(
+                save_model_as, model_store or ModelStore(), target_column, results['model_results']
+            )
+        return results
+        
+    def save_model(self, name, model_store, target_column, model_results):
+        """
+        Save the tuned estimator with its fitted preprocessing pipeline
+        
+        Args:
+            name (str): Model name in the store
+            model_store (ModelStore): Destination store
+            target_column (str): Name of the target column
+            model_results (dict): Results of ModelAgent.train_and_evaluate
+            
+        Returns:
+            str: The saved version
+        """
+        return model_store.save(
+            name,
+            self.model_agent.model.best_estimator_,
+            self.data_agent.pipeline,
+            metadata={
+                'target_column': target_column,
+                'model_type': self.model_agent.model_type,
+                'estimator': model_results.get('estimator'),
+                'best_params': model_results['best_params'],
+                'metrics': model_results['metrics']
+            }
+        )
+        
+    def _stage_keys(self, cache, data_path, dataset_hash, target_column, model_type, load_options,
+                    preprocess_options, importance_method, importance_sample_size, search_strategy,
+                    time_budget, estimator, baseline_first):
+        """Cache keys per stage; each key includes the keys of the stages it depends on"""
+        if cache is None:
+            return {}
+        if dataset_hash is None:
+            dataset_hash = DatasetCache.content_hash(data_path)
+        keys = {}
+        keys['preprocess'] = cache.make_key(
+            'preprocess', dataset=dataset_hash, target=target_column, load_options=load_options,
+            preprocess_options=preprocess_options
+        )
+        # 'layout' changes whenever the stored result objects do, so stale entries are not reused
+        keys['analysis'] = cache.make_key('analysis', upstream=keys['preprocess'], layout='arrays')
+        keys['train'] = cache.make_key(
+            'train', upstream=keys['preprocess'], model_type=model_type, estimator=estimator,
+            search_strategy=search_strategy, time_budget=time_budget, baseline_first=baseline_first
+        )
+        if importance_method in ('sampled', 'forest'):
+            upstream = keys['preprocess']
+        else:
+            upstream = keys['train']
+        keys['importance'] = cache.make_key(
+            'importance', upstream=upstream, method=importance_method,
+            sample_size=importance_sample_size, layout='arrays'
+        )
+        return keys
+        
+    def _checkpoint(self, stage, value):
+        """What to persist for a stage; training also needs the fitted model and load report"""
+        if stage == 'preprocess':
+            return {'processed_data': value, 'load_report': self.data_agent.load_report}
+        if stage == 'train':
+            return {'results': value, 'model': self.model_agent.model, 'model_type': self.model_agent.model_type}
+        return value
+        
+    def _restore_preprocess(self, checkpoint):
+        self.data_agent.load_report = checkpoint['load_report']
+        self.data_agent.pipeline = checkpoint['processed_data']['pipeline']
+        return checkpoint['processed_data']
+        
+    def _restore_train(self, checkpoint):
+        self.model_agent.model = checkpoint['model']
+        self.model_agent.model_type = checkpoint['model_type']
+        return checkpoint['results']
+        
+    def _importance_from_trained_model(self, processed_data, importance_method, sample_size):
+        """Feature importance of the tuned model, permuting test features if it has none built in"""
+        best_estimator = self.model_agent.model.best_estimator_
+        feature_importance = None
+        if importance_method == 'model':
+            feature_importance = self.analysis_agent.importance_from_model(
+                best_estimator, processed_data['feature_names']
+            )
+        if feature_importance is None:
+            feature_importance = self.analysis_agent.get_permutation_importance(
+                best_estimator, processed_data, sample_size=sample_size
+            )
+        return feature_importance
 
 if __name__ == "__main__":
-    # Example usage
-    orchestrator = MLWorkflowOrchestrator()
-    results = orchestrator.run_workflow(
-        data_path="data/example.csv",
-        target_column="target",
-        model_type="classification"
-    ) 
\ No newline at end of file
+    # Batch runs over a manifest of datasets, e.g. python app.py jobs.json --workers 4
+    from batch_cli import main
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import uuid
+import joblib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArtifactCache:
+    """
+    On-disk cache of workflow stage outputs.
+
+    Keys hash everything that determines a stage's output (dataset content hash,
+    target, model type and the stage's configuration, including upstream keys).
+    Every stage is written as soon as it finishes, so a run that crashes resumes
+    from its last completed stage when it is submitted again.
+    """
+
+    def __init__(self, cache_dir="temp_data/artifacts"):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(stage, **config):
+        """
+        Build a cache key for a stage
+
+        Args:
+            stage (str): Stage name
+            **config: JSON-serializable values that determine the stage output
+
+        Returns:
+            str: Hex digest identifying the stage output
+        """
+        payload = json.dumps({'stage': stage, **config}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def get(self, key):
+        """
+        Look up a stage output
+
+        Returns:
+            tuple: (hit, value); value is None on a miss or an unreadable entry
+        """
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return False, None
+        try:
+            return True, joblib.load(path)
+        except Exception as e:
+            # A partially written or stale entry is treated as a miss
+            logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return False, None
+
+    def put(self, key, value):
+        """Store a stage output atomically so readers never see a partial file"""
+        path = self.path_for(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def clear(self):
+        """Remove all cached stage outputs"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.joblib'):
+                os.remove(os.path.join(self.cache_dir, name))
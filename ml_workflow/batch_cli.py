@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from agents.resources import available_cpus
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUIRED_KEYS = ('data_path', 'target_column')
+
+def load_manifest(path):
+    """
+    Read the jobs of a batch run
+
+    A JSON manifest is a list of job objects (or {"jobs": [...]}); a CSV manifest
+    has one job per row. Every job needs 'data_path' and 'target_column', may set
+    'model_type' and an output 'name', and any other keys are passed on to
+    MLWorkflowOrchestrator.run_workflow.
+
+    Args:
+        path (str): Path to a .json or .csv manifest
+
+    Returns:
+        list: Job dicts with a unique 'name'
+    """
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            jobs = json.load(f)
+        if isinstance(jobs, dict):
+            jobs = jobs['jobs']
+    elif path.endswith('.csv'):
+        jobs = [
+            {key: value for key, value in row.items() if not pd.isna(value)}
+            for row in pd.read_csv(path).to_dict(orient='records')
+        ]
+    else:
+        raise ValueError("Unsupported manifest format. Please use a JSON or CSV file.")
+    if not jobs:
+        raise ValueError(f"Manifest {path} has no jobs")
+
+    names = set()
+    for i, job in enumerate(jobs):
+        missing = [key for key in REQUIRED_KEYS if key not in job]
+        if missing:
+            raise ValueError(f"Manifest job {i} is missing {missing}")
+        job.setdefault('model_type', 'classification')
+        name = job.get('name') or (
+            f"{os.path.splitext(os.path.basename(job['data_path']))[0]}-{job['target_column']}"
+        )
+        name = re.sub(r"[^\w.-]+", "_", str(name))
+        # Keep output directories apart when the same dataset and target appear twice
+        job['name'] = name if name not in names else f"{name}-{i}"
+        names.add(job['name'])
+    return jobs
+
+def _init_worker(cpus_per_job):
+    """Limit every parallel layer in a worker process to its CPU allotment"""
+    # joblib (and scikit-learn's n_jobs=-1) size their pools from this
+    os.environ['LOKY_MAX_CPU_COUNT'] = str(cpus_per_job)
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(cpus_per_job)
+    try:
+        from threadpoolctl import threadpool_limits
+        # Native pools that were already started ignore the environment variables
+        threadpool_limits(limits=cpus_per_job)
+    except ImportError:
+        pass
+
+def _run_job(job, output_dir, cpus_per_job):
+    """Run one manifest job in a worker process and write its results"""
+    from app import MLWorkflowOrchestrator
+
+    params = {key: value for key, value in job.items() if key != 'name'}
+    params.setdefault('n_cpus', cpus_per_job)
+    summary = {
+        'name': job['name'],
+        'data_path': job['data_path'],
+        'target_column': job['target_column'],
+        'model_type': job['model_type'],
+        'status': 'done',
+        'error': None
+    }
+    start = time.perf_counter()
+    try:
+        results = MLWorkflowOrchestrator().run_workflow(**params)
+        job_dir = os.path.join(output_dir, job['name'])
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, "results.json"), "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=_to_json)
+
+        summary['rows'] = results['load_report'].get('rows')
+        summary['model_version'] = results.get('model_version')
+        summary['best_params'] = json.dumps(results['model_results']['best_params'], default=_to_json)
+        for metric, value in results['model_results']['metrics'].items():
+            summary[f"metric_{metric}"] = float(value)
+    except Exception as e:
+        logger.error(f"Job {job['name']} failed: {str(e)}")
+        summary['status'] = 'failed'
+        summary['error'] = str(e)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+def _to_json(value):
+    if hasattr(value, 'to_dict'):
+        # Array-backed AnalysisResults / FeatureImportance
+        return value.to_dict()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def run_batch(jobs, output_dir="batch_results", workers=None, cpus_per_job=None):
+    """
+    Run manifest jobs across a process pool
+
+    Args:
+        jobs (list): Job dicts from load_manifest
+        output_dir (str): Directory for per-job results.json files and the summary
+        workers (int): Concurrent jobs; defaults to as many as the CPUs allow
+        cpus_per_job (int): CPUs each job may use; defaults to an even split
+
+    Returns:
+        pd.DataFrame: One summary row per job with status, rows, seconds and metrics
+    """
+    if not jobs:
+        raise ValueError("No jobs to run")
+    cpu_count = available_cpus()
+    if workers is None:
+        workers = max(1, min(len(jobs), cpu_count // (cpus_per_job or 1)))
+    if cpus_per_job is None:
+        cpus_per_job = max(1, cpu_count // workers)
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Running {len(jobs)} jobs on {workers} workers with {cpus_per_job} CPUs each")
+
+    start = time.perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cpus_per_job,)) as executor:
+        futures = {executor.submit(_run_job, job, output_dir, cpus_per_job): job for job in jobs}
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            logger.info(
+                f"[{len(summaries)}/{len(jobs)}] {summary['name']}: {summary['status']} "
+                f"in {summary['seconds']:.1f}s"
+            )
+    wall_time = time.perf_counter() - start
+
+    summary_df = pd.DataFrame(summaries)
+    summary_df.to_parquet(os.path.join(output_dir, "summary.parquet"), index=False)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            'wall_time': wall_time,
+            'workers': workers,
+            'cpus_per_job': cpus_per_job,
+            'jobs': summaries
+        }, f, indent=2, default=_to_json)
+
+    _print_throughput(summary_df, wall_time, workers)
+    return summary_df
+
+def _print_throughput(summary_df, wall_time, workers):
+    done = summary_df[summary_df['status'] == 'done']
+    rows = int(done['rows'].sum()) if 'rows' in done else 0
+    job_time = float(summary_df['seconds'].sum())
+    print(f"Jobs: {len(done)} succeeded, {len(summary_df) - len(done)} failed")
+    print(f"Wall time: {wall_time:.1f}s for {job_time:.1f}s of job time "
+          f"({job_time / wall_time if wall_time else 0:.1f}x on {workers} workers)")
+    print(f"Throughput: {len(summary_df) / wall_time * 3600 if wall_time else 0:.1f} jobs/hour, "
+          f"{rows / wall_time if wall_time else 0:,.0f} rows/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ML workflow over many datasets")
+    parser.add_argument('manifest', help="JSON or CSV manifest of jobs (data_path, target_column, model_type, ...)")
+    parser.add_argument('--output-dir', default='batch_results', help="Where results and the summary are written")
+    parser.add_argument('--workers', type=int, default=None, help="Jobs run at the same time")
+    parser.add_argument('--cpus-per-job', type=int, default=None, help="CPUs each job may use")
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    summary_df = run_batch(jobs, args.output_dir, args.workers, args.cpus_per_job)
+    return 0 if (summary_df['status'] == 'done').all() else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
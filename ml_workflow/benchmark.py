@@ -0,0 +1,325 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STAGES = ('load', 'preprocess', 'analysis', 'importance', 'train', 'workflow')
+CASE_KEYS = ('task', 'rows', 'numeric', 'categorical', 'cardinality')
+
+GRIDS = {
+    'quick': {
+        'tasks': ['classification', 'regression'],
+        'rows': [2_000, 20_000],
+        'numeric': [10],
+        'categorical': [2],
+        'cardinality': [10, 1_000]
+    },
+    'default': {
+        'tasks': ['classification', 'regression'],
+        'rows': [10_000, 100_000, 500_000],
+        'numeric': [10, 100],
+        'categorical': [0, 5],
+        'cardinality': [10, 10_000]
+    }
+}
+
+def make_dataset(task, rows, numeric, categorical, cardinality, missing_rate=0.05, random_state=42):
+    """
+    Generate a synthetic dataset with a 'target' column
+
+    Numeric features come from make_classification/make_regression, so part of
+    them is informative. Each categorical column draws string labels from
+    `cardinality` values with a Zipf-like frequency profile, and shifts the
+    target signal slightly so that it is not pure noise.
+
+    Args:
+        task (str): 'classification' or 'regression'
+        rows (int): Number of rows
+        numeric (int): Number of numeric features
+        categorical (int): Number of categorical (string) features
+        cardinality (int): Distinct values per categorical feature
+        missing_rate (float): Fraction of feature values set to missing
+        random_state (int): Seed
+
+    Returns:
+        pd.DataFrame: Features plus 'target'
+    """
+    from sklearn.datasets import make_classification, make_regression
+
+    rng = np.random.default_rng(random_state)
+    n_numeric = max(numeric, 2)
+    if task == 'classification':
+        X, y = make_classification(
+            n_samples=rows, n_features=n_numeric, n_informative=max(2, n_numeric // 3),
+            n_redundant=0, random_state=random_state
+        )
+    else:
+        X, y = make_regression(
+            n_samples=rows, n_features=n_numeric, n_informative=max(1, n_numeric // 3),
+            noise=10.0, random_state=random_state
+        )
+    X = X[:, :numeric]
+    X[rng.random(X.shape) < missing_rate] = np.nan
+    df = pd.DataFrame(X, columns=[f"num_{i}" for i in range(X.shape[1])])
+
+    weights = 1.0 / np.arange(1, cardinality + 1)
+    weights /= weights.sum()
+    for j in range(categorical):
+        codes = rng.choice(cardinality, size=rows, p=weights)
+        labels = np.array([f"c{j}_{k}" for k in range(cardinality)], dtype=object)
+        values = labels[codes]
+        values[rng.random(rows) < missing_rate] = None
+        df[f"cat_{j}"] = values
+        if task == 'regression':
+            y = y + (codes % 3 - 1) * 0.1 * np.std(y)
+
+    df['target'] = y
+    return df
+
+def run_case(case, work_dir, estimator='linear', search_strategy='grid', trace_memory=True,
+             random_state=42):
+    """
+    Time every agent stage and the full workflow on one synthetic dataset
+
+    Args:
+        case (dict): Values for CASE_KEYS
+        work_dir (str): Directory for the generated CSV file
+        estimator (str): Registered estimator backend used for training
+        search_strategy (str): Hyperparameter search used for training
+        trace_memory (bool): Measure allocation peaks with tracemalloc (slower)
+        random_state (int): Seed for the data
+
+    Returns:
+        list: One record per stage with the case values and the measurements
+    """
+    from agents.data_agent import DataAgent
+    from agents.analysis_agent import AnalysisAgent
+    from agents.model_agent import ModelAgent
+    from app import MLWorkflowOrchestrator
+    from profiling import StageProfiler
+
+    df = make_dataset(case['task'], case['rows'], case['numeric'], case['categorical'],
+                      case['cardinality'], random_state=random_state)
+    path = os.path.join(work_dir, "benchmark_{task}_{rows}_{numeric}_{categorical}_{cardinality}.csv".format(**case))
+    df.to_csv(path, index=False)
+    del df
+
+    profiler = StageProfiler(trace_memory=trace_memory)
+    data_agent, analysis_agent, model_agent = DataAgent(), AnalysisAgent(), ModelAgent()
+    with profiler.stage('load'):
+        df = data_agent.load_data(path, optimize_memory=True)
+    with profiler.stage('preprocess'):
+        data = data_agent.preprocess_data(df, 'target')
+    with profiler.stage('analysis'):
+        analysis_agent.analyze_data(data)
+    with profiler.stage('importance'):
+        analysis_agent.get_feature_importance(data, 'target', sample_size=10_000)
+    with profiler.stage('train'):
+        model_agent.train_and_evaluate(
+            data, 'target', model_type=case['task'], estimator=estimator, search_strategy=search_strategy
+        )
+    del df, data
+    with profiler.stage('workflow'):
+        MLWorkflowOrchestrator().run_workflow(
+            path, 'target', model_type=case['task'], load_options={'optimize_memory': True},
+            estimator=estimator, search_strategy=search_strategy, importance_method='model'
+        )
+    os.remove(path)
+
+    return [
+        {**case, 'stage': stage, **measurements}
+        for stage, measurements in profiler.report().items()
+    ]
+
+def environment_info():
+    """Versions and host details stored with every result so runs can be compared"""
+    import sklearn
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+def run_benchmarks(grid, output_path, repeats=1, estimator='linear', search_strategy='grid',
+                   trace_memory=True, isolate=True):
+    """
+    Run every case of a grid and append the measurements to a JSON-lines file
+
+    Args:
+        grid (dict): Lists of 'tasks', 'rows', 'numeric', 'categorical', 'cardinality'
+        output_path (str): JSON-lines results file; records are appended
+        repeats (int): Runs per case
+        estimator (str): Registered estimator backend used for training
+        search_strategy (str): Hyperparameter search used for training
+        trace_memory (bool): Measure allocation peaks with tracemalloc
+        isolate (bool): Run every case in a fresh process so max RSS is per case
+
+    Returns:
+        pd.DataFrame: The records of this run
+    """
+    run_id = time.strftime("%Y%m%dT%H%M%S")
+    env = environment_info()
+    cases = [
+        dict(zip(CASE_KEYS, values))
+        for values in itertools.product(
+            grid['tasks'], grid['rows'], grid['numeric'], grid['categorical'], grid['cardinality']
+        )
+        # Cardinality only matters when there are categorical columns
+        if values[3] > 0 or values[4] == min(grid['cardinality'])
+    ]
+    logger.info(f"Benchmark run {run_id}: {len(cases)} cases x {repeats} repeats")
+
+    records = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for i, (case, repeat) in enumerate(itertools.product(cases, range(repeats))):
+            logger.info(f"[{i + 1}/{len(cases) * repeats}] {case}")
+            args = (case, work_dir, estimator, search_strategy, trace_memory)
+            try:
+                if isolate:
+                    with ProcessPoolExecutor(max_workers=1,
+                                             mp_context=multiprocessing.get_context('spawn')) as executor:
+                        case_records = executor.submit(run_case, *args).result()
+                else:
+                    case_records = run_case(*args)
+            except Exception as e:
+                logger.error(f"Benchmark case {case} failed: {str(e)}")
+                continue
+            for record in case_records:
+                record.update({
+                    'run_id': run_id, 'repeat': repeat, 'estimator': estimator,
+                    'search_strategy': search_strategy, **env
+                })
+            records.extend(case_records)
+
+    with open(output_path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=float) + "\n")
+    logger.info(f"Wrote {len(records)} records to {output_path}")
+    return pd.DataFrame(records)
+
+def load_results(path, run_id=None):
+    """Read a JSON-lines results file, by default keeping only its latest run"""
+    results = pd.read_json(path, lines=True, dtype={'run_id': str})
+    return results[results['run_id'] == (run_id or results['run_id'].max())]
+
+def scaling_summary(results):
+    """
+    Median time and memory per case and stage, plus how each stage scales with rows
+
+    Returns:
+        tuple: (per-case table, table of log-log slopes of wall time against rows;
+            1.0 means linear scaling)
+    """
+    metrics = [col for col in ('wall_time', 'process_cpu_time', 'tracemalloc_peak', 'max_rss_increase')
+               if col in results]
+    table = results.groupby(list(CASE_KEYS) + ['stage'])[metrics].median().reset_index()
+
+    slopes = []
+    others = [key for key in CASE_KEYS if key != 'rows']
+    for values, group in table.groupby(others + ['stage']):
+        group = group[group['wall_time'] > 0]
+        if group['rows'].nunique() < 2:
+            continue
+        slope = np.polyfit(np.log(group['rows']), np.log(group['wall_time']), 1)[0]
+        slopes.append({**dict(zip(others + ['stage'], values)), 'rows_exponent': slope})
+    return table, pd.DataFrame(slopes)
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compare median wall times and allocation peaks of two runs case by case
+
+    Args:
+        current (pd.DataFrame): Records of the run under test
+        baseline (pd.DataFrame): Records of the reference run
+        tolerance (float): Relative slowdown (or memory growth) reported as a regression
+
+    Returns:
+        pd.DataFrame: Ratios current / baseline with a 'regression' flag
+    """
+    keys = list(CASE_KEYS) + ['stage']
+    metrics = [col for col in ('wall_time', 'tracemalloc_peak') if col in current and col in baseline]
+    merged = current.groupby(keys)[metrics].median().join(
+        baseline.groupby(keys)[metrics].median(), rsuffix='_baseline', how='inner'
+    )
+    flags = []
+    for metric in metrics:
+        merged[f"{metric}_ratio"] = merged[metric] / merged[f"{metric}_baseline"]
+        flags.append(merged[f"{metric}_ratio"] > 1 + tolerance)
+    merged['regression'] = np.logical_or.reduce(flags) if flags else False
+    return merged.reset_index()
+
+def _int_list(value):
+    return [int(v) for v in value.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for the ML workflow on synthetic data")
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='quick', help="Preset case grid")
+    parser.add_argument('--tasks', type=lambda v: v.split(','), help="e.g. classification,regression")
+    parser.add_argument('--rows', type=_int_list, help="e.g. 10000,100000")
+    parser.add_argument('--numeric', type=_int_list, help="Numeric feature counts")
+    parser.add_argument('--categorical', type=_int_list, help="Categorical feature counts")
+    parser.add_argument('--cardinality', type=_int_list, help="Distinct values per categorical feature")
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--estimator', default='linear')
+    parser.add_argument('--search-strategy', default='grid')
+    parser.add_argument('--no-trace-memory', action='store_true', help="Skip tracemalloc (faster, RSS only)")
+    parser.add_argument('--no-isolate', action='store_true', help="Run all cases in this process")
+    parser.add_argument('--output', default='benchmark_results.jsonl', help="JSON-lines results file")
+    parser.add_argument('--compare', help="Results file (or run) to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    grid = dict(GRIDS[args.grid])
+    for key in ('tasks', 'rows', 'numeric', 'categorical', 'cardinality'):
+        if getattr(args, key):
+            grid[key] = getattr(args, key)
+
+    results = run_benchmarks(
+        grid, args.output, repeats=args.repeats, estimator=args.estimator,
+        search_strategy=args.search_strategy, trace_memory=not args.no_trace_memory,
+        isolate=not args.no_isolate
+    )
+    if results.empty:
+        return 1
+
+    table, slopes = scaling_summary(results)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(table.to_string(index=False))
+        if not slopes.empty:
+            print("\nWall time scaling with rows (log-log slope):")
+            print(slopes.to_string(index=False))
+
+        if args.compare:
+            comparison = compare(results, load_results(args.compare), args.tolerance)
+            print("\nComparison with baseline:")
+            print(comparison.to_string(index=False))
+            if comparison['regression'].any():
+                print(f"\n{int(comparison['regression'].sum())} stage(s) regressed beyond {args.tolerance:.0%}")
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
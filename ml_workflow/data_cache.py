@@ -0,0 +1,144 @@
+import hashlib
+import os
+import uuid
+import pandas as pd
+import pyarrow.parquet as pq
+from agents.data_agent import DataAgent
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DatasetCache:
+    """
+    Columnar Parquet copies of uploaded datasets, keyed by a hash of the file content.
+
+    An upload is parsed once; later previews and workflow runs read the Parquet
+    file, which supports column projection. The copy is stored losslessly: integers
+    are downcast and low-cardinality strings stored as category, but floats keep
+    their precision; a lossy float32 downcast is left to load time, when requested.
+    """
+
+    def __init__(self, cache_dir="temp_data/cache", load_options=None):
+        self.cache_dir = cache_dir
+        self.load_options = (
+            load_options if load_options is not None
+            else {'optimize_memory': True, 'downcast_floats': False}
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def content_hash(data, block_size=1 << 20):
+        """
+        Hash raw file content
+
+        Args:
+            data (bytes | memoryview | str): File content, or a path to the file
+            block_size (int): Bytes hashed per update when reading from a path
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        if isinstance(data, str):
+            with open(data, 'rb') as f:
+                for block in iter(lambda: f.read(block_size), b''):
+                    digest.update(block)
+        else:
+            digest.update(data)
+        return digest.hexdigest()
+
+    def path_for(self, dataset_hash):
+        # Copies made before floats were kept at full precision are not reused
+        return os.path.join(self.cache_dir, f"{dataset_hash}.lossless.parquet")
+
+    def get_or_convert(self, data, file_name, dataset_hash=None):
+        """
+        Return the Parquet copy of a dataset, converting it on a cache miss
+
+        Args:
+            data (bytes | memoryview): Raw content of the uploaded CSV/Excel file
+            file_name (str): Original file name, used to pick the parser
+            dataset_hash (str): Precomputed content hash, if already known
+
+        Returns:
+            tuple: (path to the Parquet file, content hash)
+        """
+        try:
+            dataset_hash = dataset_hash or self.content_hash(data)
+            parquet_path = self.path_for(dataset_hash)
+            if os.path.exists(parquet_path):
+                logger.info(f"Dataset cache hit for {file_name} ({dataset_hash[:12]})")
+                return parquet_path, dataset_hash
+
+            # Parse from a private copy of the raw file, then publish the Parquet atomically
+            extension = os.path.splitext(file_name)[1].lower()
+            token = uuid.uuid4().hex
+            raw_path = os.path.join(self.cache_dir, f"{dataset_hash}.{token}{extension}")
+            tmp_path = f"{parquet_path}.{token}.tmp"
+            try:
+                with open(raw_path, 'wb') as f:
+                    f.write(data)
+                df = DataAgent().load_data(raw_path, **self.load_options)
+                df.columns = [str(col) for col in df.columns]
+                self._unify_mixed_types(df, raw_path)
+                df.to_parquet(tmp_path, engine='pyarrow', index=False)
+                os.replace(tmp_path, parquet_path)
+            finally:
+                for path in (raw_path, tmp_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            logger.info(f"Cached {file_name} as {parquet_path}")
+            return parquet_path, dataset_hash
+
+        except Exception as e:
+            logger.error(f"Error caching dataset: {str(e)}")
+            raise
+
+    @staticmethod
+    def _unify_mixed_types(df, raw_path=None):
+        """
+        Store columns holding several Python types as text
+
+        Chunked parsing can infer a column as numeric in early chunks and as text in
+        later ones; Parquet columns need a single type. For CSV uploads such columns
+        are re-read as text from the raw file, so e.g. "007" keeps its zeros; other
+        values are converted with str(). Missing values are kept.
+        """
+        mixed = []
+        for col in df.columns:
+            series = df[col]
+            is_category = isinstance(series.dtype, pd.CategoricalDtype)
+            if not (is_category or series.dtype == object):
+                continue
+            values = series.cat.categories if is_category else series
+            if pd.api.types.infer_dtype(values, skipna=True) in ('mixed', 'mixed-integer'):
+                mixed.append(col)
+        if not mixed:
+            return df
+
+        logger.warning(f"Columns {mixed} mix value types; caching them as text")
+        text = None
+        if raw_path is not None and raw_path.endswith('.csv'):
+            text = pd.read_csv(raw_path, usecols=mixed, dtype=str)
+            if len(text) != len(df):
+                # Rows were sampled while loading, so the raw rows do not line up
+                text = None
+        for col in mixed:
+            series = df[col]
+            values = text[col].to_numpy() if text is not None else series.astype(object).astype(str)
+            values = pd.Series(values, index=df.index, dtype=str)
+            df[col] = values.astype('category') if isinstance(series.dtype, pd.CategoricalDtype) else values
+        return df
+
+    def preview(self, parquet_path, n_rows=5):
+        """Read only the first rows of a cached dataset"""
+        parquet_file = pq.ParquetFile(parquet_path)
+        batch = next(parquet_file.iter_batches(batch_size=n_rows), None)
+        if batch is None:
+            return parquet_file.schema_arrow.empty_table().to_pandas()
+        return batch.to_pandas()
+
+    def columns(self, parquet_path):
+        """Column names of a cached dataset, read from the Parquet footer"""
+        return pq.read_schema(parquet_path).names
@@ -0,0 +1,160 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app import MLWorkflowOrchestrator
+from agents.resources import available_cpus
+from workflow_graph import WorkflowCancelled
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """State of one background workflow run"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.params = params
+        self.status = 'queued'
+        self.stages = {}
+        self.baseline = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def set_status(self, status, **fields):
+        """Update the status, its timestamp and result fields in one step"""
+        with self._lock:
+            self.status = status
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if status == 'running':
+                self.started_at = time.time()
+            elif self.finished:
+                self.finished_at = time.time()
+
+    def on_progress(self, stage, status, seconds):
+        with self._lock:
+            self.stages[stage] = {'status': status, 'seconds': seconds}
+
+    def on_baseline(self, baseline):
+        self.baseline = baseline
+
+    def snapshot(self):
+        """A consistent copy of the job state for display"""
+        with self._lock:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'stages': {name: dict(info) for name, info in self.stages.items()},
+                'baseline': self.baseline,
+                'error': self.error,
+                'submitted_at': self.submitted_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+
+
+class JobManager:
+    """
+    Runs ML workflows on a background thread pool so the UI never blocks.
+
+    Every job gets its own MLWorkflowOrchestrator, so concurrent jobs (from one or
+    many dashboard sessions) do not share agent state. Stage outputs go through
+    the shared artifact cache, and finished jobs keep their results until they
+    are evicted by newer ones. Each job gets an equal CPU budget, so concurrent
+    jobs do not oversubscribe the host.
+    """
+
+    def __init__(self, max_workers=2, artifact_cache=None, max_finished_jobs=50, cpus_per_job=None):
+        """
+        Args:
+            max_workers (int): Jobs run at the same time
+            artifact_cache (ArtifactCache): Stage cache shared by all jobs
+            max_finished_jobs (int): Finished jobs kept before the oldest are dropped
+            cpus_per_job (int): CPU budget (run_workflow n_cpus) of every job unless a job
+                sets its own; defaults to an even split of the available CPUs
+        """
+        self.artifact_cache = artifact_cache
+        self.max_finished_jobs = max_finished_jobs
+        self.cpus_per_job = cpus_per_job or max(1, available_cpus() // max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ml-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, **params):
+        """
+        Queue a workflow run
+
+        Args:
+            **params: Keyword arguments for MLWorkflowOrchestrator.run_workflow
+
+        Returns:
+            str: Job id
+        """
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        job.future = self._executor.submit(self._run, job)
+        logger.info(f"Submitted job {job.id}")
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
+
+    def cancel(self, job_id):
+        """
+        Request cancellation; queued jobs never start, running jobs stop at the next
+        stage or, while tuning, the next candidate batch
+
+        Returns:
+            bool: True if the job existed and was not finished
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.set_status('cancelled')
+        return True
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.set_status('cancelled')
+            return
+        job.set_status('running')
+        try:
+            result = MLWorkflowOrchestrator().run_workflow(
+                **{'n_cpus': self.cpus_per_job, **job.params},
+                cache=self.artifact_cache,
+                progress_callback=job.on_progress,
+                cancel_event=job.cancel_event,
+                on_baseline=job.on_baseline
+            )
+            job.set_status('done', result=result)
+        except WorkflowCancelled:
+            job.set_status('cancelled')
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.set_status('failed', error=str(e))
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+import joblib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ModelStore:
+    """
+    Versioned on-disk store of trained models and their preprocessing pipelines.
+
+    Each version lives in `<root>/<name>/v0001/` with the estimator, the fitted
+    PreprocessingPipeline and a metadata.json. Artifacts are written uncompressed
+    so their NumPy arrays can be memory-mapped when loaded.
+    """
+
+    def __init__(self, root="models"):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def versions(self, name):
+        """Saved versions of a model, oldest first"""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(v for v in os.listdir(model_dir) if re.fullmatch(r"v\d{4}", v))
+
+    def save(self, name, model, pipeline, metadata=None):
+        """
+        Save a trained model as a new version
+
+        Args:
+            name (str): Model name
+            model: Fitted estimator
+            pipeline (PreprocessingPipeline): Fitted preprocessing for the model's features
+            metadata (dict): JSON-serializable details, e.g. target, metrics, parameters
+
+        Returns:
+            str: The new version, e.g. 'v0003'
+        """
+        try:
+            model_dir = os.path.join(self.root, name)
+            os.makedirs(model_dir, exist_ok=True)
+
+            # Write into a private directory and rename it into place when complete
+            tmp_dir = os.path.join(model_dir, f".tmp-{uuid.uuid4().hex}")
+            os.makedirs(tmp_dir)
+            try:
+                joblib.dump(model, os.path.join(tmp_dir, "model.joblib"))
+                joblib.dump(pipeline, os.path.join(tmp_dir, "pipeline.joblib"))
+                metadata = dict(metadata or {})
+                metadata.setdefault('feature_names', list(pipeline.feature_names))
+                metadata['created_at'] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                with open(os.path.join(tmp_dir, "metadata.json"), "w", encoding="utf-8") as f:
+                    json.dump(metadata, f, indent=2, default=str)
+
+                while True:
+                    existing = self.versions(name)
+                    version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+                    try:
+                        os.rename(tmp_dir, os.path.join(model_dir, version))
+                        break
+                    except OSError:
+                        # Another writer claimed this version first
+                        if not os.path.exists(os.path.join(model_dir, version)):
+                            raise
+            finally:
+                if os.path.exists(tmp_dir):
+                    shutil.rmtree(tmp_dir)
+
+            logger.info(f"Saved model {name} {version}")
+            return version
+
+        except Exception as e:
+            logger.error(f"Error saving model: {str(e)}")
+            raise
+
+    def load(self, name, version='latest', mmap_mode='r'):
+        """
+        Load a saved model version
+
+        Args:
+            name (str): Model name
+            version (str): Version such as 'v0002', or 'latest'
+            mmap_mode (str): joblib memory-mapping mode for the model arrays, or None
+
+        Returns:
+            tuple: (model, pipeline, metadata)
+        """
+        versions = self.versions(name)
+        if not versions:
+            raise FileNotFoundError(f"No saved versions for model '{name}' in {self.root}")
+        if version == 'latest':
+            version = versions[-1]
+        elif version not in versions:
+            raise FileNotFoundError(f"Model '{name}' has no version {version}")
+
+        version_dir = os.path.join(self.root, name, version)
+        model = joblib.load(os.path.join(version_dir, "model.joblib"), mmap_mode=mmap_mode)
+        pipeline = joblib.load(os.path.join(version_dir, "pipeline.joblib"))
+        with open(os.path.join(version_dir, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        metadata['version'] = version
+        return model, pipeline, metadata
@@ -0,0 +1,231 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from agents.data_agent import DataAgent
+from model_store import ModelStore
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PredictionService:
+    """
+    Scores new data with a saved model and its preprocessing pipeline.
+
+    The model is loaded once (memory-mapped by default) and reused for every
+    request, file chunk or micro-batch.
+    """
+
+    def __init__(self, store, name, version='latest', mmap_mode='r'):
+        self.model, self.pipeline, self.metadata = store.load(name, version, mmap_mode=mmap_mode)
+        self.name = name
+        logger.info(f"Loaded model {name} {self.metadata['version']}")
+
+    def predict_frame(self, df):
+        """Predict for a dataframe containing the raw feature columns"""
+        return self.model.predict(self.pipeline.transform(df))
+
+    def predict_records(self, records):
+        """Predict for a list of JSON-style records (dicts of feature values)"""
+        if not records:
+            return []
+        return self.predict_frame(pd.DataFrame.from_records(records)).tolist()
+
+    def score_file(self, input_path, output_path, chunksize=100_000, prediction_column='prediction'):
+        """
+        Score a CSV or Parquet file chunk by chunk and write the rows with predictions
+
+        Args:
+            input_path (str): CSV or Parquet file with the raw feature columns
+            output_path (str): Output file; written as Parquet if it ends in .parquet, else CSV
+            chunksize (int): Rows scored at a time, bounding memory use
+            prediction_column (str): Name of the added prediction column
+
+        Returns:
+            int: Number of rows scored
+        """
+        try:
+            writer = None
+            rows = 0
+            for chunk in DataAgent().iter_chunks(input_path, chunksize=chunksize):
+                chunk[prediction_column] = self.predict_frame(chunk)
+                if output_path.endswith('.parquet'):
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(output_path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+                rows += len(chunk)
+            if writer is not None:
+                writer.close()
+            logger.info(f"Scored {rows} rows from {input_path} into {output_path}")
+            return rows
+
+        except Exception as e:
+            logger.error(f"Error scoring file: {str(e)}")
+            raise
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into larger batches.
+
+    Requests are queued and a worker thread scores everything that arrives within
+    `max_wait` seconds (up to `max_batch_size` records) with one model call, then
+    hands each request its slice of the predictions.
+    """
+
+    def __init__(self, service, max_batch_size=512, max_wait=0.01):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, records):
+        """Queue a list of records; returns a Future resolving to their predictions"""
+        future = Future()
+        if self._stopped.is_set():
+            future.set_exception(RuntimeError("MicroBatcher is closed"))
+        else:
+            self._queue.put((records, future))
+        return future
+
+    def predict(self, records, timeout=None):
+        return self.submit(records).result(timeout=timeout)
+
+    def close(self):
+        self._stopped.set()
+        self._worker.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            size = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._score(batch)
+
+        # Fail whatever is still queued after close()
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.set_exception(RuntimeError("MicroBatcher is closed"))
+
+    def _score(self, batch):
+        try:
+            records = [record for request, _ in batch for record in request]
+            predictions = self.service.predict_records(records)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        offset = 0
+        for request, future in batch:
+            future.set_result(predictions[offset:offset + len(request)])
+            offset += len(request)
+
+
+def serve(batcher, host='127.0.0.1', port=8600):
+    """
+    Serve predictions over HTTP
+
+    POST /predict with {"records": [{...}, ...]} returns {"predictions": [...]};
+    GET /health returns the model metadata.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/health':
+                self._send(404, {'error': 'not found'})
+                return
+            self._send(200, batcher.service.metadata)
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                records = body['records'] if isinstance(body, dict) else body
+                self._send(200, {'predictions': batcher.predict(records, timeout=30)})
+            except Exception as e:
+                self._send(400, {'error': str(e)})
+
+        def _send(self, status, payload):
+            data = json.dumps(payload, default=_to_json).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    logger.info(f"Serving model {batcher.service.name} at http://{host}:{port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down prediction service")
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score data with a saved ML workflow model")
+    parser.add_argument('--store', default='models', help="Model store directory")
+    parser.add_argument('--model', required=True, help="Saved model name")
+    parser.add_argument('--version', default='latest', help="Model version, e.g. v0002")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = subparsers.add_parser('score', help="Score a CSV/Parquet file in chunks")
+    score_parser.add_argument('input')
+    score_parser.add_argument('output')
+    score_parser.add_argument('--chunksize', type=int, default=100_000)
+
+    serve_parser = subparsers.add_parser('serve', help="Serve JSON prediction requests over HTTP")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8600)
+    serve_parser.add_argument('--max-batch-size', type=int, default=512)
+    serve_parser.add_argument('--max-wait', type=float, default=0.01)
+
+    args = parser.parse_args(argv)
+    service = PredictionService(ModelStore(args.store), args.model, args.version)
+    if args.command == 'score':
+        service.score_file(args.input, args.output, chunksize=args.chunksize)
+    else:
+        serve(MicroBatcher(service, args.max_batch_size, args.max_wait), args.host, args.port)
+
+if __name__ == "__main__":
+    main()
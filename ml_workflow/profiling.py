@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, memory peaks and explicit DataFrame.copy() calls per
+    workflow stage.
+
+    Peak memory (tracemalloc, max RSS) and copy counts are process-wide, so profiled
+    stages hold a class-level lock: stages of concurrent profiled runs (e.g. two
+    dashboard jobs) wait for each other instead of resetting each other's peaks.
+    Unprofiled work running at the same time is still included. Only explicit
+    .copy() calls are counted, not copies pandas makes inside iloc, astype or
+    concat. CPU time is reported for the stage's own thread and for the whole
+    process; work done in joblib worker processes is not included.
+    """
+
+    # Held for the duration of a profiled stage, across all profilers
+    _stage_lock = threading.RLock()
+    _patch_lock = threading.Lock()
+    _patch_users = 0
+    _original_copy = None
+    _copy_was_overridden = False
+    _copy_counts = {'calls': 0, 'deep': 0}
+
+    def __init__(self, trace_memory=True):
+        """
+        Args:
+            trace_memory (bool): Track Python/NumPy allocations with tracemalloc; gives
+                the per-stage allocation peak but slows allocation-heavy code down
+        """
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the code run inside the block as stage `name`"""
+        with self._stage_lock:
+            with self._measure(name):
+                yield
+
+    @contextmanager
+    def _measure(self, name):
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        self._install_copy_counter()
+        copies_before = dict(self._copy_counts)
+        rss_before = self._max_rss()
+        wall_start = time.perf_counter()
+        thread_start = time.thread_time()
+        process_start = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'wall_time': time.perf_counter() - wall_start,
+                'cpu_time': time.thread_time() - thread_start,
+                'process_cpu_time': time.process_time() - process_start,
+                'explicit_copies': self._copy_counts['calls'] - copies_before['calls'],
+                'explicit_deep_copies': self._copy_counts['deep'] - copies_before['deep']
+            }
+            rss_after = self._max_rss()
+            if rss_after is not None:
+                record['max_rss'] = rss_after
+                record['max_rss_increase'] = rss_after - rss_before
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['tracemalloc_peak'] = peak - traced_before
+                record['tracemalloc_retained'] = current - traced_before
+                if started_tracing:
+                    tracemalloc.stop()
+            self._uninstall_copy_counter()
+            self.stages[name] = record
+            logger.info(
+                f"Profiled stage {name}: {record['wall_time']:.2f}s wall, "
+                f"{record['process_cpu_time']:.2f}s CPU, {record['explicit_copies']} explicit DataFrame.copy() calls"
+            )
+
+    def report(self):
+        """Per-stage measurements; byte counts are in bytes, times in seconds"""
+        return {name: dict(record) for name, record in self.stages.items()}
+
+    @staticmethod
+    def _max_rss():
+        """Process high-water resident set size in bytes, if the platform reports it"""
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @classmethod
+    def _install_copy_counter(cls):
+        with cls._patch_lock:
+            if cls._patch_users == 0:
+                original = pd.DataFrame.copy
+                counts = cls._copy_counts
+
+                def counting_copy(self, deep=True):
+                    counts['calls'] += 1
+                    if deep:
+                        counts['deep'] += 1
+                    return original(self, deep=deep)
+
+                cls._original_copy = original
+                cls._copy_was_overridden = 'copy' in pd.DataFrame.__dict__
+                pd.DataFrame.copy = counting_copy
+            cls._patch_users += 1
+
+    @classmethod
+    def _uninstall_copy_counter(cls):
+        with cls._patch_lock:
+            cls._patch_users -= 1
+            if cls._patch_users == 0:
+                if cls._copy_was_overridden:
+                    pd.DataFrame.copy = cls._original_copy
+                else:
+                    # The method was inherited; drop the patch instead of pinning it on DataFrame
+                    del pd.DataFrame.copy
+                cls._original_copy = None
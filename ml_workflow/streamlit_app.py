@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-from app import MLWorkflowOrchestrator
 from agents.dashboard_agent import DashboardAgent
+from data_cache import DatasetCache
+from artifact_cache import ArtifactCache
+from job_manager import JobManager
 import os
+import time
 
 # Set page config
 st.set_page_config(
@@ -13,10 +16,98 @@ st.set_page_config(
 
 # Initialize agents
 @st.cache_resource
-def get_agents():
-    return MLWorkflowOrchestrator(), DashboardAgent()
+def get_dashboard_agent():
+    return DashboardAgent()
 
-orchestrator, dashboard_agent = get_agents()
+dashboard_agent = get_dashboard_agent()
+
+@st.cache_resource
+def get_dataset_cache():
+    return DatasetCache(os.path.join("temp_data", "cache"))
+
+dataset_cache = get_dataset_cache()
+
+@st.cache_resource
+def get_artifact_cache():
+    return ArtifactCache(os.path.join("temp_data", "artifacts"))
+
+artifact_cache = get_artifact_cache()
+
+# Workflows run on a shared background pool so reruns and other sessions stay responsive
+@st.cache_resource
+def get_job_manager():
+    return JobManager(max_workers=2, artifact_cache=artifact_cache)
+
+job_manager = get_job_manager()
+
+RESULT_VIEWS = {
+    "Feature Importance": 'feature_importance',
+    "Correlation Analysis": 'correlation_heatmap',
+    "Feature Distributions": 'feature_distributions',
+    "Model Metrics": 'metrics',
+    "Target Distribution": 'target_distribution'
+}
+
+def render_job_status(job):
+    """Show per-stage progress and the baseline for a queued or running job"""
+    snapshot = job.snapshot()
+    st.subheader(f"Workflow status: {snapshot['status']}")
+    for stage, info in snapshot['stages'].items():
+        seconds = f" ({info['seconds']:.1f}s)" if info['seconds'] is not None else ""
+        st.write(f"- **{stage}**: {info['status']}{seconds}")
+    if snapshot['baseline']:
+        baseline = snapshot['baseline']
+        metrics = ", ".join(f"{name}: {value:.3f}" for name, value in baseline['metrics'].items())
+        st.info(f"Baseline ({baseline['estimator']}, {baseline['train_time']:.1f}s): {metrics}")
+    if snapshot['error']:
+        st.error(f"Error: {snapshot['error']}")
+
+def render_results(job_id, results, model_name=None):
+    """Show the figures and tables of a finished workflow"""
+    load_report = results['load_report']
+    if results.get('model_version'):
+        st.sidebar.success(f"Saved model {model_name} {results['model_version']}")
+    if results['cache_hits']:
+        st.sidebar.caption(f"Reused cached stages: {', '.join(results['cache_hits'])}")
+    st.sidebar.caption(
+        f"Dataset memory: {load_report['memory_before'] / 1e6:.1f} MB parsed, "
+        f"{load_report['memory_after'] / 1e6:.1f} MB after dtype optimization"
+    )
+    
+    # Only the selected view is built; figures are cached by results hash across reruns
+    if st.session_state.get('results_job_id') != job_id:
+        st.session_state.results_job_id = job_id
+        st.session_state.results_key = dashboard_agent.results_key(results)
+    results_key = st.session_state.results_key
+    
+    views = dict(RESULT_VIEWS)
+    if 'profile' in results:
+        views["Stage Profile"] = 'profile'
+    view = st.radio(
+        "View",
+        list(views),
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    st.plotly_chart(
+        dashboard_agent.figure(views[view], results, results_key),
+        use_container_width=True
+    )
+    
+    if view == "Correlation Analysis":
+        st.subheader("Strongest Correlations")
+        st.dataframe(results['analysis_results'].correlation.top_pairs())
+        
+    elif view == "Model Metrics":
+        # Display best parameters
+        st.subheader("Best Model Parameters")
+        st.json(results['model_results']['best_params'])
+        st.subheader("Stage Timings (seconds)")
+        st.json(results['timings'])
+        
+    elif view == "Stage Profile":
+        st.dataframe(pd.DataFrame(results['profile']).T)
+        st.caption("Byte counts are in bytes; profiled stages ran one at a time. Copies count explicit DataFrame.copy() calls only.")
 
 # Title
 st.title("🤖 Machine Learning Workflow Dashboard")
@@ -32,30 +123,32 @@ uploaded_file = st.sidebar.file_uploader(
 )
 
 if uploaded_file is not None:
-    # Save uploaded file temporarily
-    file_path = os.path.join("temp_data", uploaded_file.name)
-    os.makedirs("temp_data", exist_ok=True)
-    
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    # Convert the upload to a Parquet copy once per distinct file content
+    upload_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
     
-    # Load data preview
     try:
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
+        if st.session_state.get('upload_key') != upload_key:
+            file_path, dataset_hash = dataset_cache.get_or_convert(
+                uploaded_file.getbuffer(), uploaded_file.name
+            )
+            st.session_state.upload_key = upload_key
+            st.session_state.dataset_path = file_path
+            st.session_state.dataset_hash = dataset_hash
+        file_path = st.session_state.dataset_path
+        
+        # Load data preview
+        df = dataset_cache.preview(file_path)
             
         st.sidebar.success("File uploaded successfully!")
         
         # Display data preview
         st.subheader("Data Preview")
-        st.dataframe(df.head())
+        st.dataframe(df)
         
         # Configuration options
         target_column = st.sidebar.selectbox(
             "Select target column",
-            df.columns.tolist()
+            dataset_cache.columns(file_path)
         )
         
         model_type = st.sidebar.selectbox(
@@ -63,57 +156,84 @@ if uploaded_file is not None:
             ["classification", "regression"]
         )
         
+        importance_method = st.sidebar.selectbox(
+            "Feature importance source",
+            ["model", "permutation", "sampled", "forest"],
+            help="'model' reuses the tuned model; 'sampled' fits a small forest in parallel with training"
+        )
+        
+        estimator = st.sidebar.selectbox(
+            "Select estimator",
+            ["random_forest", "hist_gradient_boosting", "linear", "sgd"]
+        )
+        
+        baseline_first = st.sidebar.checkbox(
+            "Show a quick baseline before tuning",
+            value=True
+        )
+        
+        search_strategy = st.sidebar.selectbox(
+            "Hyperparameter search",
+            ["grid", "halving", "random", "warm_start"],
+            help="'random', 'warm_start' and a budgeted 'grid' stop when the time budget is spent"
+        )
+        
+        if search_strategy == 'halving':
+            time_budget = None
+        elif search_strategy == 'grid':
+            # 0 keeps the exhaustive grid search
+            time_budget = st.sidebar.number_input(
+                "Tuning time budget (seconds, 0 = no limit)",
+                min_value=0, value=0, step=5
+            ) or None
+        else:
+            time_budget = st.sidebar.number_input(
+                "Tuning time budget (seconds)",
+                min_value=5, value=60, step=5
+            )
+        
+        profile = st.sidebar.checkbox(
+            "Profile stages (time, memory, explicit DataFrame.copy() calls)",
+            help="Stages run one at a time, also across profiled jobs, so measurements are per stage"
+        )
+        
+        save_model_as = st.sidebar.text_input(
+            "Save trained model as (optional)",
+            help="Saved models can be scored with prediction_service.py"
+        )
+        
         # Run analysis button
         if st.sidebar.button("Run Analysis"):
-            with st.spinner("Running ML workflow..."):
-                # Run the workflow
-                results = orchestrator.run_workflow(
-                    data_path=file_path,
-                    target_column=target_column,
-                    model_type=model_type
-                )
-                
-                # Create visualizations
-                figures = dashboard_agent.create_visualizations(
-                    results['analysis_results'],
-                    results['feature_importance'],
-                    results['model_results']
-                )
-                
-                # Display results in tabs
-                tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                    "Feature Importance",
-                    "Correlation Analysis",
-                    "Feature Distributions",
-                    "Model Metrics",
-                    "Target Distribution"
-                ])
-                
-                with tab1:
-                    st.plotly_chart(figures['feature_importance'], use_container_width=True)
-                    
-                with tab2:
-                    st.plotly_chart(figures['correlation_heatmap'], use_container_width=True)
-                    
-                with tab3:
-                    st.plotly_chart(figures['feature_distributions'], use_container_width=True)
-                    
-                with tab4:
-                    st.plotly_chart(figures['metrics'], use_container_width=True)
-                    # Display best parameters
-                    st.subheader("Best Model Parameters")
-                    st.json(results['model_results']['best_params'])
-                    
-                with tab5:
-                    st.plotly_chart(figures['target_distribution'], use_container_width=True)
-                
-                # Clean up
-                os.remove(file_path)
+            st.session_state.job_id = job_manager.submit(
+                data_path=file_path,
+                target_column=target_column,
+                model_type=model_type,
+                load_options={'optimize_memory': True, 'downcast_floats': False},
+                importance_method=importance_method,
+                search_strategy=search_strategy,
+                time_budget=time_budget,
+                estimator=estimator,
+                baseline_first=baseline_first,
+                dataset_hash=st.session_state.dataset_hash,
+                save_model_as=save_model_as or None,
+                profile=profile
+            )
+        
+        job = job_manager.get(st.session_state.get('job_id'))
+        if job is not None:
+            if job.status == 'done':
+                render_results(job.id, job.result, job.params.get('save_model_as'))
+            else:
+                render_job_status(job)
+                if not job.finished:
+                    if st.sidebar.button("Cancel Analysis"):
+                        job_manager.cancel(job.id)
+                    # Poll the background job without blocking other sessions
+                    time.sleep(1)
+                    st.rerun()
                 
     except Exception as e:
         st.error(f"Error: {str(e)}")
-        if os.path.exists(file_path):
-            os.remove(file_path)
             
 else:
     # Instructions
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from data_cache import DatasetCache
+
+
+def test_caches_column_that_turns_from_numbers_to_text(tmp_path):
+    # Chunked parsing infers 'code' as integers first and as text after row 120k
+    n = 150_000
+    codes = [str(i) if i < 120_000 else f'A{i}' for i in range(n)]
+    source = pd.DataFrame({'code': codes, 'value': np.arange(n)})
+    source.loc[5, 'code'] = None
+    source.loc[7, 'code'] = '007'
+    csv_path = tmp_path / 'upload.csv'
+    source.to_csv(csv_path, index=False)
+
+    cache = DatasetCache(str(tmp_path / 'cache'))
+    parquet_path, _ = cache.get_or_convert(csv_path.read_bytes(), 'upload.csv')
+    cached = pd.read_parquet(parquet_path)
+
+    assert cached['code'].iloc[0] == '0'
+    assert cached['code'].iloc[-1] == 'A149999'
+    assert cached['code'].iloc[7] == '007'
+    assert cached['code'].isna().sum() == 1
+    assert cached['value'].tolist() == list(range(n))
+
+
+def test_unify_mixed_types_keeps_single_type_columns():
+    df = pd.DataFrame({
+        'mixed': pd.Series([1, 'b', None], dtype=object),
+        'mixed_category': pd.Series([1, 'b', 1], dtype=object).astype('category'),
+        'text': ['a', 'b', 'c'],
+        'number': [1, 2, 3],
+    })
+    DatasetCache._unify_mixed_types(df)
+
+    assert df['mixed'].tolist()[:2] == ['1', 'b'] and pd.isna(df['mixed'].iloc[2])
+    assert list(df['mixed_category'].cat.categories) == ['1', 'b']
+    assert df['number'].dtype == np.int64
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+
+from agents.model_registry import get_estimator_spec
+from agents.preprocessing import PreprocessingPipeline
+
+
+def _mixed_frame(n=6000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'x1': rng.normal(100, 20, n),
+        'x2': rng.normal(size=n),
+        'plan': rng.choice(['basic', 'pro', 'team'], n),
+        # ID-like column whose codes run up to max_categories
+        'code': np.char.add('A', rng.integers(0, 3000, n).astype(str)),
+    })
+    signal = (df['x1'] - 100) / 20 + 2 * df['x2'] + 1.5 * (df['plan'] == 'pro')
+    return df, signal + rng.normal(scale=0.5, size=n)
+
+
+@pytest.mark.parametrize('estimator', ['sgd', 'linear'])
+@pytest.mark.parametrize('high_cardinality', ['frequency', 'hash'])
+def test_linear_backends_score_on_mixed_features(estimator, high_cardinality):
+    df, signal = _mixed_frame()
+    train, test = np.arange(5000), np.arange(5000, len(df))
+    pipeline = PreprocessingPipeline(high_cardinality=high_cardinality).fit(df, rows=train)
+    X_train, X_test = pipeline.transform(df, train), pipeline.transform(df, test)
+
+    regressor = clone(get_estimator_spec(estimator, 'regression')['estimator'])
+    regressor.fit(X_train, signal.iloc[train])
+    assert regressor.score(X_test, signal.iloc[test]) > 0.8
+
+    labels = (signal > signal.median()).astype(int)
+    classifier = clone(get_estimator_spec(estimator, 'classification')['estimator'])
+    classifier.fit(X_train, labels.iloc[train])
+    assert classifier.score(X_test, labels.iloc[test]) > 0.8
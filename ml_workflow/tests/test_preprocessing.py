@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.preprocessing import PreprocessingPipeline
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, 800, n).astype(str)
+    df = pd.DataFrame({
+        'x': rng.normal(10, 3, n),
+        'city': rng.choice(['a', 'b', 'c', 'd'], n, p=[0.5, 0.3, 0.15, 0.05]),
+        'user': np.char.add('u', ids),
+    })
+    df.loc[rng.random(n) < 0.1, 'city'] = None
+    return df
+
+
+def _assert_standardized(out, columns):
+    for col in columns:
+        assert out[col].dtype == np.float64
+        assert out[col].mean() == pytest.approx(0.0, abs=1e-9)
+        assert out[col].std(ddof=0) == pytest.approx(1.0, rel=1e-9)
+
+
+@pytest.mark.parametrize('high_cardinality', ['frequency', 'hash'])
+def test_fit_scales_categorical_codes(high_cardinality):
+    df = _frame()
+    pipeline = PreprocessingPipeline(max_categories=100, high_cardinality=high_cardinality)
+    out = pipeline.fit_transform(df)
+
+    _assert_standardized(out, ['x', 'city', 'user'])
+
+
+@pytest.mark.parametrize('high_cardinality', ['frequency', 'hash'])
+def test_partial_fit_scales_categorical_codes(high_cardinality):
+    df = _frame()
+    pipeline = PreprocessingPipeline(max_categories=100, high_cardinality=high_cardinality)
+    for start in range(0, len(df), 1000):
+        pipeline.partial_fit(df.iloc[start:start + 1000])
+    out = pipeline.transform(df)
+
+    _assert_standardized(out, ['x', 'city'])
+    if high_cardinality == 'hash':
+        # Hash buckets are fixed, so the streamed statistics are exact
+        _assert_standardized(out, ['user'])
+    else:
+        # Heavy-hitter counts are approximate once a column has many values
+        assert abs(out['user'].mean()) < 0.1
+        assert out['user'].std(ddof=0) == pytest.approx(1.0, rel=0.1)
+
+
+def test_unscaled_codes_are_integers():
+    out = PreprocessingPipeline(scale=False).fit_transform(_frame())
+
+    assert out['city'].dtype == np.int32
+    assert out['city'].min() >= 0
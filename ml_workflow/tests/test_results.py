@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from agents.results import AnalysisResults, CorrelationResult, FeatureStats, TargetDistribution
+
+
+def _results(target):
+    stats = {stat: np.array([1.0, 2.0]) for stat in ('count', 'mean', 'std', 'min', 'max', 'skew', 'kurtosis')}
+    stats['quantiles'] = (np.array([0.5, 1.0]), np.array([1.0, 2.0]), np.array([1.5, 3.0]))
+    correlation = CorrelationResult.from_summary({
+        'features': ['a', 'b'],
+        'matrix': np.array([[1.0, 0.5], [0.5, 1.0]]),
+        'order': [1, 0],
+        'top_pairs': [{'feature_a': 'a', 'feature_b': 'b', 'correlation': 0.5}]
+    })
+    return AnalysisResults(FeatureStats.from_column_stats(stats, ['a', 'b']), correlation, target)
+
+
+def _assert_round_trip(results, path):
+    results.save_npz(path)
+    loaded = AnalysisResults.load_npz(path)
+
+    assert loaded.features.names.tolist() == ['a', 'b']
+    np.testing.assert_array_equal(loaded.features.q75, results.features.q75)
+    np.testing.assert_array_equal(loaded.correlation.matrix, results.correlation.matrix)
+    assert loaded.correlation.top_pairs().equals(results.correlation.top_pairs())
+    for name in ('mean', 'median', 'std', 'unique_values'):
+        assert getattr(loaded.target, name) == getattr(results.target, name)
+    np.testing.assert_array_equal(loaded.target.values, results.target.values)
+    np.testing.assert_array_equal(loaded.target.counts, results.target.counts)
+    return loaded
+
+
+def test_npz_round_trip(tmp_path):
+    target = TargetDistribution.from_value_counts(
+        pd.Series([3, 1], index=[1.0, 2.0]), mean=1.25, median=1.0, std=0.5, unique_values=2
+    )
+    _assert_round_trip(_results(target), tmp_path / 'analysis.npz')
+
+
+def test_npz_round_trip_keeps_none_fields(tmp_path):
+    # A categorical target has value counts but no moments
+    target = TargetDistribution.from_value_counts(pd.Series([5, 2], index=['yes', 'no']))
+    loaded = _assert_round_trip(_results(target), tmp_path / 'analysis.npz')
+
+    assert loaded.target.mean is None and loaded.target.std is None
+    assert loaded.target.unique_values is None
+    assert loaded.target.values.tolist() == ['yes', 'no']
@@ -0,0 +1,111 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging
+
+logger = logging.getLogger(__name__)
+
+class WorkflowCancelled(Exception):
+    """Raised when a workflow run is cancelled between stages"""
+
+class StageGraph:
+    """
+    A small dependency graph of workflow stages.
+
+    Each stage is a callable receiving a dict with the outputs of the stages
+    completed so far. Stages whose dependencies are satisfied run concurrently on
+    a thread pool, so they share the same in-memory data instead of pickled copies.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add_stage(self, name, func, depends_on=()):
+        """
+        Register a stage
+
+        Args:
+            name (str): Unique stage name; its output is stored under this key
+            func (callable): Called as func(outputs) with the outputs so far
+            depends_on (tuple): Names of stages that must finish first
+        """
+        unknown = [dep for dep in depends_on if dep not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {unknown}")
+        self.stages[name] = (func, tuple(depends_on))
+        return self
+
+    def run(self, parallel=True, progress_callback=None, cancel_event=None, profiler=None):
+        """
+        Execute all stages in dependency order
+
+        Args:
+            parallel (bool): Run independent stages concurrently; otherwise one at a time
+            progress_callback (callable): Called as (stage, status, seconds) when a stage
+                is 'running', 'done' or 'failed'; seconds is None while running
+            cancel_event (threading.Event): When set, no further stages are started and
+                WorkflowCancelled is raised once the running stages return; stages that
+                watch the event themselves (e.g. tuning) may stop early by raising
+            profiler (StageProfiler): Record time, memory and .copy() calls per stage; stages
+                then run one at a time so process-wide measurements are attributable
+
+        Returns:
+            tuple: (dict of stage outputs, dict of per-stage wall times in seconds)
+        """
+        outputs = {}
+        timings = {}
+        pending = dict(self.stages)
+        running = {}
+        workers = self.max_workers if parallel and profiler is None else 1
+
+        def notify(name, status, seconds=None):
+            if progress_callback is not None:
+                progress_callback(name, status, seconds)
+
+        def timed(name, func):
+            notify(name, 'running')
+            start = time.perf_counter()
+            try:
+                if profiler is not None:
+                    with profiler.stage(name):
+                        result = func(outputs)
+                else:
+                    result = func(outputs)
+            except Exception:
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                notify(name, 'cancelled' if cancelled else 'failed', time.perf_counter() - start)
+                raise
+            timings[name] = time.perf_counter() - start
+            notify(name, 'done', timings[name])
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='workflow-stage') as executor:
+            while pending or running:
+                if cancel_event is not None and cancel_event.is_set():
+                    wait(running)
+                    raise WorkflowCancelled("Workflow cancelled")
+                ready = [
+                    name for name, (_, deps) in pending.items()
+                    if all(dep in outputs for dep in deps)
+                ]
+                for name in ready[:max(workers - len(running), 0)]:
+                    func, _ = pending.pop(name)
+                    logger.info(f"Starting stage: {name}")
+                    running[executor.submit(timed, name, func)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                    except Exception as e:
+                        # Do not start anything else; stages already running finish on shutdown
+                        for other in running:
+                            other.cancel()
+                        if cancel_event is not None and cancel_event.is_set():
+                            # The stage stopped itself because of the cancellation
+                            raise WorkflowCancelled("Workflow cancelled") from e
+                        raise
+                    logger.info(f"Finished stage: {name} ({timings[name]:.2f}s)")
+
+        return outputs, timings
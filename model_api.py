@@ -1,19 +1,22 @@
 # model_api.py
-import os
-from groq import Groq
+from model_router import ModelRouter
+from single_flight import SingleFlight, request_key
 
-# Initialize the Groq client with the API key from environment
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not set in environment.")
-client = Groq(api_key=GROQ_API_KEY)
+# Route every model name to the provider backends that can serve it
+router = ModelRouter()
+if not router.has_available_backend():
+    raise ValueError("No LLM provider configured. Set GROQ_API_KEY or OPENAI_API_KEY in environment.")
 
-def generate_text(messages: list, model_name: str) -> str:
+# Identical requests that are in flight at the same time share one upstream call
+flights = SingleFlight()
+
+def generate_text(messages: list, model_name: str, hedge: bool = False) -> str:
     """
-    Helper function to call the Groq chat completion API.
+    Helper function to call the chat completion API of the provider serving `model_name`.
     `messages` should be a list of dicts with 'role' and 'content'.
+    Set `hedge` for interactive stages to race a second provider when the first is slow.
+    Concurrent calls with the same messages and model are coalesced into one request.
     Returns the assistant's content as a string.
     """
-    completion = client.chat.completions.create(messages=messages, model=model_name)
-    # Extract the generated text from the first choice
-    return completion.choices[0].message.content
+    key = request_key("chat", model_name, messages)
+    return flights.do(key, router.complete, messages, model_name, hedge=hedge)
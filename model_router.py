@@ -0,0 +1,229 @@
+# model_router.py
+import os
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# Candidate (backend, provider model id) pairs for every model offered in the UI.
+# The first available candidate is the primary; the rest are fallbacks and hedges.
+DEFAULT_ROUTES = {
+    "llama3-8b-8192": [("groq", "llama3-8b-8192"), ("openai", "gpt-3.5-turbo")],
+    "Groq/Llama-3-Groq-8B-Tool-Use": [("groq", "Groq/Llama-3-Groq-8B-Tool-Use"), ("openai", "gpt-3.5-turbo")],
+    "Groq/Llama-3-Groq-70B-Tool-Use": [("groq", "Groq/Llama-3-Groq-70B-Tool-Use"), ("openai", "gpt-3.5-turbo")],
+    "gpt-3.5-turbo": [("openai", "gpt-3.5-turbo"), ("groq", "llama3-8b-8192")],
+}
+
+
+def _groq_client(api_key):
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+
+def _openai_client(api_key):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies and outcomes for a single backend."""
+
+    def __init__(self, window=100):
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            if ok:
+                self._latencies.append(latency)
+            self._outcomes.append(ok)
+
+    def percentile(self, q):
+        """Nearest-rank percentile of successful call latencies, or None without samples"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        rank = max(int(round(q / 100.0 * len(samples))) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
+
+    def error_rate(self):
+        with self._lock:
+            outcomes = list(self._outcomes)
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+    def calls(self):
+        with self._lock:
+            return len(self._outcomes)
+
+    def snapshot(self):
+        return {
+            'calls': self.calls(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'error_rate': self.error_rate()
+        }
+
+
+class ProviderBackend:
+    """A chat-completion provider reached through an OpenAI-compatible client."""
+
+    def __init__(self, name, env_key, client_factory, window=100):
+        self.name = name
+        self.env_key = env_key
+        self.client_factory = client_factory
+        self.tracker = LatencyTracker(window)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return bool(os.getenv(self.env_key))
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                api_key = os.getenv(self.env_key)
+                if not api_key:
+                    raise ValueError(f"{self.env_key} not set in environment.")
+                self._client = self.client_factory(api_key)
+            return self._client
+
+    def complete(self, messages, model):
+        """Run one chat completion and record its latency and outcome"""
+        start = time.perf_counter()
+        try:
+            completion = self.client.chat.completions.create(messages=messages, model=model)
+        except Exception:
+            self.tracker.record(time.perf_counter() - start, ok=False)
+            raise
+        self.tracker.record(time.perf_counter() - start, ok=True)
+        return completion.choices[0].message.content
+
+
+class ModelRouter:
+    """
+    Routes chat completions for a model name to the provider backends that can serve it.
+
+    Backends whose recent error rate exceeds `max_error_rate` are tried last. With
+    hedging enabled, a second request is sent to the next backend once the primary
+    has been running longer than its rolling p95 latency (or `hedge_after` seconds
+    until enough samples exist), and whichever response arrives first is returned.
+    """
+
+    def __init__(self, routes=None, hedge_after=8.0, min_samples=5,
+                 max_error_rate=0.5, window=100, max_workers=8):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.backends = {
+            'groq': ProviderBackend('groq', 'GROQ_API_KEY', _groq_client, window),
+            'openai': ProviderBackend('openai', 'OPENAI_API_KEY', _openai_client, window)
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='model-router')
+
+    def has_available_backend(self):
+        return any(backend.available for backend in self.backends.values())
+
+    def candidates(self, model_name):
+        """
+        Resolve a model name to an ordered list of (backend, provider model id)
+
+        Args:
+            model_name (str): Model name as selected in the UI
+
+        Returns:
+            list: Available candidates, healthiest preferred backend first
+        """
+        route = self.routes.get(model_name)
+        if route is None:
+            backend = 'openai' if model_name.startswith('gpt-') else 'groq'
+            route = [(backend, model_name)]
+
+        available = [
+            (self.backends[name], model) for name, model in route
+            if name in self.backends and self.backends[name].available
+        ]
+        if not available:
+            raise ValueError(
+                f"No provider configured for model '{model_name}'. "
+                "Set GROQ_API_KEY or OPENAI_API_KEY in the environment."
+            )
+
+        # Keep the configured preference order, but push unhealthy backends to the end
+        return sorted(available, key=lambda c: self._is_unhealthy(c[0]))
+
+    def complete(self, messages, model_name, hedge=False):
+        """
+        Generate a chat completion for `model_name`, falling back across backends
+
+        Args:
+            messages (list): Chat messages with 'role' and 'content'
+            model_name (str): Model name as selected in the UI
+            hedge (bool): Send a second request if the primary exceeds its latency threshold
+
+        Returns:
+            str: The assistant's content
+        """
+        candidates = self.candidates(model_name)
+        if hedge and len(candidates) > 1:
+            return self._complete_hedged(messages, candidates)
+        return self._complete_sequential(messages, candidates)
+
+    def stats(self):
+        """Rolling latency and error statistics for every backend"""
+        return {name: backend.tracker.snapshot() for name, backend in self.backends.items()}
+
+    def _is_unhealthy(self, backend):
+        tracker = backend.tracker
+        return tracker.calls() >= self.min_samples and tracker.error_rate() > self.max_error_rate
+
+    def _hedge_delay(self, backend):
+        p95 = backend.tracker.percentile(95)
+        if p95 is None or backend.tracker.calls() < self.min_samples:
+            return self.hedge_after
+        return p95
+
+    def _complete_sequential(self, messages, candidates):
+        last_error = None
+        for backend, model in candidates:
+            try:
+                return backend.complete(messages, model)
+            except Exception as e:
+                logger.warning(f"{backend.name} failed for model {model}: {str(e)}")
+                last_error = e
+        raise last_error
+
+    def _complete_hedged(self, messages, candidates):
+        (primary, primary_model), rest = candidates[0], list(candidates[1:])
+        pending = {self._executor.submit(primary.complete, messages, primary_model)}
+        delay = self._hedge_delay(primary)
+        last_error = None
+
+        while pending:
+            done, pending = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"Hedged request failed: {str(e)}")
+                    last_error = e
+
+            # Either the in-flight requests are slow or one of them failed: start the next backend
+            if rest:
+                backend, model = rest.pop(0)
+                logger.info(f"Hedging request to {backend.name} ({model})")
+                pending.add(self._executor.submit(backend.complete, messages, model))
+                delay = self._hedge_delay(backend)
+            else:
+                delay = None
+
+        raise last_error
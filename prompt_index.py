@@ -0,0 +1,211 @@
+# prompt_index.py
+import difflib
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Filler words that do not change what is being asked for
+STOPWORDS = {
+    "a", "an", "the", "me", "my", "i", "we", "us", "you", "please", "can", "could", "would",
+    "want", "need", "for", "of", "to", "with", "and", "or", "that", "which", "some"
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _normalize_token(token):
+    # Crude plural folding so "guitars" and "guitar" match
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def content_tokens(text):
+    """Normalized words of a prompt without filler words (all words if only filler)"""
+    tokens = [_normalize_token(t) for t in re.findall(r"[a-z0-9]+", text.lower())]
+    return [t for t in tokens if t not in STOPWORDS] or tokens
+
+
+def _join_compounds(tokens, vocabulary):
+    # "web site" counts as "website" when the other prompt writes it as one word
+    joined, i = [], 0
+    while i < len(tokens):
+        if i + 1 < len(tokens) and tokens[i] + tokens[i + 1] in vocabulary:
+            joined.append(tokens[i] + tokens[i + 1])
+            i += 2
+        else:
+            joined.append(tokens[i])
+            i += 1
+    return joined
+
+
+def containment(tokens, others, min_ratio=0.8):
+    """
+    Fraction of the content words of the shorter prompt found in the other one.
+    A word counts as found when the other prompt has it, a typo of it (difflib
+    ratio of at least `min_ratio`) or the same compound written as two words.
+    """
+    tokens, others = _join_compounds(tokens, set(others)), _join_compounds(others, set(tokens))
+    small, large = sorted((set(tokens), set(others)), key=len)
+    if not small:
+        return 0.0
+    found = sum(
+        token in large or any(
+            difflib.SequenceMatcher(None, token, other).ratio() >= min_ratio for other in large
+        )
+        for token in small
+    )
+    return found / len(small)
+
+
+def shingles(text, size=3):
+    """
+    Order-insensitive shingles of a prompt: character n-grams of its content words.
+    Word order and filler words do not matter, and small typos change few shingles.
+    """
+    result = set()
+    for token in content_tokens(text):
+        padded = f" {token} "
+        if len(padded) <= size:
+            result.add(padded)
+        for i in range(len(padded) - size + 1):
+            result.add(padded[i:i + size])
+    return result
+
+
+class MinHasher:
+    """MinHash signatures whose agreement rate estimates the Jaccard similarity of shingle sets."""
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingle_set):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+            for s in shingle_set
+        ]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        ]
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class PromptIndex:
+    """
+    Local index of past prompts and the requirements/design they produced.
+
+    Prompts are compared by MinHash over content-word shingles, so rephrasings such
+    as "create a guitar website" and "Create a web site for guitars" find each other
+    without calling any external service. The estimated Jaccard similarity must reach
+    `threshold`; in addition, at least `min_containment` of the content words of the
+    shorter prompt must appear in the other one (up to typos and split compounds),
+    so prompts that share many letters but not their words ("red" vs "blue") do not
+    match. Entries are kept in a JSON file, most recent last, and the oldest are
+    dropped beyond `max_entries`.
+    """
+
+    def __init__(self, path="prompt_index.json", threshold=0.7, num_perm=128, max_entries=500,
+                 min_containment=0.8):
+        self.path = path
+        self.threshold = threshold
+        self.min_containment = min_containment
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def lookup(self, prompt, threshold=None, models=None):
+        """
+        Find the most similar past prompt
+
+        Args:
+            prompt (str): New prompt
+            threshold (float): Minimum estimated Jaccard similarity; defaults to self.threshold
+            models (dict): Only match runs made with these models, e.g.
+                {'requirements': ..., 'design': ...}
+
+        Returns:
+            tuple: (entry dict with 'prompt', 'requirements', 'design', 'models' and
+                'created_at', similarity), or (None, 0.0) when no past prompt matches
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.hasher.signature(shingles(prompt))
+        tokens = content_tokens(prompt)
+        with self._lock:
+            entries = list(self._entries)
+        if models is not None:
+            entries = [e for e in entries if e.get("models") == models]
+        best, best_score = None, 0.0
+        for entry in entries:
+            score = MinHasher.similarity(signature, entry["signature"])
+            if score <= best_score or score < threshold:
+                continue
+            if containment(tokens, content_tokens(entry["prompt"])) >= self.min_containment:
+                best, best_score = entry, score
+        return best, best_score
+
+    def add(self, prompt, requirements, design, models=None):
+        """Store the artifacts of a completed requirements and design run"""
+        entry = {
+            "id": uuid.uuid4().hex[:12],
+            "prompt": prompt,
+            "requirements": requirements,
+            "design": design,
+            "models": models or {},
+            "created_at": time.time(),
+            "signature": self.hasher.signature(shingles(prompt))
+        }
+        with self._lock:
+            # A newer run of the same prompt replaces the older one
+            self._entries = [e for e in self._entries if e["prompt"] != prompt] + [entry]
+            self._entries = self._entries[-self.max_entries:]
+            self._save()
+        return entry
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable prompt index {self.path}: {str(e)}")
+            return []
+        # Signatures from a different MinHash configuration cannot be compared
+        if data.get("num_perm") != self.hasher.num_perm:
+            return []
+        return data.get("entries", [])
+
+    def _save(self):
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"num_perm": self.hasher.num_perm, "entries": self._entries}, f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,200 @@
+# single_flight.py
+import hashlib
+import json
+import threading
+import time
+import logging
+from concurrent.futures import Future, wait
+
+logger = logging.getLogger(__name__)
+
+
+class CallCancelled(Exception):
+    """Raised in a waiter that stopped waiting for a shared call"""
+
+
+def request_key(*parts):
+    """Stable hash of the JSON-serializable parts that identify an upstream request"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Stream:
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.cancelled = False
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent upstream calls.
+
+    The first caller of a key starts the call; further callers with the same key
+    wait for its result instead of starting their own, and the result, or the
+    exception, is handed to every one of them. Nothing is cached: once the call
+    finishes the next caller starts a new one. Any caller, the first one included,
+    can give up (timeout or cancel event) without affecting the others; the call
+    itself keeps running for whoever still waits.
+    """
+
+    def __init__(self, poll_interval=0.1):
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._counts = {'upstream_calls': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args, timeout=None, cancel_event=None, **kwargs):
+        """
+        Return fn(*args, **kwargs), sharing one execution among concurrent callers of `key`
+
+        Args:
+            key (str): Request identity, e.g. from request_key()
+            fn (callable): Upstream call
+            timeout (float): Seconds this caller waits at most (TimeoutError afterwards)
+            cancel_event (threading.Event): Stop waiting when set (CallCancelled)
+
+        Returns:
+            The upstream result; upstream exceptions are raised in every caller
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._counts['upstream_calls'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            return self._wait(future, timeout, cancel_event)
+
+        if timeout is None and cancel_event is None:
+            # Nothing to give up on: the leader runs the call in its own thread
+            self._run(key, future, fn, args, kwargs)
+            return future.result()
+        # Run the call in the background so the leader can stop waiting like the others
+        threading.Thread(
+            target=self._run, args=(key, future, fn, args, kwargs),
+            name='single-flight-call', daemon=True
+        ).start()
+        return self._wait(future, timeout, cancel_event)
+
+    def stream(self, key, fn, *args, cancel_event=None, **kwargs):
+        """
+        Iterate over fn(*args, **kwargs), sharing one upstream iterator among concurrent callers
+
+        Late subscribers first receive the chunks produced so far. When every
+        subscriber has stopped iterating, the upstream iterator is closed.
+
+        Args:
+            key (str): Request identity, e.g. from request_key()
+            fn (callable): Returns an iterable of chunks
+            cancel_event (threading.Event): Stop iterating when set (CallCancelled)
+
+        Yields:
+            Chunks in upstream order; an upstream exception is raised after the chunks
+            delivered before it
+        """
+        with self._lock:
+            flight = self._streams.get(key)
+            if flight is None:
+                flight = _Stream()
+                self._streams[key] = flight
+                threading.Thread(
+                    target=self._produce, args=(key, flight, fn, args, kwargs),
+                    name='single-flight-stream', daemon=True
+                ).start()
+                self._counts['upstream_calls'] += 1
+            else:
+                self._counts['coalesced'] += 1
+            flight.subscribers += 1
+
+        position = 0
+        try:
+            while True:
+                with flight.cond:
+                    while position >= len(flight.chunks) and not flight.done:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise CallCancelled("Stopped waiting for the shared stream")
+                        flight.cond.wait(self.poll_interval if cancel_event is not None else None)
+                    if position < len(flight.chunks):
+                        chunk = flight.chunks[position]
+                        position += 1
+                    elif flight.error is not None:
+                        raise flight.error
+                    else:
+                        return
+                yield chunk
+        finally:
+            with self._lock:
+                flight.subscribers -= 1
+                if flight.subscribers == 0 and not flight.done:
+                    flight.cancelled = True
+                    if self._streams.get(key) is flight:
+                        del self._streams[key]
+
+    def stats(self):
+        """Upstream calls started and callers that joined one already in flight"""
+        with self._lock:
+            return {**self._counts, 'in_flight': len(self._calls) + len(self._streams)}
+
+    def _wait(self, future, timeout, cancel_event):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise CallCancelled("Stopped waiting for the shared call")
+            wait_for = None if cancel_event is None else self.poll_interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for the shared call")
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+            # Only wait here: result() is called once the call is done, so upstream
+            # exceptions (TimeoutError included) always reach the caller
+            done, _ = wait([future], timeout=wait_for)
+            if done:
+                return future.result()
+
+    def _run(self, key, future, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            return
+        self._finish(key, future)
+        future.set_result(result)
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def _produce(self, key, flight, fn, args, kwargs):
+        iterator = None
+        try:
+            iterator = iter(fn(*args, **kwargs))
+            for chunk in iterator:
+                if flight.cancelled:
+                    break
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+        except Exception as e:
+            logger.warning(f"Shared stream failed: {str(e)}")
+            flight.error = e
+        finally:
+            if flight.cancelled and hasattr(iterator, 'close'):
+                iterator.close()
+            with self._lock:
+                if self._streams.get(key) is flight:
+                    del self._streams[key]
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
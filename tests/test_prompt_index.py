@@ -0,0 +1,66 @@
+import pytest
+
+from prompt_index import PromptIndex, containment, content_tokens
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PromptIndex(str(tmp_path / "prompt_index.json"))
+    index.add("create a website for guitar", "requirements", "design")
+    return index
+
+
+@pytest.mark.parametrize("prompt", [
+    "create a website for guitar",
+    "Create a guitar website, please",
+    "Create a web site for guitars",
+    "create a website for guitars!",
+])
+def test_near_duplicates_match(index, prompt):
+    match, similarity = index.lookup(prompt)
+
+    assert match is not None and match["prompt"] == "create a website for guitar"
+    assert similarity >= index.threshold
+
+
+@pytest.mark.parametrize("prompt", [
+    "create an app for guitar",
+    "create a website for violin",
+    "guitar shop website",
+    "make a red guitar website",
+    "write a python script that sorts files",
+])
+def test_different_requests_do_not_match(index, prompt):
+    assert index.lookup(prompt) == (None, 0.0)
+
+
+def test_longer_prompts_tolerate_one_different_word(tmp_path):
+    index = PromptIndex(str(tmp_path / "prompt_index.json"))
+    index.add("create a website for guitar lessons with online booking", "r", "d")
+
+    match, _ = index.lookup("build a website for guitar lessons with online booking")
+    assert match is not None
+    # A changed detail in a short prompt is a different request
+    index.add("make a red guitar website", "r", "d")
+    assert index.lookup("make a blue guitar website") == (None, 0.0)
+
+
+def test_request_words_are_content():
+    assert content_tokens("Build me an app") == ["build", "app"]
+    assert content_tokens("create a site") == ["create", "site"]
+
+
+def test_containment_of_shorter_prompt():
+    tokens = content_tokens("create a website for guitar")
+
+    assert containment(tokens, content_tokens("create a web site for guitar")) == 1.0
+    assert containment(tokens, content_tokens("create a website for gutiar")) == 1.0
+    assert containment(tokens, content_tokens("guitar shop website")) == pytest.approx(2 / 3)
+
+
+def test_lookup_only_matches_selected_models(index):
+    index.add("create a guitar website", "r", "d", models={"requirements": "m1", "design": "m2"})
+
+    match, _ = index.lookup("create a guitar website", models={"requirements": "m1", "design": "m2"})
+    assert match["models"] == {"requirements": "m1", "design": "m2"}
+    assert index.lookup("create a guitar website", models={"requirements": "x", "design": "y"}) == (None, 0.0)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import CallCancelled, SingleFlight
+
+
+def _slow(release, result="done"):
+    release.wait(5)
+    return result
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    results = []
+    callers = [
+        threading.Thread(target=lambda: results.append(flights.do("k", _slow, release)))
+        for _ in range(3)
+    ]
+    for caller in callers:
+        caller.start()
+    while flights.stats()['coalesced'] < 2:
+        time.sleep(0.01)
+    release.set()
+    for caller in callers:
+        caller.join()
+
+    assert results == ["done"] * 3
+    assert flights.stats() == {'upstream_calls': 1, 'coalesced': 2, 'in_flight': 0}
+
+
+def test_errors_reach_the_leader():
+    def fail():
+        raise ValueError("upstream")
+
+    with pytest.raises(ValueError, match="upstream"):
+        SingleFlight().do("k", fail)
+
+
+def test_cancelled_leader_stops_waiting_without_affecting_followers():
+    flights = SingleFlight(poll_interval=0.01)
+    release, cancel = threading.Event(), threading.Event()
+    leader_error, follower_result = [], []
+
+    def leader():
+        try:
+            flights.do("k", _slow, release, cancel_event=cancel)
+        except CallCancelled as e:
+            leader_error.append(e)
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    while flights.stats()['in_flight'] == 0:
+        time.sleep(0.01)
+    follower = threading.Thread(target=lambda: follower_result.append(flights.do("k", _slow, release)))
+    follower.start()
+
+    cancel.set()
+    leader_thread.join(1)
+    assert not leader_thread.is_alive() and len(leader_error) == 1
+
+    release.set()
+    follower.join(1)
+    assert follower_result == ["done"]
+    assert flights.stats()['upstream_calls'] == 1
+
+
+def test_leader_timeout():
+    release = threading.Event()
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        SingleFlight().do("k", _slow, release, timeout=0.05)
+    assert time.monotonic() - start < 1
+    release.set()